@@ -0,0 +1,78 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from os.path import dirname, abspath, join
+import sys
+import threading
+
+try:
+    from http.server import HTTPServer, BaseHTTPRequestHandler
+except ImportError:  # Python 2.x
+    from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'tests'))
+
+from playlist_generator import generate_media_playlist
+
+SEGMENT_COUNTS = (10, 1000, 10000, 100000, 500000)
+
+
+def pytest_addoption(parser):
+    parser.addoption('--max-segments', type=int, default=SEGMENT_COUNTS[-1],
+                     help='skip benchmarks on playlists with more segments')
+
+
+def pytest_generate_tests(metafunc):
+    if 'segment_count' in metafunc.fixturenames:
+        max_segments = metafunc.config.getoption('max_segments')
+        counts = [count for count in SEGMENT_COUNTS if count <= max_segments]
+        metafunc.parametrize('segment_count', counts,
+                             ids=['%d-segments' % count for count in counts])
+
+
+# A VOD playlist as seen in production: rotating keys, a few date times,
+# discontinuities and ad breaks
+PLAYLIST_OPTIONS = dict(key_rotation=100, program_date_time=0.01,
+                        discontinuity=0.002, cue_out=0.005)
+
+
+@pytest.fixture
+def playlist_content(segment_count):
+    return generate_media_playlist(segments=segment_count, **PLAYLIST_OPTIONS)
+
+
+@pytest.fixture
+def playlist_file(tmpdir, playlist_content):
+    playlist = tmpdir.join('playlist.m3u8')
+    playlist.write(playlist_content)
+    return str(playlist)
+
+
+class PlaylistHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        content = self.server.content.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.apple.mpegurl')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def playlist_uri(playlist_content):
+    server = HTTPServer(('localhost', 0), PlaylistHandler)
+    server.content = playlist_content
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield 'http://localhost:%d/path/to/playlist.m3u8' % server.server_port
+    server.shutdown()
+    server.server_close()
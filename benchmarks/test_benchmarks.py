@@ -0,0 +1,207 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+# Benchmarks for parsing, model construction, dumping and loading.
+# They need pytest-benchmark, run them with:
+#
+#   $ ./runtests benchmark
+
+from os.path import dirname, abspath
+import subprocess
+import sys
+
+import pytest
+
+import m3u8
+from playlist_generator import generate_master_playlist, generate_media_playlist
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+
+def test_parse(benchmark, playlist_content):
+    data = benchmark(m3u8.parse, playlist_content)
+    assert data['is_endlist']
+
+
+def test_model_construction(benchmark, playlist_content):
+    data = m3u8.parse(playlist_content)
+
+    def build():
+        obj = m3u8.M3U8()
+        obj.data = data
+        obj._initialize_attributes()
+        return obj
+
+    obj = benchmark(build)
+    assert len(data['segments']) == len(obj.segments)
+
+
+def test_loads(benchmark, playlist_content):
+    obj = benchmark(m3u8.loads, playlist_content)
+    assert obj.is_endlist
+
+
+def test_dumps(benchmark, playlist_content):
+    obj = m3u8.loads(playlist_content)
+    assert benchmark(obj.dumps)
+
+
+def test_base_uri_propagation(benchmark, playlist_content):
+    obj = m3u8.loads(playlist_content)
+
+    def rebase():
+        obj.base_uri = 'http://example.com/path/to/'
+
+    benchmark(rebase)
+    assert 'http://example.com/path/to/' == obj.segments[-1].base_uri
+
+
+def test_base_path_rewrite(benchmark, playlist_content):
+    obj = m3u8.loads(playlist_content)
+
+    def rewrite():
+        obj.base_path = 'http://cdn.example.com/path/to'
+
+    benchmark(rewrite)
+    assert obj.segments[-1].uri.startswith('http://cdn.example.com/path/to/')
+
+
+def test_absolute_uris(benchmark, playlist_content):
+    obj = m3u8.loads(playlist_content)
+
+    def resolve():
+        # Rebasing clears the memoized absolute uris
+        obj.base_uri = 'http://example.com/path/to/'
+        return obj.segments.absolute_uris()
+
+    uris = benchmark(resolve)
+    assert 'http://example.com/path/to/' + obj.segments[-1].uri == uris[-1]
+
+
+def test_absolute_uris_memoized(benchmark, playlist_content):
+    obj = m3u8.loads(playlist_content)
+    obj.base_uri = 'http://example.com/path/to/'
+    obj.segments.absolute_uris()
+
+    benchmark(obj.segments.absolute_uris)
+
+
+def test_load_from_file(benchmark, playlist_file):
+    obj = benchmark(m3u8.load, playlist_file)
+    assert obj.is_endlist
+
+
+def test_load_from_mapped_file(benchmark, playlist_file):
+    obj = benchmark(m3u8.load, playlist_file, mmap=True)
+    assert obj.is_endlist
+
+
+def test_load_from_uri(benchmark, playlist_uri):
+    obj = benchmark(m3u8.load, playlist_uri)
+    assert obj.is_endlist
+
+
+def test_parse_byteranges(benchmark, segment_count):
+    content = generate_media_playlist(segments=segment_count, byterange=100)
+    data = benchmark(m3u8.parse, content)
+    assert segment_count == len(data['segments'])
+
+
+def test_byterange_requests(benchmark, segment_count):
+    content = generate_media_playlist(segments=segment_count, byterange=100)
+    segments = m3u8.loads(content).segments
+    requests = benchmark(segments.byterange_requests, max_request_size=64 * 1024 * 1024)
+    assert len(requests) < segment_count or segment_count < 100
+
+
+def test_diff(benchmark, playlist_content):
+    old = m3u8.loads(playlist_content)
+    new = m3u8.loads(playlist_content)
+    # The window moved by 3 segments
+    del new.segments[:3]
+    new.media_sequence = (old.media_sequence or 0) + 3
+    result = benchmark(m3u8.diff, old, new)
+    assert 3 == len(result.removed_segments)
+
+
+def test_stitch(benchmark, segment_count):
+    # A hundred sources, ex.: content split by mid-rolls
+    content = generate_media_playlist(segments=max(segment_count // 100, 1),
+                                      key_rotation=100)
+    sources = [m3u8.M3U8(content, base_uri='http://example.com/%d/' % number)
+               for number in range(100)]
+    result = benchmark(m3u8.stitch, sources)
+    assert 100 * len(sources[0].segments) == len(result.segments)
+
+
+def test_clip(benchmark, playlist_content):
+    obj = m3u8.loads(playlist_content)
+    middle = sum(segment.duration for segment in obj.segments) / 2
+
+    def clip():
+        # A one minute clip, as served by a clip service
+        return obj.clip(middle, middle + 60).dumps()
+
+    assert benchmark(clip).endswith('#EXT-X-ENDLIST')
+
+
+def test_loads_master(benchmark):
+    content = generate_master_playlist(variants=30, audio_groups=3,
+                                       audio_languages=10,
+                                       subtitle_languages=20)
+    obj = benchmark(m3u8.loads, content)
+    assert 30 == len(obj.playlists)
+
+
+def test_select_variant(benchmark):
+    obj = m3u8.loads(generate_master_playlist(variants=30))
+    bandwidth = obj.playlists[15].stream_info.bandwidth
+
+    def select():
+        return obj.playlists.select(bandwidth, max_resolution=(3840, 2160),
+                                    codecs=('avc1', 'mp4a'))
+
+    assert obj.playlists[15] == benchmark(select)
+
+
+def test_parse_with_validation(benchmark, playlist_content):
+    def validate():
+        report = m3u8.ValidationReport()
+        m3u8.parse(playlist_content, validation=report)
+        return report
+
+    assert benchmark(validate).is_valid
+
+
+def test_parse_with_profile(benchmark, playlist_content):
+    data = benchmark(m3u8.parse, playlist_content, profile=m3u8.ParseProfile())
+    assert data['is_endlist']
+
+
+def test_from_bytes(benchmark, playlist_content):
+    data = m3u8.loads(playlist_content).to_bytes()
+    obj = benchmark(m3u8.M3U8.from_bytes, data)
+    assert obj.is_endlist
+
+
+def test_import_time(benchmark):
+    '''
+    Runs ``python -X importtime -c "import m3u8"`` (python 3.7+). The timing
+    includes the interpreter startup, the import time of m3u8 alone, in
+    microseconds, is saved as `import_time_us` in `extra_info`.
+    '''
+    if sys.version_info < (3, 7):
+        pytest.skip('-X importtime needs python 3.7+')
+    import_times = []
+
+    def import_m3u8():
+        output = subprocess.check_output(
+            [sys.executable, '-X', 'importtime', '-c', 'import m3u8'],
+            cwd=ROOT, stderr=subprocess.STDOUT)
+        last_line = output.decode('ascii').strip().splitlines()[-1]
+        import_times.append(int(last_line.split('|')[1]))
+
+    benchmark.pedantic(import_m3u8, rounds=10)
+    benchmark.extra_info['import_time_us'] = min(import_times)
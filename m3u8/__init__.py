@@ -6,60 +6,135 @@
 import sys
 import os
 import posixpath
+from mmap import mmap as memory_map, ACCESS_READ
 
 try:
-    from urllib.request import urlopen, Request
-    from urllib.error import HTTPError
     from urllib.parse import urlparse, urljoin
 except ImportError:  # Python 2.x
-    from urllib2 import urlopen, Request, HTTPError
     from urlparse import urlparse, urljoin
 
 from m3u8.model import M3U8, Playlist, IFramePlaylist, Media, Segment
-from m3u8.parser import parse, is_url, ParseError
+from m3u8.parser import (parse, is_url, ParseError, ParseProfile,
+                          ValidationReport, ValidationIssue)
+from m3u8.live import LivePlaylistWriter
+from m3u8.observers import (Observer, InMemoryObserver, set_observer,
+                            get_observer, span)
+from m3u8.batch import parse_many, ParseResult
+from m3u8.cache import ParseCache
+from m3u8.byteranges import RangeRequest
+from m3u8.fetcher import SegmentFetcher, FetchedSegment
+from m3u8.keys import KeyResolver, key_iv, segment_ivs
+from m3u8.compare import diff, PlaylistDiff
+from m3u8.stitching import stitch
+from m3u8.clip import PlaylistClip
 
 PYTHON_MAJOR_VERSION = sys.version_info
 
 __all__ = ('M3U8', 'Playlist', 'IFramePlaylist', 'Media',
-           'Segment', 'loads', 'load', 'parse', 'ParseError')
+           'Segment', 'LivePlaylistWriter', 'loads', 'load', 'parse',
+           'ParseError', 'ParseProfile', 'Observer', 'InMemoryObserver',
+           'set_observer', 'get_observer', 'parse_many', 'ParseResult',
+           'ParseCache', 'RangeRequest', 'SegmentFetcher', 'FetchedSegment',
+           'KeyResolver', 'key_iv', 'segment_ivs', 'diff', 'PlaylistDiff',
+           'stitch', 'PlaylistClip', 'validate', 'ValidationReport',
+           'ValidationIssue')
+
+
+# urllib names this module used to import eagerly, still reachable as
+# m3u8.urlopen, m3u8.Request and m3u8.HTTPError. They are imported on
+# first use where modules support __getattr__ (python 3.7+), and at
+# import time before.
+if PYTHON_MAJOR_VERSION >= (3, 7):
+    def __getattr__(name):
+        if name in ('urlopen', 'Request', 'HTTPError'):
+            import urllib.request
+            return getattr(urllib.request, name)
+        raise AttributeError("module 'm3u8' has no attribute '%s'" % name)
+else:
+    try:
+        from urllib.request import urlopen, Request, HTTPError
+    except ImportError:  # Python 2.x
+        from urllib2 import urlopen, Request, HTTPError
+
+
+def loads(content, profile=None, cache=None):
+    '''
+    Given a string or bytes-like object with a m3u8 content, returns a
+    M3U8 object. Raises ValueError if invalid content
+    A `ParseProfile` can be given as `profile` to collect parse times.
+    A `ParseCache` can be given as `cache` to reuse previously parsed
+    contents.
+    '''
+    return _m3u8_for(content, None, profile, cache)
 
 
-def loads(content):
+def validate(content):
     '''
-    Given a string with a m3u8 content, returns a M3U8 object.
-    Raises ValueError if invalid content
+    Parses a m3u8 content, as `loads` does, and returns a `ValidationReport`
+    with every problem found
     '''
-    return M3U8(content)
+    report = ValidationReport()
+    parse(content, validation=report)
+    return report
 
 
-def load(uri, timeout=None, headers={}):
+def load(uri, timeout=None, headers={}, mmap=False, profile=None, cache=None):
     '''
     Retrieves the content from a given URI and returns a M3U8 object.
     Raises ValueError if invalid content or IOError if request fails.
     Raises socket.timeout(python 2.7+) or urllib2.URLError(python 2.6) if
     timeout happens when loading from uri
+
+    If `mmap` is true, local files are memory-mapped and parsed one line
+    at a time, so the whole content is never held in memory as a string.
+    The mapping is read-only, so the pages are shared with every other
+    process mapping or reading the same file.
+
+    A `ParseProfile` can be given as `profile` to collect parse times.
+    A `ParseCache` can be given as `cache` to reuse previously parsed
+    contents.
     '''
-    if is_url(uri):
-        return _load_from_uri(uri, timeout, headers)
-    else:
-        return _load_from_file(uri)
+    with span('load', uri=uri):
+        if is_url(uri):
+            return _load_from_uri(uri, timeout, headers, profile, cache)
+        elif mmap:
+            return _load_from_mapped_file(uri, profile, cache)
+        else:
+            return _load_from_file(uri, profile, cache)
+
+
+def _m3u8_for(content, base_uri, profile, cache):
+    if cache is not None:
+        return cache.load(content, base_uri=base_uri, profile=profile)
+    return M3U8(content, base_uri=base_uri, profile=profile)
 
 # Support for python3 inspired by https://github.com/szemtiv/m3u8/
 
 
-def _load_from_uri(uri, timeout=None, headers={}):
-    request = Request(uri, headers=headers)
-    resource = urlopen(request, timeout=timeout)
-    base_uri = _parsed_url(_url_for(request))
-    if PYTHON_MAJOR_VERSION < (3,):
-        content = _read_python2x(resource)
-    else:
-        content = _read_python3x(resource)
-    return M3U8(content, base_uri=base_uri)
+def _load_from_uri(uri, timeout=None, headers={}, profile=None, cache=None):
+    content, base_uri = _read_from_uri(uri, timeout, headers)
+    return _m3u8_for(content, base_uri, profile, cache)
+
 
+def _read_from_uri(uri, timeout=None, headers={}):
+    # Imported here: urllib brings in http, ssl and email modules, which
+    # are not needed to parse strings or files
+    try:
+        from urllib.request import urlopen, Request
+    except ImportError:  # Python 2.x
+        from urllib2 import urlopen, Request
 
-def _url_for(request):
-    return urlopen(request).geturl()
+    with span('load_from_uri', uri=uri) as attributes:
+        request = Request(uri, headers=headers)
+        resource = urlopen(request, timeout=timeout)
+        base_uri = _parsed_url(resource.geturl())
+        raw_content = resource.read()
+        attributes['bytes'] = len(raw_content)
+        if PYTHON_MAJOR_VERSION < (3,):
+            content = _read_python2x(raw_content)
+        else:
+            content = _read_python3x(resource, raw_content)
+    return content, base_uri
 
 
 def _parsed_url(url):
@@ -69,18 +144,43 @@ def _parsed_url(url):
     return urljoin(prefix, base_path)
 
 
-def _read_python2x(resource):
-    return resource.read().strip()
+def _read_python2x(raw_content):
+    return raw_content.strip()
 
 
-def _read_python3x(resource):
-    return resource.read().decode(
+def _read_python3x(resource, raw_content):
+    return raw_content.decode(
         resource.headers.get_content_charset(failobj="utf-8")
     )
 
 
-def _load_from_file(uri):
-    with open(uri) as fileobj:
-        raw_content = fileobj.read().strip()
-    base_uri = os.path.dirname(uri)
-    return M3U8(raw_content, base_uri=base_uri)
+def _load_from_file(uri, profile=None, cache=None):
+    raw_content, base_uri = _read_from_file(uri)
+    return _m3u8_for(raw_content, base_uri, profile, cache)
+
+
+def _read_from_file(uri):
+    # Read in text mode: universal newlines turn CR-only line endings
+    # into '\n', as the parser expects
+    with span('load_from_file', uri=uri) as attributes:
+        with open(uri) as fileobj:
+            attributes['bytes'] = os.fstat(fileobj.fileno()).st_size
+            raw_content = fileobj.read()
+    return raw_content, os.path.dirname(uri)
+
+
+def _load_from_mapped_file(uri, profile=None, cache=None):
+    with span('load_from_file', uri=uri) as attributes:
+        with open(uri, 'rb') as fileobj:
+            attributes['bytes'] = os.fstat(fileobj.fileno()).st_size
+            if attributes['bytes'] == 0:
+                # Empty files can not be mapped
+                mapped = b''
+            else:
+                mapped = memory_map(fileobj.fileno(), 0, access=ACCESS_READ)
+    try:
+        base_uri = os.path.dirname(uri)
+        return _m3u8_for(mapped, base_uri, profile, cache)
+    finally:
+        if mapped:
+            mapped.close()
@@ -0,0 +1,85 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Variant selection for adaptive bitrate streaming, see `PlaylistList.select`.
+'''
+
+from bisect import bisect_right
+
+SORT_ATTRIBUTES = ('bandwidth', 'average_bandwidth', 'resolution')
+
+
+class PlaylistIndex(object):
+    '''
+    Playlists of a `PlaylistList` sorted by each of `SORT_ATTRIBUTES`.
+    Built by `PlaylistList` on first use, `size` is the length of the list
+    it was built from.
+    '''
+
+    def __init__(self, playlists):
+        self.size = len(playlists)
+        entries = [(_stream_info(playlist), position, playlist)
+                   for position, playlist in enumerate(playlists)]
+        self._sorted = {}
+        for attribute in SORT_ATTRIBUTES:
+            sort_value = _SORT_VALUES[attribute]
+            # Ties keep the list order
+            ordered = sorted(entries, key=lambda entry: (sort_value(entry[0]), entry[1]))
+            self._sorted[attribute] = (
+                [sort_value(stream_info) for stream_info, _, _ in ordered],
+                [playlist for _, _, playlist in ordered],
+                [stream_info for stream_info, _, _ in ordered],
+                [_codec_families(stream_info) for stream_info, _, _ in ordered])
+
+    def sorted_by(self, attribute):
+        return list(self._sorted[attribute][1])
+
+    def select(self, bandwidth, average=False, max_resolution=None, codecs=None):
+        values, playlists, stream_infos, families = \
+            self._sorted['average_bandwidth' if average else 'bandwidth']
+        if codecs is not None:
+            codecs = frozenset(codec.lower() for codec in codecs)
+        # Highest bandwidth first, down to the first one within the limits
+        for position in range(bisect_right(values, bandwidth) - 1, -1, -1):
+            resolution = stream_infos[position].resolution
+            if (max_resolution is not None and resolution is not None and
+                    (resolution[0] > max_resolution[0] or
+                     resolution[1] > max_resolution[1])):
+                continue
+            if codecs is not None and not families[position] <= codecs:
+                continue
+            return playlists[position]
+        return None
+
+
+def _stream_info(playlist):
+    stream_info = getattr(playlist, 'stream_info', None)
+    if stream_info is None:
+        stream_info = playlist.iframe_stream_info
+    return stream_info
+
+
+def _codec_families(stream_info):
+    # ex.: "avc1.640028,mp4a.40.2" -> {'avc1', 'mp4a'}
+    if not stream_info.codecs:
+        return frozenset()
+    return frozenset(codec.strip().split('.')[0].lower()
+                     for codec in stream_info.codecs.split(','))
+
+
+def _resolution_value(stream_info):
+    if stream_info.resolution is None:
+        return (0, stream_info.bandwidth or 0)
+    width, height = stream_info.resolution
+    return (width * height, stream_info.bandwidth or 0)
+
+
+_SORT_VALUES = {
+    'bandwidth': lambda stream_info: stream_info.bandwidth or 0,
+    'average_bandwidth': lambda stream_info: (stream_info.average_bandwidth or
+                                              stream_info.bandwidth or 0),
+    'resolution': _resolution_value,
+}
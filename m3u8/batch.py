@@ -0,0 +1,87 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from collections import namedtuple
+
+import m3u8
+from m3u8.parser import parse, is_url
+
+
+class ParseResult(namedtuple('ParseResult',
+                             ['index', 'source', 'data', 'base_uri', 'error'])):
+    '''
+    Result of parsing one item with `parse_many`.
+
+    `index` is the position of the item in the input and `source` the item
+    itself if it is a uri, or None if it is content. `data` is the
+    dictionary returned by `parse` and `base_uri` the uri the content comes
+    from, if any. If the item failed, `data` is None and `error` is a
+    string with the exception name and message.
+    '''
+
+    __slots__ = ()
+
+
+def parse_many(items, workers=None, strict=False, chunksize=16, ordered=True,
+               timeout=None, headers={}):
+    '''
+    Parses many playlists using a pool of `workers` processes, by default
+    one per CPU. Returns an iterator of `ParseResult`, yielded as the items
+    are parsed.
+
+    `items` is an iterable of uris (file paths or urls, loaded like
+    `load` does) or m3u8 contents. Strings starting with '#' or with more
+    than one line, and bytes-like objects, are taken as content.
+
+    Items are sent to the workers in chunks of `chunksize`. If `ordered` is
+    false results are yielded as soon as they are ready, in any order.
+    An item that fails to load or parse yields a result with its `error`,
+    the remaining items are still parsed. With `workers=1` the items are
+    parsed in the current process.
+    '''
+    tasks = ((index, item, strict, timeout, headers)
+             for index, item in enumerate(items))
+    if workers == 1:
+        for task in tasks:
+            yield _parse_item(task)
+        return
+
+    import multiprocessing
+    pool = multiprocessing.Pool(workers)
+    try:
+        if ordered:
+            results = pool.imap(_parse_item, tasks, chunksize)
+        else:
+            results = pool.imap_unordered(_parse_item, tasks, chunksize)
+        for result in results:
+            yield result
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _is_content(item):
+    if not isinstance(item, (str, type(u''))):
+        return True
+    return item.startswith('#') or '\n' in item
+
+
+def _parse_item(task):
+    index, item, strict, timeout, headers = task
+    source = base_uri = None
+    try:
+        if _is_content(item):
+            content = item
+        else:
+            source = item
+            if is_url(item):
+                content, base_uri = m3u8._read_from_uri(item, timeout, headers)
+            else:
+                content, base_uri = m3u8._read_from_file(item)
+        return ParseResult(index, source, parse(content, strict), base_uri, None)
+    except Exception as error:
+        return ParseResult(index, source, None, base_uri,
+                           '%s: %s' % (type(error).__name__, error))
@@ -0,0 +1,220 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Compact binary representation of `M3U8` objects, see `M3U8.to_bytes` and
+`M3U8.from_bytes`.
+
+Segment attributes are stored as columns (a list per attribute) and
+encoded with `marshal`, which loads lists of strings and numbers much
+faster than parsing the text playlist or unpickling `Segment` objects.
+Keys and media are stored once and referenced by index, and program date
+times as microseconds from an anchor date time.
+
+`marshal` is not safe against malicious data: only load bytes produced by
+`to_bytes`.
+'''
+
+import datetime
+import marshal
+import struct
+
+from m3u8.parser import cast_date_time, format_date_time
+from m3u8.model import (M3U8, Segment, SegmentList, Key, Media, MediaList,
+                        Playlist, PlaylistList, IFramePlaylist)
+
+MAGIC = b'#M3U8BIN'
+FORMAT_VERSION = 2
+MARSHAL_VERSION = 2
+
+_HEADER = struct.Struct('!8sB')
+
+SEGMENT_ATTRIBUTES = ('uri', 'duration', 'title', 'byterange', 'byterange_length',
+                      'byterange_offset', 'discontinuity', 'cue_out', 'scte35',
+                      'scte35_duration')
+
+MEDIA_ATTRIBUTES = ('uri', 'type', 'group_id', 'language', 'name', 'default',
+                    'autoselect', 'forced', 'characteristics', 'assoc_language',
+                    'instream_id')
+
+
+def to_bytes(m3u8_obj):
+    date_times = _DateTimeEncoder()
+    keys = _KeyEncoder(m3u8_obj.keys)
+
+    attributes = {}
+    for attr, _ in M3U8.simple_attributes:
+        attributes[attr] = getattr(m3u8_obj, attr)
+    attributes['program_date_time'] = date_times.encode(m3u8_obj.program_date_time)
+
+    segments = dict((attr, [getattr(segment, attr) for segment in m3u8_obj.segments])
+                    for attr in SEGMENT_ATTRIBUTES)
+    segments['program_date_time'] = [date_times.encode(segment.program_date_time)
+                                     for segment in m3u8_obj.segments]
+    segments['key'] = [keys.encode(segment.key) for segment in m3u8_obj.segments]
+
+    media_indexes = dict((id(media), index) for index, media in enumerate(m3u8_obj.media))
+    payload = {
+        'attributes': attributes,
+        'base_uri': m3u8_obj.base_uri,
+        'base_path': m3u8_obj.base_path,
+        'segment_map': m3u8_obj.segment_map,
+        'segments': segments,
+        'keys': [keys.encode(key) for key in m3u8_obj.keys],
+        'key_list': keys.keys,
+        'date_times': date_times.anchors,
+        'media': [_encode_media(media) for media in m3u8_obj.media],
+        'playlists': [(playlist.uri, _encode_stream_info(playlist.stream_info),
+                       [media_indexes[id(media)] for media in playlist.media
+                        if id(media) in media_indexes])
+                      for playlist in m3u8_obj.playlists],
+        'iframe_playlists': [(playlist.uri,
+                              _encode_stream_info(playlist.iframe_stream_info))
+                             for playlist in m3u8_obj.iframe_playlists],
+    }
+    return _HEADER.pack(MAGIC, FORMAT_VERSION) + marshal.dumps(payload, MARSHAL_VERSION)
+
+
+def from_bytes(data, cls=M3U8):
+    payload = _load_payload(data)
+    base_uri = payload['base_uri']
+    date_times = _DateTimeDecoder(payload['date_times'])
+
+    obj = cls()
+    obj._uri_context.base_uri = base_uri
+    base_uri = obj._uri_context
+    obj._base_path = payload['base_path']
+    for attr, value in payload['attributes'].items():
+        setattr(obj, attr, value)
+    obj.program_date_time = date_times.decode(obj.program_date_time)
+    obj.segment_map = payload['segment_map']
+
+    key_list = [Key(base_uri=base_uri, method=method, uri=uri, iv=iv,
+                    keyformat=keyformat, keyformatversions=keyformatversions)
+                for method, uri, iv, keyformat, keyformatversions in payload['key_list']]
+    key_list.append(None)
+    obj.keys = [key_list[index] for index in payload['keys']]
+
+    segments = payload['segments']
+    columns = [segments[attr] for attr in SEGMENT_ATTRIBUTES]
+    columns.append([date_times.decode(value) for value in segments['program_date_time']])
+    columns.append([key_list[index] for index in segments['key']])
+    obj.segments = SegmentList([
+        Segment(uri, base_uri, program_date_time=program_date_time,
+                duration=duration, title=title, byterange=byterange,
+                byterange_length=byterange_length, byterange_offset=byterange_offset,
+                cue_out=cue_out, discontinuity=discontinuity, scte35=scte35,
+                scte35_duration=scte35_duration, keyobject=key)
+        for (uri, duration, title, byterange, byterange_length, byterange_offset,
+             discontinuity, cue_out, scte35, scte35_duration, program_date_time,
+             key) in zip(*columns)])
+
+    obj.files = []
+    for key in obj.keys:
+        if key and key.uri not in obj.files:
+            obj.files.append(key.uri)
+    obj.files.extend(obj.segments.uri)
+
+    obj.media = MediaList([Media(base_uri=base_uri, **media) for media in payload['media']])
+
+    obj.playlists = PlaylistList()
+    for uri, stream_info, media_indexes in payload['playlists']:
+        playlist = Playlist(uri, stream_info, [], base_uri)
+        playlist.media = [obj.media[index] for index in media_indexes]
+        obj.playlists.append(playlist)
+
+    obj.iframe_playlists = PlaylistList([
+        IFramePlaylist(base_uri, uri, iframe_stream_info)
+        for uri, iframe_stream_info in payload['iframe_playlists']])
+    obj.data = {}
+    return obj
+
+
+def _load_payload(data):
+    data = bytes(data)
+    if len(data) < _HEADER.size:
+        raise ValueError('Not a binary m3u8 playlist')
+    magic, version = _HEADER.unpack(data[:_HEADER.size])
+    if magic != MAGIC:
+        raise ValueError('Not a binary m3u8 playlist')
+    if version != FORMAT_VERSION:
+        raise ValueError('Unsupported binary m3u8 format version %d' % version)
+    return marshal.loads(data[_HEADER.size:])
+
+
+def _encode_media(media):
+    encoded = dict((attr, getattr(media, attr)) for attr in MEDIA_ATTRIBUTES)
+    encoded.update(media.extras)
+    return encoded
+
+
+def _encode_stream_info(stream_info):
+    encoded = dict(stream_info._asdict())
+    if stream_info.resolution:
+        encoded['resolution'] = '%dx%d' % stream_info.resolution
+    return encoded
+
+
+class _KeyEncoder(object):
+    '''
+    Numbers keys in order of appearance, by identity. None is -1.
+    '''
+
+    def __init__(self, keys):
+        self.keys = []
+        self._indexes = {}
+        for key in keys:
+            self.encode(key)
+
+    def encode(self, key):
+        if key is None:
+            return -1
+        index = self._indexes.get(id(key))
+        if index is None:
+            index = self._indexes[id(key)] = len(self.keys)
+            self.keys.append((key.method, key.uri, key.iv, key.keyformat,
+                              key.keyformatversions))
+        return index
+
+
+class _DateTimeEncoder(object):
+    '''
+    Encodes date times as (anchor index, microseconds from the anchor).
+    There is an anchor per utc offset, so decoded date times keep it.
+    '''
+
+    def __init__(self):
+        self.anchors = []
+        self._anchors = {}
+
+    def encode(self, value):
+        if value is None:
+            return None
+        offset = value.utcoffset()
+        anchor = self._anchors.get(offset)
+        if anchor is None:
+            anchor = self._anchors[offset] = (len(self.anchors), value)
+            self.anchors.append((format_date_time(value), offset is None))
+        index, anchor_value = anchor
+        delta = value - anchor_value
+        return index, (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+class _DateTimeDecoder(object):
+
+    def __init__(self, anchors):
+        self.anchors = []
+        for value, naive in anchors:
+            anchor = cast_date_time(value)
+            if naive:
+                anchor = anchor.replace(tzinfo=None)
+            self.anchors.append(anchor)
+
+    def decode(self, value):
+        if value is None:
+            return None
+        index, microseconds = value
+        return self.anchors[index] + datetime.timedelta(microseconds=microseconds)
+
@@ -0,0 +1,115 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Planning of HTTP range requests for segments stored as byteranges of a few
+large files, see `SegmentList.byterange_requests`.
+'''
+
+
+class RangeRequest(object):
+    '''
+    A request for a range of bytes of `uri`, covering the byteranges of one
+    or more segments.
+
+    `uri`
+      the absolute uri of the segments, or their uri if they have no
+      `base_uri`
+
+    `offset`, `length`
+      first byte and number of bytes to request. Both are None for
+      segments with no byterange, which need the whole resource
+
+    `segments`
+      the `Segment` objects covered, in playlist order
+    '''
+
+    def __init__(self, uri, offset, length, segments):
+        self.uri = uri
+        self.offset = offset
+        self.length = length
+        self.segments = segments
+
+    @property
+    def end(self):
+        if self.offset is None:
+            return None
+        return self.offset + self.length
+
+    @property
+    def range_header(self):
+        '''
+        The value of the Range header, ex.: "bytes=0-1023"
+        '''
+        if self.offset is None:
+            return None
+        return 'bytes=%d-%d' % (self.offset, self.end - 1)
+
+    def split(self, data, data_offset=None):
+        '''
+        Returns a list of (segment, memoryview) pairs, the bytes of each
+        segment in `data`. The views share the memory of `data`, nothing is
+        copied.
+
+        `data_offset` is the position of the first byte of `data` in the
+        resource. It defaults to `offset`, use 0 if the server ignored the
+        range and sent the whole resource.
+        '''
+        view = memoryview(data)
+        if self.offset is None:
+            return [(segment, view) for segment in self.segments]
+        if data_offset is None:
+            data_offset = self.offset
+        if data_offset > self.offset or data_offset + len(view) < self.end:
+            raise ValueError('Expected bytes %d-%d, got %d-%d' %
+                             (self.offset, self.end - 1, data_offset,
+                              data_offset + len(view) - 1))
+        return [(segment, view[segment.byterange_offset - data_offset:
+                               segment.byterange_offset - data_offset + segment.byterange_length])
+                for segment in self.segments]
+
+    def __repr__(self):
+        return '<RangeRequest %s %s, %d segments>' % (
+            self.uri, self.range_header or 'whole', len(self.segments))
+
+
+def plan_byterange_requests(segments, max_gap=0, max_request_size=None):
+    '''
+    Groups the byteranges of `segments` into `RangeRequest`s. Byteranges of
+    the same uri are merged while the bytes between them are at most
+    `max_gap` and the request is at most `max_request_size` bytes (no limit
+    if None). Bytes in gaps are requested but not assigned to any segment.
+
+    Requests are returned in the order of their first segment. Segments with
+    no byterange, or whose offset is unknown, get a request of their own.
+    '''
+    requests = []
+    open_requests = {}
+    for segment in segments:
+        uri = _uri(segment)
+        offset = segment.byterange_offset
+        length = segment.byterange_length
+        if offset is None or length is None:
+            requests.append(RangeRequest(uri, None, None, [segment]))
+            continue
+
+        end = offset + length
+        request = open_requests.get(uri)
+        if (request is not None and
+                request.offset <= offset <= request.end + max_gap and
+                (max_request_size is None or
+                 max(request.end, end) - request.offset <= max_request_size)):
+            request.length = max(request.end, end) - request.offset
+            request.segments.append(segment)
+        else:
+            request = open_requests[uri] = RangeRequest(uri, offset, length, [segment])
+            requests.append(request)
+    return requests
+
+
+def _uri(segment):
+    if segment.base_uri is None:
+        return segment.uri
+    return segment.absolute_uri
@@ -0,0 +1,172 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import errno
+import os
+
+from m3u8.model import M3U8
+
+try:
+    _replace = os.replace
+except AttributeError:  # Python 2.x
+    _replace = os.rename
+
+
+class ParseCache(object):
+    '''
+    Persistent cache of parsed playlists, stored in `directory` and keyed by
+    the SHA-256 of the playlist content. Pass it as `cache` to `load` or
+    `loads`: on a hit the `M3U8` object is restored from its binary format
+    (see `M3U8.to_bytes`) instead of parsing the content again, so a
+    `ParseProfile` given along with it is left unchanged.
+
+    `max_size`
+      maximum size of the cache files, in bytes. When it is exceeded the
+      least recently used entries are removed.
+
+    Several processes can share the same directory: entries are written to
+    a temporary file and renamed into place, so readers never see partial
+    entries, and an entry removed while being looked up is just a miss.
+
+    `hits` and `misses` count the lookups done by this object.
+    '''
+
+    extension = '.m3u8bin'
+
+    def __init__(self, directory, max_size=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        _makedirs(directory)
+        self._size = self._scan_size()
+
+    def key(self, content, strict=False):
+        import hashlib
+        if isinstance(content, type(u'')):
+            content = content.encode('utf-8')
+        key = hashlib.sha256(content).hexdigest()
+        # A strict parse can fail where a non strict one succeeded, so
+        # strict entries are only stored once a strict parse succeeded
+        return key + '-strict' if strict else key
+
+    def load(self, content, base_uri=None, strict=False, profile=None):
+        '''
+        Returns the M3U8 object for `content`, from the cache if present.
+        Otherwise it is parsed and stored. `profile` only collects times
+        when the content is parsed, it is left unchanged on a hit.
+        '''
+        key = self.key(content, strict)
+        obj = self._get(key)
+        if obj is None:
+            self.misses += 1
+            obj = M3U8(content, strict=strict, profile=profile)
+            self._set(key, obj.to_bytes())
+        else:
+            self.hits += 1
+        if base_uri:
+            obj.base_uri = base_uri if base_uri.endswith('/') else base_uri + '/'
+        return obj
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            _remove(path)
+        self._size = 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.extension)
+
+    def _get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fileobj:
+                data = fileobj.read()
+        except (IOError, OSError):
+            return None
+        try:
+            obj = M3U8.from_bytes(data)
+        except Exception:
+            # Written by an incompatible version, or damaged
+            _remove(path)
+            return None
+        # The modification time orders entries for eviction
+        _touch(path)
+        return obj
+
+    def _set(self, key, data):
+        import tempfile
+        path = self._path(key)
+        try:
+            _makedirs(os.path.dirname(path))
+            fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                                  suffix='.tmp')
+        except (IOError, OSError):
+            return
+        try:
+            with os.fdopen(fd, 'wb') as fileobj:
+                fileobj.write(data)
+            _replace(temporary_path, path)
+        except (IOError, OSError):
+            _remove(temporary_path)
+            return
+        self._size += len(data)
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        # Other processes share the directory, so the real size is checked
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        target = self.max_size * 0.9
+        for path, entry_size, _ in entries:
+            if size <= target:
+                break
+            if _remove(path):
+                size -= entry_size
+        self._size = size
+
+    def _scan_size(self):
+        return sum(entry[1] for entry in self._entries())
+
+    def _entries(self):
+        '''
+        Yields (path, size, modification time) of each cache entry
+        '''
+        for subdirectory in os.listdir(self.directory):
+            subdirectory = os.path.join(self.directory, subdirectory)
+            if not os.path.isdir(subdirectory):
+                continue
+            for filename in os.listdir(subdirectory):
+                if not filename.endswith(self.extension):
+                    continue
+                path = os.path.join(subdirectory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_size, stat.st_mtime
+
+
+def _makedirs(directory):
+    try:
+        os.makedirs(directory)
+    except OSError as error:
+        if error.errno != errno.EEXIST:
+            raise
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
+
+
+def _touch(path):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
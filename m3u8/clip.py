@@ -0,0 +1,168 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Time range views of media playlists, see `M3U8.clip`.
+'''
+
+from bisect import bisect_left, bisect_right
+import datetime
+import numbers
+
+from m3u8.model import M3U8, SegmentList, MediaList, PlaylistList
+
+
+class PlaylistClip(M3U8):
+    '''
+    The segments `first` to `last` (excluded) of the media playlist
+    `parent`, returned by `M3U8.clip`. Nothing is parsed or copied: the
+    segments, keys and base uri are shared with `parent`, so changing a
+    segment changes it in both. It has the header of `parent`, with the
+    media sequence, discontinuity sequence and program date time of its
+    first segment, and always an EXT-X-ENDLIST.
+    '''
+
+    def __init__(self, parent, first, last):
+        # M3U8.__init__ is not called, there is nothing to parse
+        self.parent = parent
+        self.first = first
+        self.last = last
+        self.data = {}
+        self.validation = None
+        for attribute, _ in self.simple_attributes:
+            setattr(self, attribute, getattr(parent, attribute))
+        timeline = _timeline(parent)
+        self.media_sequence = (parent.media_sequence or 0) + first
+        self.discontinuity_sequence = ((parent.discontinuity_sequence or 0) +
+                                       timeline.discontinuities[first])
+        self.program_date_time = (parent.segments[first].program_date_time
+                                  if first < last else None)
+        self.is_endlist = True
+        self._uri_context = parent._uri_context
+        self._base_path = None
+        self._segments = None
+        self.media = MediaList()
+        self.playlists = PlaylistList()
+        self.iframe_playlists = PlaylistList()
+        self.segment_map = parent.segment_map
+
+    @property
+    def segments(self):
+        if self._segments is None:
+            self._segments = SegmentList(self.parent.segments[self.first:self.last])
+        return self._segments
+
+    @segments.setter
+    def segments(self, segments):
+        self._segments = segments
+
+    @property
+    def keys(self):
+        # Same as `M3U8.keys`, for the segments of the clip
+        keys = []
+        seen = set()
+        for segment in self.segments:
+            if id(segment.key) not in seen:
+                seen.add(id(segment.key))
+                keys.append(segment.key)
+        return keys
+
+    @property
+    def files(self):
+        files = []
+        for key in self.keys:
+            if key and key.uri not in files:
+                files.append(key.uri)
+        files.extend(self.segments.uri)
+        return files
+
+
+class Timeline(object):
+    '''
+    Positions of the segments of a playlist, built by `M3U8.clip` on first
+    use and kept until the segment list or its length changes.
+
+    `starts`
+      start time of each segment in seconds, followed by the playlist
+      duration
+
+    `program_date_times`
+      program date time of each segment, expected in increasing order, or
+      None if some segment has none
+
+    `discontinuities`
+      number of discontinuities before each segment, and in the playlist
+    '''
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.size = len(segments)
+        self.starts = [0]
+        self.discontinuities = [0]
+        self.program_date_times = []
+        elapsed = 0
+        discontinuities = 0
+        for segment in segments:
+            elapsed += segment.duration or 0
+            self.starts.append(elapsed)
+            if segment.discontinuity:
+                discontinuities += 1
+            self.discontinuities.append(discontinuities)
+            if self.program_date_times is not None:
+                if segment.program_date_time is None:
+                    self.program_date_times = None
+                else:
+                    self.program_date_times.append(segment.program_date_time)
+
+    def is_current(self, segments):
+        return self.segments is segments and self.size == len(segments)
+
+    def segment_range(self, start, end):
+        '''
+        Returns the positions of the first and after the last segment
+        overlapping from `start` to `end`. Raises ValueError if they can
+        not be compared to the segment positions.
+        '''
+        bounds = [value for value in (start, end) if value is not None]
+        if all(isinstance(value, datetime.datetime) for value in bounds) and bounds:
+            if self.program_date_times is None:
+                raise ValueError('Clipping by date needs a program date time '
+                                 'for every segment')
+            if self.program_date_times:
+                aware = _is_aware(self.program_date_times[0])
+                if any(_is_aware(value) != aware for value in bounds):
+                    raise ValueError('Clipping dates must be %s, as the program '
+                                     'date times' % ('timezone aware' if aware else 'naive'))
+            positions = self.program_date_times
+        elif all(isinstance(value, numbers.Real) for value in bounds):
+            positions = self.starts
+        else:
+            raise ValueError('Clipping needs two numbers of seconds or two '
+                             'datetimes, got %r and %r' % (start, end))
+        first = 0
+        if start is not None:
+            first = max(bisect_right(positions, start) - 1, 0)
+        last = self.size
+        if end is not None:
+            last = min(max(bisect_left(positions, end), first), self.size)
+        return first, last
+
+
+def clip(m3u8_obj, start=None, end=None):
+    if m3u8_obj.is_variant:
+        raise ValueError('Only media playlists can be clipped')
+    first, last = _timeline(m3u8_obj).segment_range(start, end)
+    return PlaylistClip(m3u8_obj, first, last)
+
+
+def _is_aware(value):
+    return value.tzinfo is not None and value.utcoffset() is not None
+
+
+def _timeline(m3u8_obj):
+    timeline = m3u8_obj._timeline
+    if timeline is None or not timeline.is_current(m3u8_obj.segments):
+        timeline = m3u8_obj._timeline = Timeline(m3u8_obj.segments)
+    return timeline
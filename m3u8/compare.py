@@ -0,0 +1,176 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Structural comparison of two snapshots of a playlist, see `diff`.
+'''
+
+from operator import attrgetter
+
+from m3u8.model import M3U8
+
+# Segment attributes compared for segments present in both snapshots
+SEGMENT_ATTRIBUTES = ('duration', 'title', 'byterange', 'program_date_time',
+                      'discontinuity', 'cue_out', 'scte35', 'scte35_duration')
+
+_segment_values = attrgetter(*SEGMENT_ATTRIBUTES)
+
+
+class PlaylistDiff(object):
+    '''
+    Differences between two `M3U8` objects, returned by `diff`. It is true
+    if there is any difference.
+
+    `added_segments`, `removed_segments`
+      segments only in the new or only in the old playlist, in playlist
+      order. A segment whose uri changed is both removed and added
+
+    `changed_segments`
+      list of (old, new) segment pairs with the same position and uri but
+      a different key or different `SEGMENT_ATTRIBUTES`
+
+    `changed_attributes`
+      dictionary of the `M3U8.simple_attributes` that changed, ex.:
+      {'media_sequence': (1, 3)}
+
+    `added_keys`, `removed_keys`
+      `Key` objects only in the new or only in the old playlist
+
+    `added_playlists`, `removed_playlists`, `added_iframe_playlists`,
+    `removed_iframe_playlists`, `added_media`, `removed_media`
+      variants and media only in the new or only in the old playlist. One
+      whose attributes changed is both removed and added
+    '''
+
+    def __init__(self):
+        self.added_segments = []
+        self.removed_segments = []
+        self.changed_segments = []
+        self.changed_attributes = {}
+        self.added_keys = []
+        self.removed_keys = []
+        self.added_playlists = []
+        self.removed_playlists = []
+        self.added_iframe_playlists = []
+        self.removed_iframe_playlists = []
+        self.added_media = []
+        self.removed_media = []
+
+    def __bool__(self):
+        return any(value for value in vars(self).values())
+
+    __nonzero__ = __bool__
+
+    def __repr__(self):
+        return '<PlaylistDiff +%d -%d ~%d segments, %d attributes>' % (
+            len(self.added_segments), len(self.removed_segments),
+            len(self.changed_segments), len(self.changed_attributes))
+
+
+def diff(old, new):
+    '''
+    Compares two `M3U8` objects, usually consecutive reloads of the same
+    playlist, and returns a `PlaylistDiff`.
+
+    Segments are aligned by media sequence number, checked against their
+    uris. When the numbers do not line up (ex.: the sequence was reset)
+    they are aligned on the first segment uri found in both playlists.
+    The cost is linear in the number of segments, variants and keys.
+    '''
+    result = PlaylistDiff()
+    for attribute, _ in M3U8.simple_attributes:
+        old_value = getattr(old, attribute)
+        new_value = getattr(new, attribute)
+        if old_value != new_value:
+            result.changed_attributes[attribute] = (old_value, new_value)
+
+    _diff_segments(old, new, result)
+    result.removed_keys, result.added_keys = _diff_items(
+        [key for key in old.keys if key], [key for key in new.keys if key], _key_id)
+    result.removed_playlists, result.added_playlists = _diff_items(
+        old.playlists, new.playlists, str)
+    result.removed_iframe_playlists, result.added_iframe_playlists = _diff_items(
+        old.iframe_playlists, new.iframe_playlists, str)
+    result.removed_media, result.added_media = _diff_items(old.media, new.media, str)
+    return result
+
+
+def _diff_segments(old, new, result):
+    old_segments = old.segments
+    new_segments = new.segments
+    # Position in old_segments of new_segments[0], can be negative
+    shift = _align(old_segments, old.media_sequence or 0,
+                   new_segments, new.media_sequence or 0)
+    if shift is None:
+        result.removed_segments = list(old_segments)
+        result.added_segments = list(new_segments)
+        return
+
+    first = max(0, -shift)
+    last = min(len(new_segments), len(old_segments) - shift)
+    result.removed_segments.extend(old_segments[:first + shift])
+    result.added_segments.extend(new_segments[:first])
+    for position in range(first, last):
+        old_segment = old_segments[position + shift]
+        new_segment = new_segments[position]
+        if old_segment is new_segment:
+            continue
+        if old_segment.uri != new_segment.uri:
+            result.removed_segments.append(old_segment)
+            result.added_segments.append(new_segment)
+        elif _segment_changed(old_segment, new_segment):
+            result.changed_segments.append((old_segment, new_segment))
+    result.removed_segments.extend(old_segments[max(last, first) + shift:])
+    result.added_segments.extend(new_segments[max(last, first):])
+
+
+def _align(old_segments, old_sequence, new_segments, new_sequence):
+    if not old_segments or not new_segments:
+        return None
+    shift = new_sequence - old_sequence
+    if 0 <= shift < len(old_segments):
+        if old_segments[shift].uri == new_segments[0].uri:
+            return shift
+    elif 0 < -shift < len(new_segments):
+        if new_segments[-shift].uri == old_segments[0].uri:
+            return shift
+
+    position = _first_position(old_segments, new_segments[0].uri)
+    if position is not None:
+        return position
+    position = _first_position(new_segments, old_segments[0].uri)
+    if position is not None:
+        return -position
+    return None
+
+
+def _first_position(segments, uri):
+    for position, segment in enumerate(segments):
+        if segment.uri == uri:
+            return position
+    return None
+
+
+def _segment_changed(old_segment, new_segment):
+    if _segment_values(old_segment) != _segment_values(new_segment):
+        return True
+    return (old_segment.key is not new_segment.key and
+            _key_id(old_segment.key) != _key_id(new_segment.key))
+
+
+def _key_id(key):
+    if key is None:
+        return None
+    return (key.method, key.uri, key.iv, key.keyformat, key.keyformatversions)
+
+
+def _diff_items(old_items, new_items, identity):
+    # Returns (removed, added), each in the order of its own list
+    old_ids = [identity(item) for item in old_items]
+    new_ids = [identity(item) for item in new_items]
+    old_set = set(old_ids)
+    new_set = set(new_ids)
+    return ([item for item, id in zip(old_items, old_ids) if id not in new_set],
+            [item for item, id in zip(new_items, new_ids) if id not in old_set])
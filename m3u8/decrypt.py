@@ -0,0 +1,68 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Decryption of segments encrypted with METHOD=AES-128: AES-128 in CBC mode
+with PKCS7 padding, see `key_iv` for the initialization vector.
+
+Needs the optional `cryptography` package (``pip install m3u8[decrypt]``),
+imported on first use.
+'''
+
+
+class AES128Decryptor(object):
+    '''
+    Decrypts a segment a chunk at a time, so it never needs to be whole in
+    memory. Pass each encrypted chunk to `update`, in order, and call
+    `finalize` at the end, both return decrypted bytes.
+    Raises ValueError on invalid padding.
+    '''
+
+    def __init__(self, key, iv):
+        Cipher, algorithms, modes, padding, default_backend = _cryptography()
+        cipher = Cipher(algorithms.AES(bytes(key)), modes.CBC(bytes(iv)),
+                        backend=default_backend())
+        self._decryptor = cipher.decryptor()
+        self._unpadder = padding.PKCS7(128).unpadder()
+
+    def update(self, data):
+        return self._unpadder.update(self._decryptor.update(bytes(data)))
+
+    def finalize(self):
+        return self._unpadder.update(self._decryptor.finalize()) + self._unpadder.finalize()
+
+
+def decrypt(data, key, iv):
+    '''
+    Returns `data` decrypted with the `key` and `iv` bytes
+    '''
+    decryptor = AES128Decryptor(key, iv)
+    return decryptor.update(data) + decryptor.finalize()
+
+
+def decrypt_chunks(chunks, key, iv):
+    '''
+    Decrypts an iterable of encrypted chunks, yielding decrypted chunks as
+    they are consumed
+    '''
+    decryptor = AES128Decryptor(key, iv)
+    for chunk in chunks:
+        decrypted = decryptor.update(chunk)
+        if decrypted:
+            yield decrypted
+    decrypted = decryptor.finalize()
+    if decrypted:
+        yield decrypted
+
+
+def _cryptography():
+    try:
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import padding
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except ImportError:
+        raise ImportError('AES-128 decryption needs the cryptography package, '
+                          'install it with: pip install m3u8[decrypt]')
+    return Cipher, algorithms, modes, padding, default_backend
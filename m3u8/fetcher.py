@@ -0,0 +1,276 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from collections import deque, namedtuple
+import threading
+import time
+
+try:
+    from queue import Queue
+except ImportError:  # Python 2.x
+    from Queue import Queue
+
+from m3u8.parser import is_url
+from m3u8.observers import span
+from m3u8.keys import KeyResolver, key_iv
+from m3u8.decrypt import decrypt, decrypt_chunks
+
+
+class FetchedSegment(namedtuple('FetchedSegment', ['segment', 'data', 'key'])):
+    '''
+    A segment downloaded by `SegmentFetcher`. `data` is the content of the
+    segment (its byterange, if it has one), decrypted if the fetcher was
+    created with `decrypt`, and `key` the content of the key the segment
+    is encrypted with, or None if it is not encrypted.
+    '''
+
+    __slots__ = ()
+
+
+class SegmentFetcher(object):
+    '''
+    Downloads segments with a pool of threads, delivering them in playlist
+    order.
+
+    `workers`
+      number of concurrent downloads
+
+    `prefetch`
+      maximum number of segments downloaded ahead of the one being
+      consumed, at least `workers`. Defaults to twice `workers`
+
+    `retries`
+      number of times a download failing with IOError is retried, waiting
+      `retry_delay` seconds before each retry. HTTP client errors, such as
+      404, are not retried, except 408 and 429
+
+    `timeout`, `headers`
+      used for each request
+
+    `fetch`
+      function called as ``fetch(uri, offset, length, timeout, headers)``
+      to download `length` bytes of `uri` from `offset` (both None for the
+      whole resource). Defaults to `fetch_uri`
+
+    `key_resolver`
+      the `KeyResolver` keys are downloaded with, which can be shared
+      with other fetchers. By default each distinct key uri is downloaded
+      once, with `fetch` and retries, and kept for later `fetch` calls
+
+    `decrypt`
+      whether to decrypt METHOD=AES-128 segments, in the download threads.
+      Needs the cryptography package, see `m3u8.decrypt`
+    '''
+
+    def __init__(self, workers=4, prefetch=None, retries=2, retry_delay=0.5,
+                 timeout=None, headers={}, fetch=None, key_resolver=None,
+                 decrypt=False):
+        if workers < 1:
+            raise ValueError('workers must be a positive integer')
+        self.workers = workers
+        self.prefetch = max(prefetch or workers * 2, workers)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.timeout = timeout
+        self.headers = headers
+        self.fetch_function = fetch or fetch_uri
+        self.key_resolver = key_resolver or KeyResolver(fetch=self._fetch_key)
+        self.decrypt = decrypt
+
+    def fetch(self, segments, media_sequence=0):
+        '''
+        Returns an iterator of `FetchedSegment`, one for each segment of
+        `segments`, in the same order. If a segment can not be downloaded
+        its exception is raised when its turn comes, and the iteration
+        stops.
+
+        `media_sequence` is the sequence number of the first segment, used
+        to decrypt segments whose key has no IV. ex.:
+
+            fetcher.fetch(m3u8_obj.segments, m3u8_obj.media_sequence)
+        '''
+        jobs = Queue()
+        cancelled = threading.Event()
+        threads = [threading.Thread(target=self._work, args=(jobs, cancelled))
+                   for _ in range(self.workers)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        segments = enumerate(segments, media_sequence or 0)
+        pending = deque()
+        try:
+            for number, segment in segments:
+                pending.append(_Job(segment, number))
+                jobs.put(pending[-1])
+                if len(pending) == self.prefetch:
+                    break
+            while pending:
+                job = pending.popleft()
+                job.done.wait()
+                for number, segment in segments:
+                    pending.append(_Job(segment, number))
+                    jobs.put(pending[-1])
+                    break
+                if job.error is not None:
+                    raise job.error
+                yield job.result
+        finally:
+            cancelled.set()
+            for _ in threads:
+                jobs.put(None)
+
+    def fetch_segment(self, segment, media_sequence=None):
+        '''
+        Downloads a single segment, returns a `FetchedSegment`.
+        `media_sequence` is the segment sequence number.
+        '''
+        key = None
+        if _is_encrypted(segment):
+            key = self.fetch_key(segment.key)
+        uri = segment.absolute_uri
+        with span('fetch_segment', uri=uri) as attributes:
+            data = self._fetch(uri, segment.byterange_offset, segment.byterange_length)
+            attributes['bytes'] = len(data)
+        if key is not None and self.decrypt and segment.key.method == 'AES-128':
+            data = decrypt(data, key, _segment_iv(segment, media_sequence))
+        return FetchedSegment(segment, data, key)
+
+    def stream_segment(self, segment, media_sequence=None, chunk_size=64 * 1024):
+        '''
+        Returns an iterator of the content of `segment` in chunks, decrypted
+        as they arrive if the fetcher was created with `decrypt`, so at
+        most a chunk is held in memory. It is downloaded with `iter_uri`,
+        without retries.
+        '''
+        chunks = iter_uri(segment.absolute_uri, segment.byterange_offset,
+                          segment.byterange_length, self.timeout, self.headers,
+                          chunk_size)
+        if self.decrypt and _is_encrypted(segment) and segment.key.method == 'AES-128':
+            key = self.fetch_key(segment.key)
+            chunks = decrypt_chunks(chunks, key, _segment_iv(segment, media_sequence))
+        return chunks
+
+    def fetch_key(self, key):
+        '''
+        Returns the content of `key`, downloading it on first use
+        '''
+        return self.key_resolver.resolve(key)
+
+    def _fetch_key(self, uri, offset, length, timeout, headers):
+        return self._fetch(uri, offset, length)
+
+    def _fetch(self, uri, offset, length):
+        attempt = 0
+        while True:
+            try:
+                return self.fetch_function(uri, offset, length, self.timeout, self.headers)
+            except (IOError, OSError) as error:
+                if attempt == self.retries or not _is_retryable(error):
+                    raise
+                attempt += 1
+                time.sleep(self.retry_delay)
+
+    def _work(self, jobs, cancelled):
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            if not cancelled.is_set():
+                try:
+                    job.result = self.fetch_segment(job.segment, job.media_sequence)
+                except Exception as error:
+                    job.error = error
+            job.done.set()
+
+
+class _Job(object):
+
+    def __init__(self, segment, media_sequence):
+        self.segment = segment
+        self.media_sequence = media_sequence
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+def _is_retryable(error):
+    # HTTPError has the status code, the request would fail the same way
+    # again on client errors other than a timeout or too many requests
+    code = getattr(error, 'code', None)
+    return not (isinstance(code, int) and 400 <= code < 500 and code not in (408, 429))
+
+
+def _is_encrypted(segment):
+    return (segment.key is not None and segment.key.uri is not None and
+            segment.key.method != 'NONE')
+
+
+def _segment_iv(segment, media_sequence):
+    if not segment.key.iv and media_sequence is None:
+        raise ValueError('The media sequence number is needed to decrypt %s' %
+                         segment.uri)
+    return key_iv(segment.key, media_sequence)
+
+
+def fetch_uri(uri, offset=None, length=None, timeout=None, headers={}):
+    '''
+    Returns `length` bytes of `uri` starting at `offset`, or all of it if
+    they are None. `uri` is an url, requested with a Range header, or a
+    file path. Raises IOError if there are less than `length` bytes.
+    '''
+    return b''.join(iter_uri(uri, offset, length, timeout, headers))
+
+
+def iter_uri(uri, offset=None, length=None, timeout=None, headers={},
+             chunk_size=64 * 1024):
+    '''
+    Same as `fetch_uri`, yielding the content in chunks of up to
+    `chunk_size` bytes as they are read.
+    '''
+    if not is_url(uri):
+        with open(uri, 'rb') as fileobj:
+            if offset is not None:
+                fileobj.seek(offset)
+            for chunk in _read_chunks(fileobj, chunk_size, 0, length, uri):
+                yield chunk
+        return
+
+    try:
+        from urllib.request import urlopen, Request
+    except ImportError:  # Python 2.x
+        from urllib2 import urlopen, Request
+
+    if offset is not None:
+        headers = dict(headers, Range='bytes=%d-%d' % (offset, offset + length - 1))
+    resource = urlopen(Request(uri, headers=headers), timeout=timeout)
+    try:
+        skip = 0
+        if offset is not None and resource.getcode() == 200:
+            # The server ignored the Range header
+            skip = offset
+        for chunk in _read_chunks(resource, chunk_size, skip, length, uri):
+            yield chunk
+    finally:
+        resource.close()
+
+
+def _read_chunks(fileobj, chunk_size, skip, length, uri):
+    # Yields the `length` bytes (all if None) following the first `skip`
+    while skip:
+        skipped = len(fileobj.read(min(skip, chunk_size)))
+        if not skipped:
+            break
+        skip -= skipped
+    while length is None or length > 0:
+        chunk = fileobj.read(chunk_size if length is None else min(length, chunk_size))
+        if not chunk:
+            if length is not None:
+                raise IOError('%s ended %d bytes before the end of the byterange' %
+                              (uri, length))
+            return
+        if length is not None:
+            length -= len(chunk)
+        yield chunk
@@ -0,0 +1,141 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import binascii
+import struct
+import threading
+from timeit import default_timer
+
+from m3u8.observers import span
+
+
+class KeyResolver(object):
+    '''
+    Downloads the content of `Key` objects, caching it by `Key.absolute_uri`.
+    Can be shared by several threads and playlist reloads: a key requested
+    while it is being downloaded waits for that download instead of
+    starting another one.
+
+    `ttl`
+      seconds a key is kept, None (the default) keeps it forever
+
+    `fetch`
+      function called as ``fetch(uri, None, None, timeout, headers)`` to
+      download a key, as in `SegmentFetcher`. Defaults to `fetch_uri`
+
+    `timeout`, `headers`
+      passed to `fetch`
+    '''
+
+    def __init__(self, ttl=None, fetch=None, timeout=None, headers={}):
+        self.ttl = ttl
+        self.fetch_function = fetch
+        self.timeout = timeout
+        self.headers = headers
+        self._keys = {}
+        self._downloads = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, key):
+        '''
+        Returns the content of `key`, downloading it if it is not cached
+        or has expired. Errors are raised to every caller waiting for the
+        same download, and are not cached.
+        '''
+        uri = key.absolute_uri
+        with self._lock:
+            cached = self._keys.get(uri)
+            if cached is not None and (self.ttl is None or
+                                       default_timer() - cached[1] < self.ttl):
+                return cached[0]
+            download = self._downloads.get(uri)
+            owner = download is None
+            if owner:
+                download = self._downloads[uri] = _Download()
+
+        if not owner:
+            download.done.wait()
+            if download.error is not None:
+                raise download.error
+            return download.content
+
+        try:
+            with span('fetch_key', uri=uri):
+                download.content = self._fetch(uri)
+        except Exception as error:
+            download.error = error
+            raise
+        else:
+            with self._lock:
+                self._keys[uri] = (download.content, default_timer())
+        finally:
+            with self._lock:
+                del self._downloads[uri]
+            download.done.set()
+        return download.content
+
+    def invalidate(self, key):
+        '''
+        Removes `key` from the cache, so it is downloaded on next use
+        '''
+        with self._lock:
+            self._keys.pop(key.absolute_uri, None)
+
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+
+    def _fetch(self, uri):
+        fetch = self.fetch_function
+        if fetch is None:
+            from m3u8.fetcher import fetch_uri as fetch
+        return fetch(uri, None, None, self.timeout, self.headers)
+
+
+class _Download(object):
+
+    def __init__(self):
+        self.content = None
+        self.error = None
+        self.done = threading.Event()
+
+
+def key_iv(key, media_sequence):
+    '''
+    Returns the 16 bytes initialization vector of a segment encrypted with
+    `key`: its IV attribute if given, or the segment media sequence number
+    as a big endian integer
+    '''
+    if key.iv:
+        return _parse_iv(key.iv)
+    return struct.pack('>QQ', 0, media_sequence)
+
+
+def segment_ivs(m3u8_obj):
+    '''
+    Returns the initialization vector of each segment of `m3u8_obj`, as
+    in `key_iv`, or None for segments that are not encrypted. Each key IV
+    attribute is parsed once.
+    '''
+    ivs = []
+    parsed = {}
+    media_sequence = m3u8_obj.media_sequence or 0
+    for number, segment in enumerate(m3u8_obj.segments, media_sequence):
+        key = segment.key
+        if key is None or key.method == 'NONE' or key.uri is None:
+            ivs.append(None)
+        elif key.iv:
+            if id(key) not in parsed:
+                parsed[id(key)] = _parse_iv(key.iv)
+            ivs.append(parsed[id(key)])
+        else:
+            ivs.append(struct.pack('>QQ', 0, number))
+    return ivs
+
+
+def _parse_iv(iv):
+    # ex.: 0X10ef8f758ca555115584bb5b3c687f52, shorter values are left padded
+    value = iv[2:] if iv[:2] in ('0x', '0X') else iv
+    return binascii.unhexlify(value.rjust(32, '0'))
@@ -0,0 +1,132 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from collections import deque
+import math
+
+from m3u8.model import M3U8
+
+
+class LivePlaylistWriter(object):
+    '''
+    Builds a sliding window live playlist out of `Segment` objects.
+
+    Parameters:
+
+     `window_size`
+       maximum number of segments kept in the playlist. When a new segment
+       is appended to a full window the oldest one is dropped and
+       `media_sequence` is incremented. If the dropped segment started a
+       discontinuity, `discontinuity_sequence` is incremented as well.
+
+     `target_duration`
+       the EXT-X-TARGETDURATION. If not given it is computed as the
+       rounded up duration of the longest segment appended so far.
+
+     `media_sequence`
+       the EXT-X-MEDIA-SEQUENCE of the first segment appended
+
+     `discontinuity_sequence`
+       the EXT-X-DISCONTINUITY-SEQUENCE of the first segment appended
+
+     `version`
+       the EXT-X-VERSION, as is
+
+    Attributes:
+
+     `playlist`
+       the `M3U8` object holding the header attributes of the rendered
+       playlist (`media_sequence`, `target_duration`, `is_endlist`, ...)
+
+     `segments`
+       a deque with the `Segment`s currently in the window
+
+    Each segment is rendered only once, when appended, so `dumps()` costs
+    a single join over the window.
+    '''
+
+    def __init__(self, window_size, target_duration=None, media_sequence=0,
+                 discontinuity_sequence=0, version=None):
+        if window_size < 1:
+            raise ValueError('window_size must be a positive integer')
+        self.window_size = window_size
+        self.segments = deque()
+        self._rendered_segments = deque()
+        self._output = None
+        self._compute_target_duration = target_duration is None
+
+        self.playlist = M3U8()
+        self.playlist.media_sequence = media_sequence
+        self.playlist.discontinuity_sequence = discontinuity_sequence
+        self.playlist.target_duration = target_duration
+        self.playlist.version = version
+
+    @property
+    def media_sequence(self):
+        return self.playlist.media_sequence
+
+    @property
+    def discontinuity_sequence(self):
+        return self.playlist.discontinuity_sequence
+
+    def __len__(self):
+        return len(self.segments)
+
+    def append(self, segment):
+        '''
+        Adds `segment` to the end of the window, dropping the oldest one
+        if the window is full.
+        '''
+        if len(self.segments) == self.window_size:
+            self._drop_oldest()
+
+        last_segment = self.segments[-1] if self.segments else None
+        self.segments.append(segment)
+        self._rendered_segments.append(segment.dumps(last_segment))
+
+        if self._compute_target_duration and segment.duration:
+            target_duration = int(math.ceil(segment.duration))
+            if target_duration > (self.playlist.target_duration or 0):
+                self.playlist.target_duration = target_duration
+        self._output = None
+
+    def _drop_oldest(self):
+        dropped = self.segments.popleft()
+        self._rendered_segments.popleft()
+        self.playlist.media_sequence += 1
+        if dropped.discontinuity:
+            self.playlist.discontinuity_sequence += 1
+        if self.segments:
+            # The first segment is rendered with no previous one, so that
+            # its key is always written out
+            self._rendered_segments[0] = self.segments[0].dumps(None)
+
+    def end(self):
+        '''
+        Marks the playlist as finished (EXT-X-ENDLIST)
+        '''
+        self.playlist.is_endlist = True
+        self._output = None
+
+    def dumps(self):
+        '''
+        Returns the current window as a m3u8 string
+        '''
+        if self._output is None:
+            output = self.playlist._dumps_header()
+            output.append('\n'.join(self._rendered_segments))
+            if self.playlist.is_endlist:
+                output.append('#EXT-X-ENDLIST')
+            self._output = '\n'.join(output)
+        return self._output
+
+    def dump(self, filename):
+        '''
+        Saves the current window to ``filename``
+        '''
+        self.playlist._create_sub_directories(filename)
+
+        with open(filename, 'w') as fileobj:
+            fileobj.write(self.dumps())
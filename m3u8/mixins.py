@@ -1,5 +1,6 @@
 
 import os
+import re
 from m3u8.parser import is_url
 
 try:
@@ -15,18 +16,96 @@ def _urijoin(base_uri, path):
         return os.path.normpath(os.path.join(base_uri, path.strip('/')))
 
 
+# Relative uris that join as a plain suffix of the base uri directory: no
+# dot or empty path segments, query, fragment, scheme or whitespace.
+# Where the os separator is not '/', local paths would be rewritten by
+# `os.path.normpath`, so only single segment uris qualify
+_URI_SEGMENT = r'[^\x00-\x20/\\?#:;.][^\x00-\x20/\\?#:;]*'
+if os.sep == '/':
+    _SIMPLE_URI = re.compile(r'%s(?:/%s)*$' % (_URI_SEGMENT, _URI_SEGMENT))
+else:
+    _SIMPLE_URI = re.compile(_URI_SEGMENT + '$')
+
+
+class URIContext(object):
+    '''
+    Holds the `base_uri` shared by the items of a playlist. Items created
+    with a `URIContext` as `base_uri` reference it instead of keeping their
+    own copy, so changing `URIContext.base_uri` rebases all of them at once.
+    Absolute uris are memoized per uri, see `resolve`.
+    '''
+
+    __slots__ = ('_base_uri', '_resolved', '_prefix')
+
+    def __init__(self, base_uri=None):
+        self.base_uri = base_uri
+
+    @property
+    def base_uri(self):
+        return self._base_uri
+
+    @base_uri.setter
+    def base_uri(self, new_base_uri):
+        self._base_uri = new_base_uri
+        self._resolved = {}
+        self._prefix = None
+
+    def resolve(self, uri):
+        '''
+        Returns `uri` joined to `base_uri`, unless it is already a url.
+        '''
+        try:
+            return self._resolved[uri]
+        except KeyError:
+            pass
+        if is_url(uri):
+            absolute_uri = uri
+        elif self._base_uri is None:
+            raise ValueError('There can not be `absolute_uri` with no `base_uri` set')
+        elif _SIMPLE_URI.match(uri):
+            if self._prefix is None:
+                self._prefix = _urijoin(self._base_uri, '_')[:-1]
+            absolute_uri = self._prefix + uri
+        else:
+            absolute_uri = _urijoin(self._base_uri, uri)
+        self._resolved[uri] = absolute_uri
+        return absolute_uri
+
+    def __getstate__(self):
+        # A tuple: a false state, such as None, would skip __setstate__
+        return (self._base_uri,)
+
+    def __setstate__(self, state):
+        self.base_uri, = state
+
+    def __eq__(self, other):
+        return isinstance(other, URIContext) and self.base_uri == other.base_uri
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+
 class BasePathMixin(object):
 
+    @property
+    def base_uri(self):
+        return self._uri_context.base_uri
+
+    @base_uri.setter
+    def base_uri(self, new_base_uri):
+        # Setting a string detaches the item from a shared context
+        if isinstance(new_base_uri, URIContext):
+            self._uri_context = new_base_uri
+        else:
+            self._uri_context = URIContext(new_base_uri)
+
     @property
     def absolute_uri(self):
         if self.uri is None:
             return None
-        if is_url(self.uri):
-            return self.uri
-        else:
-            if self.base_uri is None:
-                raise ValueError('There can not be `absolute_uri` with no `base_uri` set')
-            return _urijoin(self.base_uri, self.uri)
+        return self._uri_context.resolve(self.uri)
 
     @property
     def base_path(self):
@@ -39,6 +118,59 @@ class BasePathMixin(object):
         self.uri = self.uri.replace(self.base_path, newbase_path)
 
 
+def rewrite_base_path(items, newbase_path):
+    '''
+    Sets `base_path` of all `items`, with the same result as setting it on
+    each one. Uris are grouped by directory and the rewrite of each group
+    is worked out once, so each uri is only scanned for its last separator.
+    Items with no uri are skipped.
+    '''
+    rewrites = {}
+    for item in items:
+        uri = item.uri
+        if uri is None:
+            continue
+        if _POSIX_PATHS:
+            # All uris sharing everything up to the last '/' share dirname()
+            directory = uri[:uri.rfind('/') + 1]
+        else:
+            directory = os.path.dirname(uri)
+        try:
+            base_path, prefix, replaced = rewrites[directory]
+        except KeyError:
+            base_path, prefix, replaced = rewrites[directory] = \
+                _base_path_rewrite(uri, newbase_path)
+        if base_path:
+            uri = uri[len(base_path):]
+            if replaced is not None:
+                uri = uri.replace(replaced, newbase_path)
+            item.uri = prefix + uri
+        elif replaced is None:
+            item.uri = prefix + uri
+        else:
+            item.uri = (prefix + uri).replace(replaced, newbase_path)
+
+
+_POSIX_PATHS = os.path.sep == '/' and os.path.altsep is None
+
+
+def _base_path_rewrite(uri, newbase_path):
+    # Same steps as the BasePathMixin.base_path setter, for all the uris in
+    # the directory of `uri`. Returns (base path, new prefix, path to
+    # replace in the rest of the uri or None if there is nothing to replace)
+    base_path = os.path.dirname(uri)
+    if base_path:
+        # `uri` starts with `base_path`, and the rest is some '/' then the
+        # file name. With posix paths, if `base_path` holds a '/' after
+        # something else it can not appear again in the rest
+        if _POSIX_PATHS and '/' in base_path.lstrip('/'):
+            return base_path, newbase_path, None
+        return base_path, newbase_path, base_path
+    prefix = '%s/' % newbase_path
+    replaced = os.path.dirname(prefix + uri)
+    return base_path, prefix, replaced if replaced != newbase_path else None
+
+
 class GroupedBasePathMixin(object):
 
     def _set_base_uri(self, new_base_uri):
@@ -48,7 +180,13 @@ class GroupedBasePathMixin(object):
     base_uri = property(None, _set_base_uri)
 
     def _set_base_path(self, newbase_path):
-        for item in self:
-            item.base_path = newbase_path
+        rewrite_base_path(self, newbase_path)
 
     base_path = property(None, _set_base_path)
+
+    def absolute_uris(self):
+        '''
+        Returns the `absolute_uri` of every item, as a list
+        '''
+        return [item._uri_context.resolve(item.uri) if item.uri is not None else None
+                for item in self]
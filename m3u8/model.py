@@ -7,9 +7,14 @@ from collections import namedtuple
 import os
 import errno
 import math
+from timeit import default_timer
 
-from m3u8.parser import parse, format_date_time
-from m3u8.mixins import BasePathMixin, GroupedBasePathMixin
+from m3u8.parser import parse, parse_byterange, format_date_time
+from m3u8.mixins import (BasePathMixin, GroupedBasePathMixin, URIContext,
+                         rewrite_base_path)
+from m3u8.observers import span
+from m3u8.byteranges import plan_byterange_requests
+from m3u8.abr import PlaylistIndex
 
 
 class M3U8(object):
@@ -20,7 +25,8 @@ class M3U8(object):
     Parameters:
 
      `content`
-       the m3u8 content as string
+       the m3u8 content as string or as an UTF-8 encoded bytes-like object
+       (bytes, bytearray or memoryview)
 
      `base_path`
        all urls (key and segments url) will be updated with this base_path,
@@ -32,8 +38,14 @@ class M3U8(object):
 
        can be passed as parameter or setted as an attribute to ``M3U8`` object.
      `base_uri`
-      uri the playlist comes from. it is propagated to SegmentList and Key
+      uri the playlist comes from. it is shared by the keys, segments, media
+      and playlists, setting it rebases all of them at once.
       ex.: http://example.com/path/to
+     `profile`
+      a `ParseProfile` object to collect parse and model construction times
+     `validation`
+      a `ValidationReport` object to collect the problems of the content
+      while it is parsed, instead of raising at the first one
 
     Attributes:
 
@@ -92,6 +104,10 @@ class M3U8(object):
         Returns the EXT-X-MEDIA-SEQUENCE as an integer
         http://tools.ietf.org/html/draft-pantos-http-live-streaming-07#section-3.3.3
 
+      `discontinuity_sequence`
+        Returns the EXT-X-DISCONTINUITY-SEQUENCE as an integer
+        https://tools.ietf.org/html/draft-pantos-http-live-streaming-16#section-4.3.3.3
+
       `program_date_time`
         Returns the EXT-X-PROGRAM-DATE-TIME as a string
         http://tools.ietf.org/html/draft-pantos-http-live-streaming-07#section-3.3.5
@@ -118,6 +134,9 @@ class M3U8(object):
         Returns true if EXT-X-INDEPENDENT-SEGMENTS tag present in M3U8.
         https://tools.ietf.org/html/draft-pantos-http-live-streaming-13#section-3.4.16
 
+      `validation`
+        The `ValidationReport` given as parameter, or None
+
     '''
 
     simple_attributes = (
@@ -127,6 +146,7 @@ class M3U8(object):
         ('is_i_frames_only', 'is_i_frames_only'),
         ('target_duration',  'targetduration'),
         ('media_sequence',   'media_sequence'),
+        ('discontinuity_sequence', 'discontinuity_sequence'),
         ('program_date_time',   'program_date_time'),
         ('is_independent_segments', 'is_independent_segments'),
         ('version',          'version'),
@@ -134,24 +154,34 @@ class M3U8(object):
         ('playlist_type',    'playlist_type')
     )
 
-    def __init__(self, content=None, base_path=None, base_uri=None, strict=False):
+    # Segment start times for `clip`, see `m3u8.clip.Timeline`
+    _timeline = None
+
+    def __init__(self, content=None, base_path=None, base_uri=None, strict=False,
+                 profile=None, validation=None):
         if content is not None:
-            self.data = parse(content, strict)
+            self.data = parse(content, strict, profile, validation)
         else:
             self.data = {}
-        self._base_uri = base_uri
-        if self._base_uri:
-            if not self._base_uri.endswith('/'):
-                self._base_uri += '/'
+        self.validation = validation
+        if base_uri and not base_uri.endswith('/'):
+            base_uri += '/'
+        self._uri_context = URIContext(base_uri)
 
+        if profile is not None:
+            started = default_timer()
         self._initialize_attributes()
         self.base_path = base_path
+        if profile is not None:
+            profile.model_time += default_timer() - started
 
 
     def _initialize_attributes(self):
-        self.keys = [ Key(base_uri=self.base_uri, **params) if params else None
+        # Every item references the same URIContext, see `base_uri`
+        base_uri = self._uri_context
+        self.keys = [ Key(base_uri=base_uri, **params) if params else None
                       for params in self.data.get('keys', []) ]
-        self.segments = SegmentList([ Segment(base_uri=self.base_uri, keyobject=find_key(segment.get('key', {}), self.keys), **segment)
+        self.segments = SegmentList([ Segment(base_uri=base_uri, keyobject=find_key(segment.get('key', {}), self.keys), **segment)
                                       for segment in self.data.get('segments', []) ])
         #self.keys = get_uniques([ segment.key for segment in self.segments ])
         for attr, param in self.simple_attributes:
@@ -164,15 +194,15 @@ class M3U8(object):
                 self.files.append(key.uri)
         self.files.extend(self.segments.uri)
 
-        self.media = MediaList([ Media(base_uri=self.base_uri, **media)
+        self.media = MediaList([ Media(base_uri=base_uri, **media)
                                  for media in self.data.get('media', []) ])
 
-        self.playlists = PlaylistList([ Playlist(base_uri=self.base_uri, media=self.media, **playlist)
+        self.playlists = PlaylistList([ Playlist(base_uri=base_uri, media=self.media, **playlist)
                                         for playlist in self.data.get('playlists', []) ])
 
         self.iframe_playlists = PlaylistList()
         for ifr_pl in self.data.get('iframe_playlists', []):
-            self.iframe_playlists.append(IFramePlaylist(base_uri=self.base_uri,
+            self.iframe_playlists.append(IFramePlaylist(base_uri=base_uri,
                                          uri=ifr_pl['uri'],
                                          iframe_stream_info=ifr_pl['iframe_stream_info'])
                                         )
@@ -183,17 +213,20 @@ class M3U8(object):
 
     @property
     def base_uri(self):
-        return self._base_uri
+        return self._uri_context.base_uri
 
     @base_uri.setter
     def base_uri(self, new_base_uri):
-        self._base_uri = new_base_uri
-        self.media.base_uri = new_base_uri
-        self.playlists.base_uri = new_base_uri
-        self.segments.base_uri = new_base_uri
-        for key in self.keys:
-            if key:
-                key.base_uri = new_base_uri
+        # Keys, segments, media and playlists share the URIContext, so this
+        # rebases all of them. Items appended to the lists directly, or
+        # given a base_uri of their own, are attached to it again
+        context = self._uri_context
+        context.base_uri = new_base_uri
+        for items in (self.keys, self.segments, self.media, self.playlists,
+                      self.iframe_playlists):
+            for item in items:
+                if item is not None and item._uri_context is not context:
+                    item._uri_context = context
 
     @property
     def base_path(self):
@@ -207,9 +240,7 @@ class M3U8(object):
     def _update_base_path(self):
         if self._base_path is None:
             return
-        for key in self.keys:
-            if key:
-                key.base_path = self._base_path
+        rewrite_base_path([key for key in self.keys if key], self._base_path)
         self.media.base_path = self._base_path
         self.segments.base_path = self._base_path
         self.playlists.base_path = self._base_path
@@ -217,29 +248,62 @@ class M3U8(object):
 
     def add_playlist(self, playlist):
         self.is_variant = True
+        self._share_base_uri(playlist)
         self.playlists.append(playlist)
+        self.playlists.invalidate_index()
 
     def add_iframe_playlist(self, iframe_playlist):
         if iframe_playlist is not None:
             self.is_variant = True
+            self._share_base_uri(iframe_playlist)
             self.iframe_playlists.append(iframe_playlist)
+            self.iframe_playlists.invalidate_index()
 
     def add_media(self, media):
+        self._share_base_uri(media)
         self.media.append(media)
+        self.media.invalidate_index()
 
     def add_segment(self, segment):
+        self._share_base_uri(segment)
         self.segments.append(segment)
 
+    def _share_base_uri(self, item):
+        # Items without a base_uri of their own follow the playlist one
+        if item.base_uri is None:
+            item.base_uri = self._uri_context
+
     def dumps(self):
         '''
         Returns the current m3u8 as a string.
         You could also use unicode(<this obj>) or str(<this obj>)
         '''
+        with span('dumps', segments=len(self.segments)) as attributes:
+            output = self._dumps_header()
+            if self.is_variant:
+                if self.media:
+                    output.append(str(self.media))
+                output.append(str(self.playlists))
+                if self.iframe_playlists:
+                    output.append(str(self.iframe_playlists))
+            output.append(str(self.segments))
+
+            if self.is_endlist:
+                output.append('#EXT-X-ENDLIST')
+
+            content = '\n'.join(output)
+            attributes['size'] = len(content)
+        return content
+
+    def _dumps_header(self):
         output = ['#EXTM3U']
         if self.is_independent_segments:
             output.append('#EXT-X-INDEPENDENT-SEGMENTS')
         if self.media_sequence:
             output.append('#EXT-X-MEDIA-SEQUENCE:' + str(self.media_sequence))
+        if self.discontinuity_sequence:
+            output.append('#EXT-X-DISCONTINUITY-SEQUENCE:' +
+                          str(self.discontinuity_sequence))
         if self.allow_cache:
             output.append('#EXT-X-ALLOW-CACHE:' + self.allow_cache.upper())
         if self.version:
@@ -253,27 +317,52 @@ class M3U8(object):
             output.append('#EXT-X-PLAYLIST-TYPE:%s' % str(self.playlist_type).upper())
         if self.is_i_frames_only:
             output.append('#EXT-X-I-FRAMES-ONLY')
-        if self.is_variant:
-            if self.media:
-                output.append(str(self.media))
-            output.append(str(self.playlists))
-            if self.iframe_playlists:
-                output.append(str(self.iframe_playlists))
-        output.append(str(self.segments))
+        return output
+
+    def to_bytes(self):
+        '''
+        Returns the current m3u8 in a compact binary format, which
+        `M3U8.from_bytes` loads much faster than parsing the m3u8 text.
+        The format is versioned, and only bytes returned by this method
+        should be loaded: they are not checked against malicious content.
+        '''
+        from m3u8 import binary
+        return binary.to_bytes(self)
 
-        if self.is_endlist:
-            output.append('#EXT-X-ENDLIST')
+    @classmethod
+    def from_bytes(cls, data):
+        '''
+        Returns the M3U8 object saved with `to_bytes`, an instance of the
+        class it is called on.
+        Raises ValueError if `data` is not in a supported binary format.
+        '''
+        from m3u8 import binary
+        return binary.from_bytes(data, cls)
 
-        return '\n'.join(output)
+    def clip(self, start=None, end=None):
+        '''
+        Returns a `PlaylistClip` with the segments overlapping from `start`
+        to `end`, either seconds from the beginning of the playlist or
+        datetimes compared to the segments `program_date_time`. None means
+        the beginning or the end of the playlist.
+        The clip shares the segments of this playlist, and renders with
+        `dumps` like any `M3U8`. Segment start times are worked out on the
+        first call and kept until the segment list or its length changes,
+        so clipping is a binary search.
+        Raises ValueError for variant playlists.
+        '''
+        from m3u8.clip import clip
+        return clip(self, start, end)
 
     def dump(self, filename):
         '''
         Saves the current m3u8 to ``filename``
         '''
-        self._create_sub_directories(filename)
+        with span('dump', filename=filename):
+            self._create_sub_directories(filename)
 
-        with open(filename, 'w') as fileobj:
-            fileobj.write(self.dumps())
+            with open(filename, 'w') as fileobj:
+                fileobj.write(self.dumps())
 
     def _create_sub_directories(self, filename):
         basename = os.path.dirname(filename)
@@ -318,7 +407,19 @@ class Segment(BasePathMixin):
       uri the key comes from in URI hierarchy. ex.: http://example.com/path/to
 
     `byterange`
-      byterange attribute from EXT-X-BYTERANGE parameter
+      byterange attribute from EXT-X-BYTERANGE parameter, as a string.
+      ex.: "76242@0". Setting it sets `byterange_length` and
+      `byterange_offset`
+
+    `byterange_length`
+      length of the byterange in bytes, as an integer. Setting it updates
+      `byterange`
+
+    `byterange_offset`
+      offset of the byterange in bytes, as an integer. When the playlist
+      omits it, it is the end of the previous byterange of the same uri,
+      or None if there is no such byterange. Setting it updates
+      `byterange`, with the offset written unless it is None
 
     `key`
       Key used to encrypt the segment (EXT-X-KEY)
@@ -326,12 +427,23 @@ class Segment(BasePathMixin):
 
     def __init__(self, uri, base_uri, program_date_time=None, duration=None,
                  title=None, byterange=None, cue_out=False, discontinuity=False, key=None,
-                 scte35=None, scte35_duration=None, keyobject=None):
+                 scte35=None, scte35_duration=None, keyobject=None,
+                 byterange_length=None, byterange_offset=None):
         self.uri = uri
         self.duration = duration
         self.title = title
         self.base_uri = base_uri
-        self.byterange = byterange
+        # An offset resolved from the previous byterange is not written
+        # back to the byterange string
+        self._byterange = byterange
+        self._explicit_offset = bool(byterange) and '@' in byterange
+        if byterange and byterange_length is None:
+            byterange_length, byterange_offset = parse_byterange(byterange)
+        self._byterange_length = byterange_length
+        self._byterange_offset = byterange_offset
+        if not byterange and byterange_length is not None:
+            self._explicit_offset = byterange_offset is not None
+            self._update_byterange()
         self.program_date_time = program_date_time
         self.discontinuity = discontinuity
         self.cue_out = cue_out
@@ -340,11 +452,56 @@ class Segment(BasePathMixin):
         self.key = keyobject
         # Key(base_uri=base_uri, **key) if key else None
 
+    @property
+    def byterange(self):
+        return self._byterange
+
+    @byterange.setter
+    def byterange(self, byterange):
+        self._byterange = byterange
+        self._explicit_offset = bool(byterange) and '@' in byterange
+        if byterange:
+            self._byterange_length, self._byterange_offset = parse_byterange(byterange)
+        else:
+            self._byterange_length = self._byterange_offset = None
+
+    @property
+    def byterange_length(self):
+        return self._byterange_length
+
+    @byterange_length.setter
+    def byterange_length(self, byterange_length):
+        self._byterange_length = byterange_length
+        self._update_byterange()
+
+    @property
+    def byterange_offset(self):
+        return self._byterange_offset
+
+    @byterange_offset.setter
+    def byterange_offset(self, byterange_offset):
+        self._byterange_offset = byterange_offset
+        self._explicit_offset = byterange_offset is not None
+        self._update_byterange()
+
+    def _update_byterange(self):
+        if self._byterange_length is None:
+            self._byterange = None
+        elif self._explicit_offset and self._byterange_offset is not None:
+            self._byterange = '%d@%d' % (self._byterange_length, self._byterange_offset)
+        else:
+            self._byterange = '%d' % self._byterange_length
+
     def dumps(self, last_segment):
         output = []
         if last_segment and self.key != last_segment.key:
-            output.append(str(self.key))
-            output.append('\n')
+            if self.key is not None:
+                output.append(str(self.key))
+                output.append('\n')
+            elif last_segment.key.method != 'NONE':
+                # Segments following encrypted ones need an explicit
+                # METHOD=NONE to be unencrypted
+                output.append('#EXT-X-KEY:METHOD=NONE\n')
         else:
             # The key must be checked anyway now for the first segment
             if self.key and last_segment is None:
@@ -393,6 +550,15 @@ class SegmentList(list, GroupedBasePathMixin):
     def by_key(self, key):
         return [ segment for segment in self if segment.key == key ]
 
+    def byterange_requests(self, max_gap=0, max_request_size=None):
+        '''
+        Returns the list of `RangeRequest`s to fetch the segments, merging
+        byteranges of the same uri that are at most `max_gap` bytes apart
+        while a request is at most `max_request_size` bytes.
+        Use `RangeRequest.split` to get each segment from the response.
+        '''
+        return plan_byterange_requests(self, max_gap, max_request_size)
+
 
 
 class Key(BasePathMixin):
@@ -478,7 +644,7 @@ class Playlist(BasePathMixin):
             resolution_pair = None
 
         self.stream_info = StreamInfo(
-            bandwidth=stream_info['bandwidth'],
+            bandwidth=stream_info.get('bandwidth'),
             average_bandwidth=stream_info.get('average_bandwidth'),
             program_id=stream_info.get('program_id'),
             resolution=resolution_pair,
@@ -490,7 +656,10 @@ class Playlist(BasePathMixin):
             if not group_id:
                 continue
 
-            self.media += filter(lambda m: m.group_id == group_id, media)
+            if isinstance(media, MediaList):
+                self.media += media.by_group(group_id)
+            else:
+                self.media += filter(lambda m: m.group_id == group_id, media)
 
     def __str__(self):
         stream_inf = []
@@ -654,6 +823,14 @@ class Media(BasePathMixin):
 
 
 class MediaList(list, GroupedBasePathMixin):
+    '''
+    List of `Media` objects. `by_group` and `by_type` use an index built on
+    first use, and again when the length of the list changes. Call
+    `invalidate_index` after replacing media or changing their group_id or
+    type.
+    '''
+
+    _index = None
 
     def __str__(self):
         output = [str(playlist) for playlist in self]
@@ -663,13 +840,79 @@ class MediaList(list, GroupedBasePathMixin):
     def uri(self):
         return [media.uri for media in self]
 
+    def by_group(self, group_id):
+        '''
+        Returns the list of media with `group_id`, in playlist order
+        '''
+        return list(self._get_index()[0].get(group_id, ()))
+
+    def by_type(self, type):
+        '''
+        Returns the list of media of `type` (ex.: 'AUDIO'), in playlist order
+        '''
+        return list(self._get_index()[1].get(type, ()))
+
+    def invalidate_index(self):
+        self._index = None
+
+    def _get_index(self):
+        if self._index is None or self._index[2] != len(self):
+            groups = {}
+            types = {}
+            for media in self:
+                groups.setdefault(media.group_id, []).append(media)
+                types.setdefault(media.type, []).append(media)
+            self._index = (groups, types, len(self))
+        return self._index
+
 
 class PlaylistList(list, GroupedBasePathMixin):
+    '''
+    List of `Playlist` or `IFramePlaylist` objects. `select` and `sorted_by`
+    use an index built on first use, and again when the length of the list
+    changes. Call `invalidate_index` after replacing playlists or their
+    stream info.
+    '''
+
+    _index = None
 
     def __str__(self):
         output = [str(playlist) for playlist in self]
         return '\n'.join(output)
 
+    def select(self, bandwidth, average=False, max_resolution=None, codecs=None):
+        '''
+        Returns the playlist with the highest bandwidth not above
+        `bandwidth`, or None if there is none.
+
+        `average`
+          compare `average_bandwidth` (or `bandwidth` where missing)
+
+        `max_resolution`
+          a (width, height) tuple, playlists larger in any dimension are
+          skipped
+
+        `codecs`
+          the codec families supported, ex.: ['avc1', 'mp4a']. Playlists
+          with any other codec are skipped
+        '''
+        return self._get_index().select(bandwidth, average, max_resolution, codecs)
+
+    def sorted_by(self, attribute='bandwidth'):
+        '''
+        Returns the playlists sorted by `attribute`, in ascending order:
+        'bandwidth', 'average_bandwidth' or 'resolution' (number of pixels)
+        '''
+        return self._get_index().sorted_by(attribute)
+
+    def invalidate_index(self):
+        self._index = None
+
+    def _get_index(self):
+        if self._index is None or self._index.size != len(self):
+            self._index = PlaylistIndex(self)
+        return self._index
+
 
 def find_key(keydata, keylist):
     if not keydata:
@@ -0,0 +1,131 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+from contextlib import contextmanager
+from timeit import default_timer
+import threading
+
+
+class Observer(object):
+    '''
+    Receives the start and end of every load, parse and dump operation.
+    This base class does nothing, subclass it and register an instance with
+    `set_observer` to send them to a metrics or tracing system.
+
+    Span names and their attributes:
+
+      `load`            uri
+      `load_from_uri`   uri, bytes
+      `load_from_file`  uri, bytes
+      `parse`           size, segments, playlists
+      `dumps`           segments, size
+      `dump`            filename
+      `fetch_segment`   uri, bytes
+      `fetch_key`       uri
+
+    Attributes are filled in while the operation runs, so they are complete
+    only when `span_end` is called.
+    '''
+
+    def span_start(self, name, attributes):
+        pass
+
+    def span_end(self, name, attributes, duration, error):
+        '''
+        `duration` is in seconds. `error` is the exception raised by the
+        operation, or None if it succeeded.
+        '''
+        pass
+
+
+class SpanStats(object):
+    '''
+    Aggregated values of all spans with the same name
+
+    `count`
+      number of spans ended
+
+    `errors`
+      number of spans ended with an error
+
+    `total_duration`, `max_duration`
+      in seconds
+
+    `totals`
+      a dict with the sum of each numeric attribute, ex.: {'bytes': 1024}
+    '''
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.totals = {}
+
+    @property
+    def mean_duration(self):
+        return self.total_duration / self.count if self.count else 0.0
+
+
+class InMemoryObserver(Observer):
+    '''
+    Observer that aggregates spans in memory. `stats` is a dict of span
+    name to `SpanStats`. Safe to use from several threads.
+    '''
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def span_end(self, name, attributes, duration, error):
+        with self._lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = SpanStats()
+            stats.count += 1
+            if error is not None:
+                stats.errors += 1
+            stats.total_duration += duration
+            stats.max_duration = max(stats.max_duration, duration)
+            for attribute, value in attributes.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    stats.totals[attribute] = stats.totals.get(attribute, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+
+_observer = Observer()
+
+
+def set_observer(observer):
+    '''
+    Registers `observer` to receive the spans of every operation.
+    Pass None to restore the default, which does nothing.
+    '''
+    global _observer
+    _observer = observer if observer is not None else Observer()
+
+
+def get_observer():
+    return _observer
+
+
+@contextmanager
+def span(name, **attributes):
+    '''
+    Reports the operation run inside the ``with`` block to the registered
+    observer. Yields the attributes dict, which can be updated meanwhile.
+    '''
+    observer = _observer
+    observer.span_start(name, attributes)
+    started = default_timer()
+    try:
+        yield attributes
+    except Exception as error:
+        observer.span_end(name, attributes, default_timer() - started, error)
+        raise
+    observer.span_end(name, attributes, default_timer() - started, None)
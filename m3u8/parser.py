@@ -3,11 +3,15 @@
 # Use of this source code is governed by a MIT License
 # license that can be found in the LICENSE file.
 
-import iso8601
+import codecs
+from collections import namedtuple
 import datetime
 import itertools
+import mmap
 import re
+from timeit import default_timer
 from m3u8 import protocol
+from m3u8.observers import span
 
 '''
 http://tools.ietf.org/html/draft-pantos-http-live-streaming-08#section-3.2
@@ -17,6 +21,8 @@ ATTRIBUTELISTPATTERN = re.compile(r'''((?:[^,"']|"[^"]*"|'[^']*')+)''')
 
 
 def cast_date_time(value):
+    # Imported on first use, most playlists have no dates
+    import iso8601
     return iso8601.parse_date(value)
 
 
@@ -36,10 +42,169 @@ class ParseError(Exception):
 
 
 
-def parse(content, strict=False):
+class ParseProfile(object):
     '''
-    Given a M3U8 playlist content returns a dictionary with all data found
+    Collects where the time goes while parsing a playlist. Pass an instance
+    as `profile` to `parse`, `M3U8`, `loads` or `load`.
+
+    `lines`
+      total number of lines parsed
+
+    `size`
+      size of the parsed content, in bytes for bytes-like content and in
+      characters for strings
+
+    `parse_time`
+      seconds spent in `parse`
+
+    `model_time`
+      seconds spent building the `M3U8` attributes from the parsed data
+
+    `tag_lines`
+      a dict with the number of lines of each tag, ex.: {'#EXTINF': 100}.
+      Segment and playlist uris are counted as 'uri', other comments as
+      'comment' and blank lines as 'blank'
+
+    `tag_times`
+      a dict with the seconds spent handling the lines of each tag
+    '''
+
+    def __init__(self):
+        self.lines = 0
+        self.size = 0
+        self.parse_time = 0.0
+        self.model_time = 0.0
+        self.tag_lines = {}
+        self.tag_times = {}
+
+    def add_line(self, line, elapsed):
+        if line.startswith('#EXT'):
+            tag = line.split(':', 1)[0]
+        elif line.startswith('#'):
+            tag = 'comment'
+        elif line:
+            tag = 'uri'
+        else:
+            tag = 'blank'
+        self.lines += 1
+        self.tag_lines[tag] = self.tag_lines.get(tag, 0) + 1
+        self.tag_times[tag] = self.tag_times.get(tag, 0.0) + elapsed
+
+    def __str__(self):
+        output = ['%d lines, %d bytes, parse %.6fs, model %.6fs' %
+                  (self.lines, self.size, self.parse_time, self.model_time)]
+        for tag in sorted(self.tag_times, key=self.tag_times.get, reverse=True):
+            output.append('%s: %d lines, %.6fs' %
+                          (tag, self.tag_lines[tag], self.tag_times[tag]))
+        return '\n'.join(output)
+
+
+class ValidationIssue(namedtuple('ValidationIssue',
+                                 ['severity', 'code', 'lineno', 'line', 'message'])):
     '''
+    A problem found by a `ValidationReport`. `severity` is 'error' or
+    'warning' and `code` identifies the problem, see `ValidationReport`.
+    `lineno` and `line` are the line it was found on, both None for
+    problems of the whole playlist. `message` describes it.
+    '''
+
+    __slots__ = ()
+
+
+class ValidationReport(object):
+    '''
+    Collects every problem of a playlist while it is parsed, in the same
+    pass. Pass an instance as `validation` to `parse` or `M3U8`: lines
+    with problems are skipped instead of raising, and parsing goes on.
+
+    `errors`, `warnings`
+      lists of `ValidationIssue`, in line order
+
+    Error codes:
+
+      missing-extm3u
+        the first line is not #EXTM3U
+      unexpected-line
+        a line that is not a tag, a comment or the uri of a segment or
+        variant playlist. `parse` raises `ParseError` for it if strict
+      invalid-attribute
+        a tag whose value or attributes can not be parsed, ex.: an
+        EXT-X-BYTERANGE that is not <n>[@<o>] or a RESOLUTION that is not
+        <width>x<height>. The attribute is left out
+      missing-attribute
+        a tag without an attribute it requires: BANDWIDTH of
+        EXT-X-STREAM-INF and EXT-X-I-FRAME-STREAM-INF, METHOD of
+        EXT-X-KEY, or URI of EXT-X-KEY with a METHOD other than NONE.
+        Keys with no METHOD are left out, the previous key still applies
+      invalid-line
+        any other line that can not be parsed
+      invalid-extinf
+        an EXTINF with no comma after the duration
+      missing-uri
+        an EXTINF or EXT-X-STREAM-INF not followed by a uri
+      extinf-over-target-duration
+        an EXTINF duration, rounded to the nearest integer, greater than
+        the EXT-X-TARGETDURATION
+      missing-target-duration
+        a playlist with segments and no EXT-X-TARGETDURATION
+      duplicate-tag
+        a tag allowed once appearing again, ex.: EXT-X-MEDIA-SEQUENCE
+      media-sequence-after-segment
+        an EXT-X-MEDIA-SEQUENCE after the first segment, leaving the
+        sequence numbers of the segments before it undefined
+
+    Warning codes:
+
+      unsupported-tag
+        a tag this parser does not know, ignored
+    '''
+
+    def __init__(self):
+        self.errors = []
+        self.warnings = []
+
+    @property
+    def is_valid(self):
+        return not self.errors
+
+    def error(self, code, lineno, line, message):
+        self.errors.append(ValidationIssue('error', code, lineno, line, message))
+
+    def warning(self, code, lineno, line, message):
+        self.warnings.append(ValidationIssue('warning', code, lineno, line, message))
+
+    def __str__(self):
+        output = []
+        for issue in sorted(self.errors + self.warnings, key=_issue_order):
+            output.append('%s %s %s: %s' % (
+                'line %d' % issue.lineno if issue.lineno else 'playlist',
+                issue.severity, issue.code, issue.message))
+        return '\n'.join(output)
+
+
+def parse(content, strict=False, profile=None, validation=None):
+    '''
+    Given a M3U8 playlist content returns a dictionary with all data found.
+    `content` can be a string, a bytes-like object (bytes, bytearray or
+    memoryview) with UTF-8 encoded content or a `mmap.mmap` object, which
+    is decoded one line at a time.
+    If a `ParseProfile` is given as `profile`, line counts and time spent
+    are added to it per tag.
+    If a `ValidationReport` is given as `validation`, the problems found
+    are added to it instead of being raised, and `strict` is ignored.
+    '''
+    with span('parse', size=len(content)) as attributes:
+        data = _parse(content, strict, profile, validation)
+        attributes['segments'] = len(data['segments'])
+        attributes['playlists'] = len(data['playlists'])
+    return data
+
+
+def _parse(content, strict, profile, validation=None):
+    if profile is not None:
+        started = default_timer()
+        profile.size += len(content)
+
     data = {
         'media_sequence': 0,
         'is_variant': False,
@@ -60,110 +225,281 @@ def parse(content, strict=False):
         'current_key': None,
     }
 
+    # Validation state, kept apart from the parser state
+    checks = {'tags': set(), 'pending_durations': []}
+
     lineno = 0
-    for line in string_to_lines(content):
+    prevline = ''
+    for rawline in content_to_lines(content):
+        if profile is not None:
+            line_started = default_timer()
         lineno += 1
-        line = line.strip()
+        line = rawline.strip()
 
-        if line.startswith(protocol.ext_x_byterange):
-            _parse_byterange(line, state)
-            state['expect_segment'] = True
+        if validation is not None:
+            _validate_line(line, lineno, data, checks, validation)
 
-        elif line.startswith(protocol.ext_x_targetduration):
-            _parse_simple_parameter(line, data, float)
+        try:
+            if line.startswith(protocol.ext_x_byterange):
+                _parse_byterange(line, state)
+                state['expect_segment'] = True
 
-        elif line.startswith(protocol.ext_x_media_sequence):
-            _parse_simple_parameter(line, data, int)
+            elif line.startswith(protocol.ext_x_targetduration):
+                _parse_simple_parameter(line, data, float)
 
-        elif line.startswith(protocol.ext_x_program_date_time):
-            _, program_date_time = _parse_simple_parameter_raw_value(line, cast_date_time)
-            if not data.get('program_date_time'):
-                data['program_date_time'] = program_date_time
-            state['current_program_date_time'] = program_date_time
+            elif line.startswith(protocol.ext_x_media_sequence):
+                _parse_simple_parameter(line, data, int)
 
-        elif line.startswith(protocol.ext_x_discontinuity):
-            state['discontinuity'] = True
+            elif line.startswith(protocol.ext_x_program_date_time):
+                _, program_date_time = _parse_simple_parameter_raw_value(line, cast_date_time)
+                if not data.get('program_date_time'):
+                    data['program_date_time'] = program_date_time
+                state['current_program_date_time'] = program_date_time
 
-        elif line.startswith(protocol.ext_x_cue_out):
-            _parse_cueout(line, state)
-            state['cue_out'] = True
-            state['cue_start'] = True
+            elif line.startswith(protocol.ext_x_discontinuity_sequence):
+                _parse_simple_parameter(line, data, int)
 
-        elif line.startswith(protocol.ext_x_cue_out_start):
-            _parse_cueout_start(line, state, string_to_lines(content)[lineno - 2])
-            state['cue_out'] = True
-            state['cue_start'] = True
+            elif line.startswith(protocol.ext_x_discontinuity):
+                state['discontinuity'] = True
 
-        elif line.startswith(protocol.ext_x_cue_span):
-            state['cue_out'] = True
-            state['cue_start'] = True
+            elif line.startswith(protocol.ext_x_cue_out):
+                _parse_cueout(line, state)
+                state['cue_out'] = True
+                state['cue_start'] = True
 
-        elif line.startswith(protocol.ext_x_version):
-            _parse_simple_parameter(line, data)
+            elif line.startswith(protocol.ext_x_cue_out_start):
+                _parse_cueout_start(line, state, prevline)
+                state['cue_out'] = True
+                state['cue_start'] = True
 
-        elif line.startswith(protocol.ext_x_allow_cache):
-            _parse_simple_parameter(line, data)
+            elif line.startswith(protocol.ext_x_cue_span):
+                state['cue_out'] = True
+                state['cue_start'] = True
 
-        elif line.startswith(protocol.ext_x_key):
-            key = _parse_key(line)
-            state['current_key'] = key
-            if key not in data['keys']:
-                data['keys'].append(key)
+            elif line.startswith(protocol.ext_x_version):
+                _parse_simple_parameter(line, data)
 
-        elif line.startswith(protocol.extinf):
-            _parse_extinf(line, data, state, lineno, strict)
-            state['expect_segment'] = True
+            elif line.startswith(protocol.ext_x_allow_cache):
+                _parse_simple_parameter(line, data)
 
-        elif line.startswith(protocol.ext_x_stream_inf):
-            state['expect_playlist'] = True
-            _parse_stream_inf(line, data, state)
+            elif line.startswith(protocol.ext_x_key):
+                key = _parse_key(line)
+                state['current_key'] = key
+                if key not in data['keys']:
+                    data['keys'].append(key)
 
-        elif line.startswith(protocol.ext_x_i_frame_stream_inf):
-            _parse_i_frame_stream_inf(line, data)
+            elif line.startswith(protocol.extinf):
+                _parse_extinf(line, data, state, lineno, strict and validation is None)
+                state['expect_segment'] = True
 
-        elif line.startswith(protocol.ext_x_media):
-            _parse_media(line, data, state)
+            elif line.startswith(protocol.ext_x_stream_inf):
+                state['expect_playlist'] = True
+                _parse_stream_inf(line, data, state)
 
-        elif line.startswith(protocol.ext_x_playlist_type):
-            _parse_simple_parameter(line, data)
+            elif line.startswith(protocol.ext_x_i_frame_stream_inf):
+                _parse_i_frame_stream_inf(line, data)
 
-        elif line.startswith(protocol.ext_i_frames_only):
-            data['is_i_frames_only'] = True
+            elif line.startswith(protocol.ext_x_media):
+                _parse_media(line, data, state)
 
-        elif line.startswith(protocol.ext_is_independent_segments):
-            data['is_independent_segments'] = True
+            elif line.startswith(protocol.ext_x_playlist_type):
+                _parse_simple_parameter(line, data)
 
-        elif line.startswith(protocol.ext_x_endlist):
-            data['is_endlist'] = True
+            elif line.startswith(protocol.ext_i_frames_only):
+                data['is_i_frames_only'] = True
 
-        elif line.startswith(protocol.ext_x_map):
-            quoted_parser = remove_quotes_parser('uri')
-            segment_map_info = _parse_attribute_list(protocol.ext_x_map, line, quoted_parser)
-            data['segment_map'] = segment_map_info
+            elif line.startswith(protocol.ext_is_independent_segments):
+                data['is_independent_segments'] = True
 
-        # Comments and whitespace
-        elif line.startswith('#'):
-            # comment
-            pass
+            elif line.startswith(protocol.ext_x_endlist):
+                data['is_endlist'] = True
 
-        elif line.strip() == '':
-            # blank lines are legal
-            pass
+            elif line.startswith(protocol.ext_x_map):
+                quoted_parser = remove_quotes_parser('uri')
+                segment_map_info = _parse_attribute_list(protocol.ext_x_map, line, quoted_parser)
+                data['segment_map'] = segment_map_info
 
-        elif state['expect_segment']:
-            _parse_ts_chunk(line, data, state)
-            state['expect_segment'] = False
+            # Comments and whitespace
+            elif line.startswith('#'):
+                # comment
+                pass
 
-        elif state['expect_playlist']:
-            _parse_variant_playlist(line, data, state)
-            state['expect_playlist'] = False
+            elif line.strip() == '':
+                # blank lines are legal
+                pass
 
-        elif strict:
-            raise ParseError(lineno, line)
+            elif state['expect_segment']:
+                _parse_ts_chunk(line, data, state)
+                state['expect_segment'] = False
+
+            elif state['expect_playlist']:
+                _parse_variant_playlist(line, data, state)
+                state['expect_playlist'] = False
 
+            elif validation is not None:
+                validation.error('unexpected-line', lineno, line,
+                                 'Line is not a tag, a comment or an expected uri')
+
+            elif strict:
+                raise ParseError(lineno, line)
+        except Exception as error:
+            if validation is None:
+                raise
+            _recover_from_error(line, lineno, error, state, validation)
+        else:
+            if validation is not None and line.startswith('#EXT'):
+                _validate_attributes(line, lineno, data, state, checks, validation)
+
+        prevline = rawline
+        if profile is not None:
+            profile.add_line(line, default_timer() - line_started)
+
+    if validation is not None:
+        _validate_end(data, checks, validation)
+    if profile is not None:
+        profile.parse_time += default_timer() - started
     return data
 
 
+_KNOWN_TAGS = frozenset(['#EXTM3U'] + [value for name, value in vars(protocol).items()
+                                     if name.startswith('ext')])
+
+_RESOLUTION = re.compile(r'^\d+x\d+$')
+
+# Tags a playlist can only have once
+_SINGLE_TAGS = frozenset([protocol.ext_x_targetduration, protocol.ext_x_media_sequence,
+                          protocol.ext_x_discontinuity_sequence, protocol.ext_x_version,
+                          protocol.ext_x_playlist_type, protocol.ext_x_endlist])
+
+
+def _validate_line(line, lineno, data, checks, validation):
+    # Checks `line` before it is parsed, `checks` holds what later lines
+    # are checked against
+    if lineno == 1 and line != '#EXTM3U':
+        validation.error('missing-extm3u', lineno, line, 'The first line must be #EXTM3U')
+    if not line.startswith('#EXT'):
+        if line and not line.startswith('#'):
+            # A uri, for the pending EXTINF or EXT-X-STREAM-INF
+            checks.pop(protocol.extinf, None)
+            checks.pop(protocol.ext_x_stream_inf, None)
+        return
+
+    tag = line.split(':', 1)[0]
+    if tag not in _KNOWN_TAGS:
+        validation.warning('unsupported-tag', lineno, line, 'Unsupported tag %s, ignored' % tag)
+        return
+    if tag in _SINGLE_TAGS:
+        if tag in checks['tags']:
+            validation.error('duplicate-tag', lineno, line, '%s can only appear once' % tag)
+        checks['tags'].add(tag)
+
+    if tag == protocol.extinf or tag == protocol.ext_x_stream_inf:
+        if tag in checks:
+            pending_lineno, pending_line = checks[tag]
+            validation.error('missing-uri', pending_lineno, pending_line,
+                             '%s is not followed by a uri' % tag)
+        checks[tag] = (lineno, line)
+    if tag == protocol.extinf:
+        duration = line[len(protocol.extinf) + 1:]
+        if ',' not in duration:
+            validation.error('invalid-extinf', lineno, line,
+                             'EXTINF must have a comma after the duration')
+        try:
+            duration = float(duration.split(',', 1)[0])
+        except ValueError:
+            # Reported when the line is parsed
+            return
+        if 'targetduration' in data:
+            _check_duration(duration, lineno, line, data['targetduration'], validation)
+        else:
+            checks['pending_durations'].append((duration, lineno, line))
+    elif tag == protocol.ext_x_media_sequence and data['segments']:
+        validation.error('media-sequence-after-segment', lineno, line,
+                         'EXT-X-MEDIA-SEQUENCE must appear before the first segment')
+
+
+def _check_duration(duration, lineno, line, target_duration, validation):
+    if int(duration + 0.5) > target_duration:
+        validation.error('extinf-over-target-duration', lineno, line,
+                         'Duration %g is over the target duration %g' %
+                         (duration, target_duration))
+
+
+def _recover_from_error(line, lineno, error, state, validation):
+    if line.startswith('#'):
+        validation.error('invalid-attribute', lineno, line,
+                         '%s: %s' % (type(error).__name__, error))
+    else:
+        validation.error('invalid-line', lineno, line,
+                         '%s: %s' % (type(error).__name__, error))
+    # Go on as if the tag had been parsed, so the uri after it is not
+    # reported too
+    if line.startswith(protocol.extinf):
+        state['expect_segment'] = True
+    elif line.startswith(protocol.ext_x_stream_inf):
+        state['stream_info'] = {}
+
+
+def _validate_attributes(line, lineno, data, state, checks, validation):
+    # Checks the attributes `line` was parsed into. The ones left out are
+    # removed, so the model can still be built from `data`
+    if line.startswith(protocol.ext_x_byterange):
+        segment = state['segment']
+        if segment['byterange_length'] is None:
+            validation.error('invalid-attribute', lineno, line,
+                             'EXT-X-BYTERANGE must be <n>[@<o>]')
+            del segment['byterange'], segment['byterange_length'], segment['byterange_offset']
+    elif line.startswith(protocol.ext_x_key):
+        key = state['current_key']
+        if 'method' not in key:
+            validation.error('missing-attribute', lineno, line, 'EXT-X-KEY must have a METHOD')
+            # The previous key still applies
+            state['current_key'] = checks.get('key')
+            if key in data['keys'] and key != state['current_key']:
+                data['keys'].remove(key)
+            return
+        if key['method'] != 'NONE' and 'uri' not in key:
+            validation.error('missing-attribute', lineno, line,
+                             'EXT-X-KEY with METHOD=%s must have a URI' % key['method'])
+        checks['key'] = key
+    elif line.startswith(protocol.ext_x_stream_inf):
+        _validate_stream_info(state['stream_info'], lineno, line, validation)
+    elif line.startswith(protocol.ext_x_i_frame_stream_inf):
+        _validate_stream_info(data['iframe_playlists'][-1]['iframe_stream_info'],
+                              lineno, line, validation)
+
+
+def _validate_stream_info(stream_info, lineno, line, validation):
+    tag = line.split(':', 1)[0]
+    if 'bandwidth' not in stream_info:
+        validation.error('missing-attribute', lineno, line, '%s must have a BANDWIDTH' % tag)
+    resolution = stream_info.get('resolution')
+    if resolution is not None and not _RESOLUTION.match(resolution.strip('"')):
+        validation.error('invalid-attribute', lineno, line, 'RESOLUTION must be <width>x<height>')
+        del stream_info['resolution']
+
+
+def _validate_end(data, checks, validation):
+    for tag in (protocol.extinf, protocol.ext_x_stream_inf):
+        if tag in checks:
+            lineno, line = checks[tag]
+            validation.error('missing-uri', lineno, line, '%s is not followed by a uri' % tag)
+    target_duration = data.get('targetduration')
+    if target_duration is None:
+        if data['segments']:
+            validation.error('missing-target-duration', None, None,
+                             'The playlist has segments and no EXT-X-TARGETDURATION')
+    else:
+        for duration, lineno, line in checks['pending_durations']:
+            _check_duration(duration, lineno, line, target_duration, validation)
+    validation.errors.sort(key=_issue_order)
+    validation.warnings.sort(key=_issue_order)
+
+
+def _issue_order(issue):
+    return issue.lineno or 0
+
+
 def _parse_key(line):
     params = ATTRIBUTELISTPATTERN.split(line.replace(protocol.ext_x_key + ':', ''))[1::2]
     key = {}
@@ -193,13 +529,15 @@ def _parse_ts_chunk(line, data, state):
     segment = state.pop('segment')
     if state.get('current_program_date_time'):
         segment['program_date_time'] = state['current_program_date_time']
-        state['current_program_date_time'] += datetime.timedelta(seconds=segment['duration'])
+        state['current_program_date_time'] += datetime.timedelta(seconds=segment.get('duration') or 0)
     segment['uri'] = line
     segment['cue_out'] = state.pop('cue_out', False)
     if state.get('current_cue_out_scte35'):
         segment['scte35'] = state['current_cue_out_scte35']
         segment['scte35_duration'] = state['current_cue_out_duration']
     segment['discontinuity'] = state.pop('discontinuity', False)
+    if 'byterange' in segment:
+        _resolve_byterange_offset(segment, state)
     if state.get('current_key'):
         segment['key'] = state['current_key']
     else:
@@ -261,7 +599,33 @@ def _parse_variant_playlist(line, data, state):
 def _parse_byterange(line, state):
     if 'segment' not in state:
         state['segment'] = {}
-    state['segment']['byterange'] = line.replace(protocol.ext_x_byterange + ':', '')
+    byterange = line.replace(protocol.ext_x_byterange + ':', '')
+    length, offset = parse_byterange(byterange)
+    state['segment']['byterange'] = byterange
+    state['segment']['byterange_length'] = length
+    state['segment']['byterange_offset'] = offset
+
+
+def _resolve_byterange_offset(segment, state):
+    # A byterange with no offset starts right after the previous sub-range
+    # of the same uri
+    ends = state.setdefault('byterange_ends', {})
+    if segment['byterange_offset'] is None and segment['byterange_length'] is not None:
+        segment['byterange_offset'] = ends.get(segment['uri'])
+    if segment['byterange_offset'] is not None:
+        ends[segment['uri']] = segment['byterange_offset'] + segment['byterange_length']
+
+
+def parse_byterange(byterange):
+    '''
+    Returns the (length, offset) integers of a ``<n>[@<o>]`` byterange.
+    offset is None if not given, both are None if `byterange` is invalid.
+    '''
+    length, _, offset = byterange.partition('@')
+    try:
+        return int(length), int(offset) if offset else None
+    except ValueError:
+        return None, None
 
 
 def _parse_simple_parameter_raw_value(line, cast_to=str, normalize=False):
@@ -312,10 +676,78 @@ def _parse_cueout_start(line, state, prevline):
         state['current_cue_out_duration'] = _cueout_state[1]
 
 
+def decode_content(content, encoding='utf-8'):
+    '''
+    Returns `content` as a string. Bytes-like objects are decoded in a
+    single pass, memoryviews included, without being copied to bytes first.
+    '''
+    if isinstance(content, (bytearray, memoryview)) or \
+            (isinstance(content, bytes) and not isinstance(content, str)):
+        return codecs.decode(content, encoding)
+    return content
+
+
+def content_to_lines(content):
+    if isinstance(content, mmap.mmap):
+        return mmap_to_lines(content)
+    return string_to_lines(decode_content(content))
+
+
 def string_to_lines(string):
     return string.strip().replace('\r\n', '\n').split('\n')
 
 
+def mmap_to_lines(mapped, encoding='utf-8'):
+    '''
+    Yields the lines of a memory-mapped m3u8 content, decoding one line at
+    a time so the whole content is never held as a single string.
+    Lines end with '\n', '\r\n' or '\r', as in files read in text mode.
+    Leading blank lines are skipped, as `string_to_lines` does.
+    '''
+    if mapped.find(b'\r') == -1:
+        lines = _mapped_lines(mapped)
+    else:
+        lines = _mapped_lines_with_cr(mapped)
+    for line in lines:
+        if line.strip():
+            yield codecs.decode(line, encoding)
+            break
+    for line in lines:
+        yield codecs.decode(line, encoding)
+
+
+def _mapped_lines(mapped):
+    # readline() only breaks lines on '\n', and is faster than searching
+    mapped.seek(0)
+    line = mapped.readline()
+    while line:
+        yield line.rstrip(b'\n')
+        line = mapped.readline()
+
+
+def _mapped_lines_with_cr(mapped):
+    size = len(mapped)
+    start = 0
+    # Positions of the next '\n' and '\r', or `size` if there is none.
+    # Each one is only searched again once passed, so the content is
+    # scanned once
+    newline = carriage_return = -1
+    while start < size:
+        if newline < start:
+            newline = mapped.find(b'\n', start)
+            if newline == -1:
+                newline = size
+        if carriage_return < start:
+            carriage_return = mapped.find(b'\r', start)
+            if carriage_return == -1:
+                carriage_return = size
+        end = min(newline, carriage_return)
+        yield mapped[start:end]
+        start = end + 1
+        if end == carriage_return and start == newline:
+            start += 1
+
+
 def remove_quotes_parser(*attrs):
     return dict(zip(attrs, itertools.repeat(remove_quotes)))
 
@@ -341,4 +773,4 @@ def normalize_attribute(attribute):
 
 
 def is_url(uri):
-    return re.match(r'https?://', uri) is not None
+    return uri.startswith(('http://', 'https://'))
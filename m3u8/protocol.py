@@ -18,6 +18,7 @@ ext_i_frames_only = '#EXT-X-I-FRAMES-ONLY'
 ext_x_byterange = '#EXT-X-BYTERANGE'
 ext_x_i_frame_stream_inf = '#EXT-X-I-FRAME-STREAM-INF'
 ext_x_discontinuity = '#EXT-X-DISCONTINUITY'
+ext_x_discontinuity_sequence = '#EXT-X-DISCONTINUITY-SEQUENCE'
 ext_x_cue_out_start = '#EXT-X-CUE-OUT'
 ext_x_cue_out = '#EXT-X-CUE-OUT-CONT'
 ext_is_independent_segments = '#EXT-X-INDEPENDENT-SEGMENTS'
@@ -0,0 +1,151 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+'''
+Concatenation of media playlists, see `stitch`.
+'''
+
+from m3u8.model import M3U8, Segment, SegmentList, Key
+
+
+def stitch(sources, base_uri=None, discontinuity=True):
+    '''
+    Returns a new `M3U8` with the segments of each media playlist of
+    `sources`, in order, ex.: a pre-roll, the content and a post-roll.
+
+    `base_uri`
+      base uri of the result, defaults to the one of the first source.
+      Segment and key uris of sources with a different base uri are made
+      absolute, the others are kept as they are
+
+    `discontinuity`
+      whether to mark the first segment of each source after the first
+      one with EXT-X-DISCONTINUITY
+
+    Segments are shallow copies, sharing their attribute values with the
+    sources, so the sources are not changed. Each key is copied once and
+    the copy is shared by all the segments it encrypts, except keys with
+    no IV whose segments get a new media sequence number: their IV comes
+    from that number, so each segment gets a copy with the IV of its
+    source sequence number. The
+    header comes from the first source, except the target duration and
+    version, the highest of all sources, and the endlist, from the last
+    one. Raises ValueError if a source is a variant playlist, or if the
+    sources do not have the same EXT-X-MAP, since the result can only have
+    one.
+    '''
+    sources = list(sources)
+    for source in sources:
+        if source.is_variant:
+            raise ValueError('Only media playlists can be stitched')
+
+    result = M3U8(base_uri=base_uri if base_uri is not None else
+                  (sources[0].base_uri if sources else None))
+    if sources:
+        _stitch_header(sources, result)
+
+    context = result._uri_context
+    segment_maps = [_segment_map(source, context) for source in sources]
+    if any(segment_map != segment_maps[0] for segment_map in segment_maps):
+        raise ValueError('Sources with different EXT-X-MAP can not be stitched')
+    result.segment_map = segment_maps[0] if segment_maps else None
+    result_sequence = result.media_sequence or 0
+    segments = []
+    keys = []
+    used_keys = set()
+    none_key = None
+    encrypted = False
+    for number, source in enumerate(sources):
+        rebase = _is_rebased(source, context)
+        source_keys = {}
+        # Media sequence number of a segment in the source minus the one
+        # it gets in the result
+        shift = (source.media_sequence or 0) - result_sequence - len(segments)
+        first = True
+        for segment in source.segments:
+            copied = _copy_segment(segment)
+            copied._uri_context = context
+            if rebase:
+                copied.uri = segment.absolute_uri
+            if first and number and discontinuity:
+                copied.discontinuity = True
+            first = False
+
+            key = segment.key
+            if key is not None:
+                if shift and _has_implicit_iv(key):
+                    iv = '0x%032x' % (result_sequence + len(segments) + shift)
+                    key = _stitched_key(key, rebase, context, iv)
+                else:
+                    try:
+                        key = source_keys[id(segment.key)]
+                    except KeyError:
+                        key = _stitched_key(key, rebase, context)
+                        source_keys[id(segment.key)] = key
+                encrypted = encrypted or key.method != 'NONE'
+            elif encrypted:
+                # Unencrypted segments following encrypted ones need an
+                # explicit METHOD=NONE
+                if none_key is None:
+                    none_key = Key('NONE', context)
+                key = none_key
+            copied.key = key
+            if id(key) not in used_keys:
+                used_keys.add(id(key))
+                keys.append(key)
+            segments.append(copied)
+
+    result.keys = keys
+    result.segments = SegmentList(segments)
+    result.files = []
+    for key in keys:
+        if key and key.uri not in result.files:
+            result.files.append(key.uri)
+    result.files.extend(result.segments.uri)
+    return result
+
+
+def _stitch_header(sources, result):
+    first = sources[0]
+    for attribute, _ in M3U8.simple_attributes:
+        setattr(result, attribute, getattr(first, attribute))
+    result.is_endlist = sources[-1].is_endlist
+    result.is_independent_segments = all(source.is_independent_segments
+                                         for source in sources) or None
+    target_durations = [source.target_duration for source in sources
+                        if source.target_duration is not None]
+    result.target_duration = max(target_durations) if target_durations else None
+    versions = [source.version for source in sources if source.version]
+    result.version = max(versions, key=int) if versions else None
+
+
+def _is_rebased(source, context):
+    # Uris of `source` are made absolute in the result
+    return source.base_uri is not None and source.base_uri != context.base_uri
+
+
+def _segment_map(source, context):
+    segment_map = source.segment_map
+    if segment_map and 'uri' in segment_map and _is_rebased(source, context):
+        segment_map = dict(segment_map,
+                           uri=source._uri_context.resolve(segment_map['uri']))
+    return segment_map
+
+
+def _copy_segment(segment):
+    # Shallow copy, much cheaper than copy.copy()
+    copied = Segment.__new__(Segment)
+    copied.__dict__.update(segment.__dict__)
+    return copied
+
+
+def _has_implicit_iv(key):
+    return not key.iv and key.method != 'NONE' and key.uri is not None
+
+
+def _stitched_key(key, rebase, context, iv=None):
+    uri = key.absolute_uri if rebase else key.uri
+    return Key(key.method, context, uri=uri, iv=iv or key.iv,
+               keyformat=key.keyformat, keyformatversions=key.keyformatversions)
@@ -17,6 +17,7 @@ setup(
     zip_safe=False,
     include_package_data=True,
     install_requires=install_reqs,
+    extras_require={'decrypt': ['cryptography']},
     packages=["m3u8"],
     url="https://github.com/globocom/m3u8",
     description="Python m3u8 parser",
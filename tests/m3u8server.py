@@ -7,7 +7,7 @@
 
 from os.path import dirname, abspath, join
 
-from bottle import route, run, response, redirect
+from bottle import route, run, response, redirect, request, abort
 import bottle
 import time
 
@@ -33,6 +33,30 @@ def simple():
     response.set_header('Content-Type', 'application/vnd.apple.mpegurl')
     return m3u8_file('relative-playlist.m3u8')
 
+@route('/segments/<name>')
+def segment(name):
+    return segment_range(segment_content(name))
+
+failures = {}
+
+@route('/flaky/<name>')
+def flaky_segment(name):
+    # Fails the first request of each name
+    if name not in failures:
+        failures[name] = True
+        abort(503, 'Try again')
+    return segment_range(segment_content(name))
+
+def segment_content(name):
+    return (name * 1000).encode('ascii')
+
+def segment_range(content):
+    if request.headers.get('Range'):
+        start, end = request.headers['Range'].replace('bytes=', '').split('-')
+        response.status = 206
+        return content[int(start):int(end) + 1]
+    return content
+
 def m3u8_file(filename):
     with open(join(playlists, filename)) as fileobj:
         return fileobj.read().strip()
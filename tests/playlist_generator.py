@@ -0,0 +1,182 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+# Deterministic generator of large and mixed playlists, used by scale tests
+# and benchmarks. The same arguments and `seed` always build the same
+# playlist. Only `Random.random()` is used, its sequence for a given seed
+# is the same on every supported python version.
+
+import base64
+import datetime
+import random
+
+START_DATE_TIME = datetime.datetime(2014, 8, 13, 13, 36, 33)
+
+
+def generate_media_playlist(segments=100, seed=0, target_duration=6,
+                            media_sequence=0, key_rotation=0,
+                            program_date_time=0, discontinuity=0,
+                            cue_out=0, byterange=0, version=3, endlist=True):
+    '''
+    Returns a media playlist as string.
+
+    `segments`
+      number of segments
+
+    `key_rotation`
+      a new EXT-X-KEY is written every `key_rotation` segments.
+      0 means unencrypted segments
+
+    `program_date_time`
+      probability of each segment having an EXT-X-PROGRAM-DATE-TIME.
+      The first segment always has one if it is greater than 0
+
+    `discontinuity`
+      probability of each segment having an EXT-X-DISCONTINUITY
+
+    `cue_out`
+      probability of an ad break (SCTE-35 cue out, with cue out
+      continuations and cue in) starting at each segment
+
+    `byterange`
+      number of segments stored as byte ranges of each media file.
+      0 means a file per segment. Only the first range of each file has
+      an explicit offset
+    '''
+    rng = random.Random(seed)
+    output = ['#EXTM3U',
+              '#EXT-X-VERSION:%d' % version,
+              '#EXT-X-TARGETDURATION:%d' % target_duration,
+              '#EXT-X-MEDIA-SEQUENCE:%d' % media_sequence]
+    if endlist:
+        output.append('#EXT-X-PLAYLIST-TYPE:VOD')
+
+    date_time = START_DATE_TIME
+    ad_break_segments = 0
+    elapsed = 0
+    for number in range(segments):
+        sequence = media_sequence + number
+        duration = round(target_duration * (0.8 + 0.2 * rng.random()), 3)
+
+        if key_rotation and number % key_rotation == 0:
+            output.append('#EXT-X-KEY:METHOD=AES-128,URI="keys/key%d.bin",IV=0x%032x' %
+                          (number // key_rotation, sequence))
+        if discontinuity and number and rng.random() < discontinuity:
+            output.append('#EXT-X-DISCONTINUITY')
+        if program_date_time and (number == 0 or rng.random() < program_date_time):
+            output.append('#EXT-X-PROGRAM-DATE-TIME:%s+00:00' % date_time.isoformat())
+
+        if ad_break_segments:
+            elapsed += duration
+            ad_break_segments -= 1
+            if ad_break_segments:
+                output.append('#EXT-X-CUE-OUT-CONT:ElapsedTime=%.3f,Duration=%d,SCTE35=%s' %
+                              (elapsed, ad_break_duration, scte35))
+            else:
+                output.append('#EXT-X-CUE-IN')
+        elif cue_out and rng.random() < cue_out:
+            ad_break_segments = 2 + int(rng.random() * 4)
+            ad_break_duration = ad_break_segments * target_duration
+            elapsed = 0
+            scte35 = _scte35(rng)
+            output.append('#EXT-OATCLS-SCTE35:%s' % scte35)
+            output.append('#EXT-X-CUE-OUT:%d' % ad_break_duration)
+
+        output.append('#EXTINF:%.3f,' % duration)
+        if byterange:
+            length = 100000 + int(rng.random() * 900000)
+            if number % byterange == 0:
+                output.append('#EXT-X-BYTERANGE:%d@0' % length)
+            else:
+                output.append('#EXT-X-BYTERANGE:%d' % length)
+            output.append('media/file%d.ts' % (number // byterange))
+        else:
+            output.append('media/segment%d.ts' % sequence)
+
+        date_time += datetime.timedelta(seconds=duration)
+
+    if endlist:
+        output.append('#EXT-X-ENDLIST')
+    return '\n'.join(output) + '\n'
+
+
+def generate_master_playlist(variants=8, seed=0, audio_groups=1,
+                             audio_languages=2, subtitle_languages=0,
+                             iframe_playlists=True):
+    '''
+    Returns a master playlist as string.
+
+    `variants`
+      number of variant streams, from the lowest to the highest bandwidth
+
+    `audio_groups`
+      number of EXT-X-MEDIA audio groups, each with `audio_languages`
+      renditions. Variants are spread over the groups
+
+    `subtitle_languages`
+      number of EXT-X-MEDIA subtitle renditions, in a single group
+
+    `iframe_playlists`
+      whether each variant has an EXT-X-I-FRAME-STREAM-INF
+    '''
+    rng = random.Random(seed)
+    output = ['#EXTM3U', '#EXT-X-VERSION:4']
+    languages = _languages(max(audio_languages, subtitle_languages))
+
+    for group in range(audio_groups):
+        for language in languages[:audio_languages]:
+            output.append('#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aac%d",LANGUAGE="%s",'
+                          'NAME="%s",DEFAULT=%s,AUTOSELECT=YES,URI="audio/%d/%s.m3u8"' %
+                          (group, language, language.upper(),
+                           'YES' if language == languages[0] else 'NO',
+                           group, language))
+    for language in languages[:subtitle_languages]:
+        output.append('#EXT-X-MEDIA:TYPE=SUBTITLES,GROUP-ID="subs",LANGUAGE="%s",'
+                      'NAME="%s",AUTOSELECT=YES,FORCED=NO,URI="subs/%s.m3u8"' %
+                      (language, language.upper(), language))
+
+    iframe_output = []
+    bandwidth = 200000
+    for variant in range(variants):
+        bandwidth += int(bandwidth * (0.3 + 0.4 * rng.random()))
+        height = 144 + 1936 * variant // max(variants - 1, 1)
+        height -= height % 2
+        resolution = '%dx%d' % (height * 16 // 9, height)
+        attributes = ['PROGRAM-ID=1',
+                      'BANDWIDTH=%d' % bandwidth,
+                      'AVERAGE-BANDWIDTH=%d' % int(bandwidth * 0.8),
+                      'RESOLUTION=%s' % resolution,
+                      'CODECS="%s,mp4a.40.2"' % _video_codec(height)]
+        if audio_groups:
+            attributes.append('AUDIO="aac%d"' % (variant % audio_groups))
+        if subtitle_languages:
+            attributes.append('SUBTITLES="subs"')
+        output.append('#EXT-X-STREAM-INF:' + ','.join(attributes))
+        output.append('video/%d/index.m3u8' % bandwidth)
+        iframe_output.append('#EXT-X-I-FRAME-STREAM-INF:BANDWIDTH=%d,RESOLUTION=%s,'
+                             'URI="video/%d/iframes.m3u8"' %
+                             (bandwidth // 10, resolution, bandwidth))
+
+    if iframe_playlists:
+        output.extend(iframe_output)
+    return '\n'.join(output) + '\n'
+
+
+def _scte35(rng):
+    payload = bytearray(int(rng.random() * 256) for _ in range(30))
+    return base64.b64encode(bytes(payload)).decode('ascii')
+
+
+def _languages(count):
+    known = ['en', 'es', 'pt', 'fr', 'de', 'it', 'ja', 'zh', 'ko', 'ru']
+    return (known + ['l%d' % number for number in range(len(known), count)])[:count]
+
+
+def _video_codec(height):
+    if height >= 1080:
+        return 'avc1.640028'
+    elif height >= 720:
+        return 'avc1.4d401f'
+    return 'avc1.42c01e'
@@ -183,6 +183,28 @@ segment.ts
 #EXT-X-ENDLIST
 '''
 
+PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS = '''
+#EXTM3U
+#EXT-X-VERSION:4
+#EXT-X-TARGETDURATION:11
+#EXTINF:10,
+#EXT-X-BYTERANGE:1000@0
+video.ts
+#EXTINF:10,
+#EXT-X-BYTERANGE:500@0
+audio.ts
+#EXTINF:10,
+#EXT-X-BYTERANGE:2000
+video.ts
+#EXTINF:10,
+#EXT-X-BYTERANGE:600
+audio.ts
+#EXTINF:10,
+#EXT-X-BYTERANGE:700
+other.ts
+#EXT-X-ENDLIST
+'''
+
 PLAYLIST_WITH_ENCRIPTED_SEGMENTS_AND_IV = '''
 #EXTM3U
 #EXT-X-MEDIA-SEQUENCE:82400
@@ -616,6 +638,17 @@ MAP_URI_PLAYLIST_WITH_BYTERANGE = '''#EXTM3U
 #EXT-X-MAP:URI="main.mp4",BYTERANGE="812@0"
 '''
 
+SLIDING_WINDOW_PLAYLIST_WITH_DISCONTINUITY_SEQUENCE = '''#EXTM3U
+#EXT-X-MEDIA-SEQUENCE:2680
+#EXT-X-DISCONTINUITY-SEQUENCE:5
+#EXT-X-TARGETDURATION:8
+#EXTINF:8,
+https://priv.example.com/fileSequence2680.ts
+#EXT-X-DISCONTINUITY
+#EXTINF:8,
+https://priv.example.com/fileSequence2681.ts
+'''
+
 RELATIVE_PLAYLIST_FILENAME = abspath(join(dirname(__file__), 'playlists/relative-playlist.m3u8'))
 
 RELATIVE_PLAYLIST_URI = TEST_HOST + '/path/to/relative-playlist.m3u8'
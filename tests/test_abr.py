@@ -0,0 +1,78 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+import playlists
+from playlist_generator import generate_master_playlist
+
+MIXED_CODECS_PLAYLIST = '''#EXTM3U
+#EXT-X-STREAM-INF:BANDWIDTH=800000,AVERAGE-BANDWIDTH=700000,RESOLUTION=640x360,CODECS="avc1.4d401e,mp4a.40.2"
+avc/360p.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=2000000,AVERAGE-BANDWIDTH=1200000,RESOLUTION=1280x720,CODECS="hvc1.1.6.L93.B0,mp4a.40.2"
+hevc/720p.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=1500000,AVERAGE-BANDWIDTH=1400000,RESOLUTION=1280x720,CODECS="avc1.4d401f,mp4a.40.2"
+avc/720p.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=5000000,RESOLUTION=1920x1080,CODECS="avc1.640028,mp4a.40.2"
+avc/1080p.m3u8
+'''
+
+
+def test_select_should_return_highest_bandwidth_under_limit():
+    obj = m3u8.M3U8(generate_master_playlist(variants=10))
+    bandwidths = [playlist.stream_info.bandwidth for playlist in obj.playlists]
+
+    assert obj.playlists[4] == obj.playlists.select(bandwidths[4])
+    assert obj.playlists[4] == obj.playlists.select(bandwidths[5] - 1)
+    assert obj.playlists[-1] == obj.playlists.select(bandwidths[-1] * 10)
+    assert None == obj.playlists.select(bandwidths[0] - 1)
+
+
+def test_select_should_compare_average_bandwidth():
+    obj = m3u8.M3U8(MIXED_CODECS_PLAYLIST)
+
+    assert 'avc/720p.m3u8' == obj.playlists.select(1900000).uri
+    assert 'hevc/720p.m3u8' == obj.playlists.select(1300000, average=True).uri
+
+
+def test_select_should_skip_playlists_above_max_resolution():
+    obj = m3u8.M3U8(MIXED_CODECS_PLAYLIST)
+
+    assert 'avc/1080p.m3u8' == obj.playlists.select(10000000).uri
+    assert 'hevc/720p.m3u8' == obj.playlists.select(10000000, max_resolution=(1280, 720)).uri
+    assert 'avc/360p.m3u8' == obj.playlists.select(10000000, max_resolution=(854, 480)).uri
+
+
+def test_select_should_skip_unsupported_codecs():
+    obj = m3u8.M3U8(MIXED_CODECS_PLAYLIST)
+
+    assert 'hevc/720p.m3u8' == obj.playlists.select(3000000).uri
+    assert 'avc/720p.m3u8' == obj.playlists.select(3000000, codecs=['avc1', 'mp4a']).uri
+    assert None == obj.playlists.select(3000000, codecs=['avc1'])
+
+
+def test_sorted_by():
+    obj = m3u8.M3U8(MIXED_CODECS_PLAYLIST)
+
+    assert ['avc/360p.m3u8', 'avc/720p.m3u8', 'hevc/720p.m3u8', 'avc/1080p.m3u8'] == \
+        [playlist.uri for playlist in obj.playlists.sorted_by('bandwidth')]
+    assert ['avc/360p.m3u8', 'hevc/720p.m3u8', 'avc/720p.m3u8', 'avc/1080p.m3u8'] == \
+        [playlist.uri for playlist in obj.playlists.sorted_by('average_bandwidth')]
+    assert ['avc/360p.m3u8', 'avc/720p.m3u8', 'hevc/720p.m3u8', 'avc/1080p.m3u8'] == \
+        [playlist.uri for playlist in obj.playlists.sorted_by('resolution')]
+
+
+def test_index_should_follow_added_playlists():
+    obj = m3u8.M3U8(MIXED_CODECS_PLAYLIST)
+    assert 'avc/1080p.m3u8' == obj.playlists.select(10000000).uri
+
+    obj.add_playlist(m3u8.Playlist('avc/4k.m3u8', {'bandwidth': 9000000}, [], None))
+    assert 'avc/4k.m3u8' == obj.playlists.select(10000000).uri
+
+
+def test_select_should_work_on_iframe_playlists():
+    obj = m3u8.M3U8(playlists.VARIANT_PLAYLIST_WITH_IFRAME_PLAYLISTS)
+    selected = obj.iframe_playlists.select(100000)
+
+    assert selected.iframe_stream_info.bandwidth <= 100000
@@ -0,0 +1,49 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+import playlists
+
+
+def test_parse_many_should_parse_contents_and_files():
+    items = [playlists.SIMPLE_PLAYLIST,
+             playlists.SIMPLE_PLAYLIST_FILENAME,
+             playlists.VARIANT_PLAYLIST.encode('utf-8')]
+    results = list(m3u8.parse_many(items, workers=2, chunksize=1))
+
+    assert [0, 1, 2] == [result.index for result in results]
+    assert [None, None, None] == [result.error for result in results]
+    assert m3u8.parse(playlists.SIMPLE_PLAYLIST) == results[0].data
+    assert playlists.SIMPLE_PLAYLIST_FILENAME == results[1].source
+    assert 5220 == results[1].data['targetduration']
+    assert results[1].base_uri.endswith('playlists')
+    assert m3u8.parse(playlists.VARIANT_PLAYLIST) == results[2].data
+
+
+def test_parse_many_should_report_errors_without_aborting():
+    items = ['/does/not/exist.m3u8',
+             playlists.SIMPLE_PLAYLIST_MESSY,
+             playlists.SIMPLE_PLAYLIST]
+    results = list(m3u8.parse_many(items, workers=2, strict=True))
+
+    assert results[0].data is None
+    assert results[0].error.startswith('IOError') or \
+        results[0].error.startswith('FileNotFoundError')
+    assert 'ParseError: Syntax error in manifest on line 5: JUNK' == results[1].error
+    assert results[2].error is None
+
+
+def test_parse_many_unordered_should_return_every_item():
+    items = [playlists.SIMPLE_PLAYLIST] * 50
+    results = list(m3u8.parse_many(iter(items), workers=3, ordered=False))
+
+    assert list(range(50)) == sorted(result.index for result in results)
+
+
+def test_parse_many_should_run_in_process_with_one_worker():
+    results = list(m3u8.parse_many([playlists.SIMPLE_PLAYLIST_URI], workers=1))
+
+    assert results[0].error is None
+    assert 1 == len(results[0].data['segments'])
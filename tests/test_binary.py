@@ -0,0 +1,92 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import pickle
+
+import m3u8
+import playlists
+import pytest
+from playlist_generator import generate_media_playlist, generate_master_playlist
+
+ROUND_TRIP_PLAYLISTS = (
+    playlists.SIMPLE_PLAYLIST,
+    playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+    playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+    playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED,
+    playlists.PLAYLIST_USING_BYTERANGES,
+    playlists.CUE_OUT_ELEMENTAL_PLAYLIST,
+    playlists.VARIANT_PLAYLIST_WITH_IFRAME_PLAYLISTS,
+    playlists.MULTI_MEDIA_PLAYLIST,
+    playlists.MAP_URI_PLAYLIST_WITH_BYTERANGE,
+    playlists.SLIDING_WINDOW_PLAYLIST_WITH_DISCONTINUITY_SEQUENCE,
+)
+
+
+@pytest.mark.parametrize('content', ROUND_TRIP_PLAYLISTS)
+def test_from_bytes_should_dump_the_same_playlist(content):
+    obj = m3u8.M3U8(content, base_uri='http://example.com/path/')
+    loaded = m3u8.M3U8.from_bytes(obj.to_bytes())
+
+    assert obj.dumps() == loaded.dumps()
+    assert obj.base_uri == loaded.base_uri
+    assert obj.files == loaded.files
+    assert obj.segment_map == loaded.segment_map
+
+
+def test_from_bytes_should_keep_segment_attributes():
+    obj = m3u8.loads(generate_media_playlist(segments=200, key_rotation=7,
+                                             program_date_time=0.2,
+                                             discontinuity=0.1, cue_out=0.1))
+    loaded = m3u8.M3U8.from_bytes(obj.to_bytes())
+
+    for segment, loaded_segment in zip(obj.segments, loaded.segments):
+        assert vars(segment) == vars(loaded_segment)
+    assert obj.keys == loaded.keys
+    assert loaded.segments[-1].key is loaded.keys[-1]
+    assert obj.program_date_time == loaded.program_date_time
+    assert obj.program_date_time.utcoffset() == loaded.program_date_time.utcoffset()
+
+
+def test_from_bytes_should_link_playlists_to_media():
+    obj = m3u8.loads(generate_master_playlist(variants=4, audio_groups=2,
+                                              subtitle_languages=2))
+    loaded = m3u8.M3U8.from_bytes(obj.to_bytes())
+
+    assert obj.dumps() == loaded.dumps()
+    assert loaded.playlists[1].media[0] is loaded.media[2]
+    assert obj.playlists[0].stream_info == loaded.playlists[0].stream_info
+
+
+def test_from_bytes_should_keep_model_changes():
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST)
+    obj.add_segment(m3u8.Segment('new.ts', None, duration=4))
+    obj.media_sequence = 10
+
+    assert obj.dumps() == m3u8.M3U8.from_bytes(obj.to_bytes()).dumps()
+
+
+def test_from_bytes_should_return_an_instance_of_the_subclass():
+    class CustomM3U8(m3u8.M3U8):
+        pass
+
+    data = m3u8.loads(playlists.SIMPLE_PLAYLIST).to_bytes()
+    loaded = CustomM3U8.from_bytes(data)
+    assert isinstance(loaded, CustomM3U8)
+    assert playlists.SIMPLE_PLAYLIST.strip() == loaded.dumps().strip()
+
+
+def test_to_bytes_should_be_smaller_than_pickle():
+    obj = m3u8.loads(generate_media_playlist(segments=1000, key_rotation=100))
+    assert len(obj.to_bytes()) < len(pickle.dumps(obj, 2))
+
+
+def test_from_bytes_should_reject_invalid_data():
+    with pytest.raises(ValueError):
+        m3u8.M3U8.from_bytes(b'#EXTM3U')
+    data = bytearray(m3u8.loads(playlists.SIMPLE_PLAYLIST).to_bytes())
+    data[8] = 99
+    with pytest.raises(ValueError) as error:
+        m3u8.M3U8.from_bytes(data)
+    assert 'version 99' in str(error.value)
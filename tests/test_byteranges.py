@@ -0,0 +1,76 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import pytest
+
+import m3u8
+import playlists
+from playlist_generator import generate_media_playlist
+
+
+def test_contiguous_byteranges_should_be_merged():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS,
+                    base_uri='http://example.com/path/')
+    requests = obj.segments.byterange_requests()
+
+    assert 3 == len(requests)
+    video, audio, other = requests
+    assert 'http://example.com/path/video.ts' == video.uri
+    assert 'bytes=0-2999' == video.range_header
+    assert [obj.segments[0], obj.segments[2]] == video.segments
+    assert 'bytes=0-1099' == audio.range_header
+    assert None == other.range_header
+
+
+def test_byteranges_should_be_merged_up_to_max_gap():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_BYTERANGES)
+
+    # The last two byteranges overlap
+    assert 2 == len(obj.segments.byterange_requests())
+    requests = obj.segments.byterange_requests(max_gap=1000000)
+    assert 1 == len(requests)
+    assert 'segment.ts' == requests[0].uri
+    assert (0, 904285) == (requests[0].offset, requests[0].length)
+
+
+def test_byteranges_should_be_split_by_max_request_size():
+    obj = m3u8.loads(generate_media_playlist(segments=20, byterange=20))
+    segment_size = max(segment.byterange_length for segment in obj.segments)
+    requests = obj.segments.byterange_requests(max_request_size=segment_size * 4)
+
+    assert 1 < len(requests) < 20
+    assert all(request.length <= segment_size * 4 for request in requests)
+    assert obj.segments == [segment for request in requests for segment in request.segments]
+
+
+def test_split_should_return_views_of_each_segment():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS)
+    video = obj.segments.byterange_requests()[0]
+    data = bytearray(b'a' * 1000 + b'b' * 2000)
+
+    parts = video.split(data)
+    assert [obj.segments[0], obj.segments[2]] == [segment for segment, _ in parts]
+    assert b'a' * 1000 == parts[0][1].tobytes()
+    assert b'b' * 2000 == parts[1][1].tobytes()
+
+    data[0:1] = b'c'
+    assert b'c' == parts[0][1][:1].tobytes()
+
+
+def test_split_should_accept_whole_resource():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_BYTERANGES)
+    request = obj.segments.byterange_requests()[1]
+    data = bytes(bytearray(range(256))) * 4000
+
+    segment, view = request.split(data, data_offset=0)[0]
+    assert data[762421:762421 + 83442] == view.tobytes()
+
+
+def test_split_should_fail_on_short_data():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_BYTERANGES)
+    request = obj.segments.byterange_requests()[0]
+
+    with pytest.raises(ValueError):
+        request.split(b'short')
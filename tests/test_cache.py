@@ -0,0 +1,118 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import os
+
+import pytest
+
+import m3u8
+import playlists
+from playlist_generator import generate_media_playlist
+
+
+def test_loads_should_reuse_cached_playlist(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir))
+    first = m3u8.loads(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS, cache=cache)
+    second = m3u8.loads(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS, cache=cache)
+
+    assert 1 == cache.misses
+    assert 1 == cache.hits
+    assert first.dumps() == second.dumps()
+
+
+def test_strict_load_should_not_reuse_non_strict_entries(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir))
+    m3u8.loads(playlists.SIMPLE_PLAYLIST_COMMALESS_EXTINF, cache=cache)
+    with pytest.raises(m3u8.ParseError):
+        cache.load(playlists.SIMPLE_PLAYLIST_COMMALESS_EXTINF, strict=True)
+
+    cache.load(playlists.SIMPLE_PLAYLIST, strict=True)
+    obj = cache.load(playlists.SIMPLE_PLAYLIST, strict=True)
+    assert 1 == cache.hits
+    assert 5220 == obj.target_duration
+
+
+def test_profile_should_be_left_unchanged_on_a_hit(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir))
+    profile = m3u8.ParseProfile()
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, profile=profile, cache=cache)
+    assert 1 == profile.tag_lines['#EXTINF']
+
+    profile = m3u8.ParseProfile()
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, profile=profile, cache=cache)
+    assert 1 == cache.hits
+    assert 0 == profile.size
+    assert 0 == profile.parse_time
+
+
+def test_cache_should_be_shared_between_instances(tmpdir):
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, cache=m3u8.ParseCache(str(tmpdir)))
+    cache = m3u8.ParseCache(str(tmpdir))
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST.encode('utf-8'), cache=cache)
+
+    assert 1 == cache.hits
+    assert 'http://media.example.com/entire.ts' == obj.segments[0].uri
+
+
+def test_load_should_apply_base_uri_to_cached_playlist(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir.join('cache')))
+    with open(playlists.RELATIVE_PLAYLIST_FILENAME) as fileobj:
+        m3u8.loads(fileobj.read(), cache=cache)
+
+    obj = m3u8.load(playlists.RELATIVE_PLAYLIST_FILENAME, cache=cache)
+    expected = m3u8.load(playlists.RELATIVE_PLAYLIST_FILENAME)
+
+    assert 1 == cache.hits
+    assert expected.base_uri == obj.base_uri
+    assert expected.segments[1].absolute_uri == obj.segments[1].absolute_uri
+    assert expected.keys[0].absolute_uri == obj.keys[0].absolute_uri
+
+
+def test_load_should_cache_mapped_file(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir))
+    m3u8.load(playlists.SIMPLE_PLAYLIST_FILENAME, cache=cache)
+    obj = m3u8.load(playlists.SIMPLE_PLAYLIST_FILENAME, mmap=True, cache=cache)
+
+    assert 1 == cache.hits
+    assert 5220 == obj.target_duration
+
+
+def test_cache_should_evict_least_recently_used_entries(tmpdir):
+    contents = [generate_media_playlist(segments=50, seed=seed) for seed in range(4)]
+    size = len(m3u8.loads(contents[0]).to_bytes())
+    cache = m3u8.ParseCache(str(tmpdir), max_size=int(size * 3.5))
+
+    for content in contents[:3]:
+        m3u8.loads(content, cache=cache)
+    # Make the first entry the most recently used one
+    first = cache._path(cache.key(contents[0]))
+    os.utime(first, (os.path.getmtime(first) + 10,) * 2)
+    m3u8.loads(contents[3], cache=cache)
+
+    assert os.path.exists(first)
+    assert not os.path.exists(cache._path(cache.key(contents[1])))
+    assert cache._scan_size() <= cache.max_size
+
+
+def test_cache_should_ignore_damaged_entries(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir))
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, cache=cache)
+    with open(cache._path(cache.key(playlists.SIMPLE_PLAYLIST)), 'wb') as fileobj:
+        fileobj.write(b'garbage')
+
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST, cache=cache)
+
+    assert 2 == cache.misses
+    assert 5220 == obj.target_duration
+    assert m3u8.loads(playlists.SIMPLE_PLAYLIST, cache=cache)
+    assert 1 == cache.hits
+
+
+def test_clear_should_remove_every_entry(tmpdir):
+    cache = m3u8.ParseCache(str(tmpdir))
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, cache=cache)
+    cache.clear()
+
+    assert 0 == cache._scan_size()
@@ -0,0 +1,106 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import datetime
+
+import iso8601
+import pytest
+
+import m3u8
+import playlists
+
+
+def test_clip_should_share_the_segments_in_the_time_range():
+    obj = m3u8.loads(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    clip = obj.clip(4, 10)
+
+    assert isinstance(clip, m3u8.PlaylistClip)
+    assert ['g_50117.ts', 'g_50118.ts', 'g_50119.ts'] == clip.segments.uri
+    assert all(segment is obj.segments[1 + position]
+               for position, segment in enumerate(clip.segments))
+    assert 50117 == clip.media_sequence
+    assert 3 == clip.target_duration
+    assert {} == clip.data
+    assert None is clip.validation
+
+
+def test_clip_should_include_segments_overlapping_the_range():
+    obj = m3u8.loads(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    assert ['g_50116.ts'] == obj.clip(0, 3).segments.uri
+    assert ['g_50116.ts', 'g_50117.ts'] == obj.clip(2.9, 3.1).segments.uri
+    assert ['g_50122.ts', 'g_50123.ts'] == obj.clip(19).segments.uri
+    assert obj.segments.uri == obj.clip().segments.uri
+    assert [] == obj.clip(100, 200).segments
+
+
+def test_clip_dumps_should_have_the_header_of_its_first_segment():
+    obj = m3u8.loads(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    output = obj.clip(16, 22).dumps()
+
+    assert '#EXT-X-MEDIA-SEQUENCE:50121' in output
+    assert '#EXT-X-PROGRAM-DATE-TIME:2014-08-13T13:36:55+00:00' in output
+    assert output.strip().endswith('#EXT-X-ENDLIST')
+    assert 'g_50120.ts' not in output
+    assert '#EXT-X-DISCONTINUITY-SEQUENCE' not in output
+
+    output = obj.clip(19).dumps()
+    assert '#EXT-X-DISCONTINUITY-SEQUENCE:1' in output
+    assert '#EXT-X-PROGRAM-DATE-TIME:2014-08-13T13:36:58+00:00' in output
+    reloaded = m3u8.loads(output)
+    assert ['g_50122.ts', 'g_50123.ts'] == reloaded.segments.uri
+    assert 50122 == reloaded.media_sequence
+
+
+def test_clip_should_start_with_the_key_of_its_first_segment():
+    obj = m3u8.loads(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED)
+    clip = obj.clip(24, 50)
+
+    assert [obj.keys[1], obj.keys[2]] == clip.keys
+    output = clip.dumps()
+    assert output.index('/hls-key/key.bin') < output.index('streamNum82401.ts')
+    assert ['/hls-key/key.bin', '/hls-key/key2.bin'] == clip.files[:2]
+    assert [None] == obj.clip(0, 8).keys
+
+
+def test_clip_by_program_date_time():
+    obj = m3u8.loads(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    start = iso8601.parse_date('2014-08-13T13:36:40+00:00')
+    end = iso8601.parse_date('2014-08-13T13:36:56+00:00')
+    assert ['g_50118.ts', 'g_50119.ts', 'g_50120.ts', 'g_50121.ts'] == \
+        obj.clip(start, end).segments.uri
+
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST)
+    with pytest.raises(ValueError):
+        obj.clip(datetime.datetime(2014, 8, 13))
+
+
+def test_clip_should_reject_bounds_it_can_not_compare():
+    obj = m3u8.loads(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    start = iso8601.parse_date('2014-08-13T13:36:40+00:00')
+    for bounds in ((datetime.datetime(2014, 8, 13, 13, 36, 40), None),
+                   (start, 20), (4, start), ('4', '10')):
+        with pytest.raises(ValueError):
+            obj.clip(*bounds)
+
+
+def test_clip_should_use_the_base_uri_of_the_playlist():
+    obj = m3u8.M3U8(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+                    base_uri='http://example.com/live/')
+    clip = obj.clip(0, 3)
+    assert 'http://example.com/live/g_50116.ts' == clip.segments[0].absolute_uri
+    obj.base_uri = 'http://cdn.example.com/live/'
+    assert 'http://cdn.example.com/live/g_50116.ts' == clip.segments[0].absolute_uri
+
+
+def test_clip_should_follow_added_segments():
+    obj = m3u8.loads(playlists.DISCONTINUITY_PLAYLIST_WITH_PROGRAM_DATE_TIME)
+    assert 2 == len(obj.clip(19).segments)
+    obj.add_segment(m3u8.Segment('g_50124.ts', None, duration=3))
+    assert 3 == len(obj.clip(19).segments)
+
+
+def test_clip_of_variant_playlist_should_fail():
+    with pytest.raises(ValueError):
+        m3u8.loads(playlists.VARIANT_PLAYLIST).clip(0, 10)
@@ -0,0 +1,116 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+import playlists
+
+
+def live_playlist(first, last, media_sequence=None, key_from=None):
+    output = ['#EXTM3U', '#EXT-X-TARGETDURATION:8',
+              '#EXT-X-MEDIA-SEQUENCE:%d' % (first if media_sequence is None
+                                            else media_sequence)]
+    for number in range(first, last + 1):
+        if number == key_from:
+            output.append('#EXT-X-KEY:METHOD=AES-128,URI="key%d.bin"' % number)
+        output.append('#EXTINF:8,')
+        output.append('segment%d.ts' % number)
+    return m3u8.loads('\n'.join(output))
+
+
+def test_diff_of_the_same_playlist_should_be_empty():
+    result = m3u8.diff(m3u8.loads(playlists.SIMPLE_PLAYLIST),
+                       m3u8.loads(playlists.SIMPLE_PLAYLIST))
+    assert not result
+    assert [] == result.added_segments
+    assert {} == result.changed_attributes
+
+
+def test_diff_should_report_sliding_window_segments():
+    result = m3u8.diff(live_playlist(10, 15), live_playlist(12, 17))
+    assert result
+    assert ['segment10.ts', 'segment11.ts'] == [s.uri for s in result.removed_segments]
+    assert ['segment16.ts', 'segment17.ts'] == [s.uri for s in result.added_segments]
+    assert [] == result.changed_segments
+    assert {'media_sequence': (10, 12)} == result.changed_attributes
+
+
+def test_diff_should_report_stalled_window():
+    result = m3u8.diff(live_playlist(10, 15), live_playlist(10, 15))
+    assert not result
+
+
+def test_diff_should_align_segments_by_uri_when_sequence_is_reset():
+    result = m3u8.diff(live_playlist(10, 15), live_playlist(13, 18, media_sequence=0))
+    assert ['segment10.ts', 'segment11.ts', 'segment12.ts'] == [
+        s.uri for s in result.removed_segments]
+    assert ['segment16.ts', 'segment17.ts', 'segment18.ts'] == [
+        s.uri for s in result.added_segments]
+
+
+def test_diff_should_handle_window_moving_backwards():
+    result = m3u8.diff(live_playlist(12, 17), live_playlist(10, 15))
+    assert ['segment16.ts', 'segment17.ts'] == [s.uri for s in result.removed_segments]
+    assert ['segment10.ts', 'segment11.ts'] == [s.uri for s in result.added_segments]
+
+
+def test_diff_without_common_segments_should_replace_all_of_them():
+    result = m3u8.diff(live_playlist(10, 12), live_playlist(20, 21))
+    assert 3 == len(result.removed_segments)
+    assert 2 == len(result.added_segments)
+
+
+def test_diff_should_report_replaced_segments():
+    old = live_playlist(10, 12)
+    new = live_playlist(10, 12)
+    new.segments[1].uri = 'replaced.ts'
+    result = m3u8.diff(old, new)
+    assert ['segment11.ts'] == [s.uri for s in result.removed_segments]
+    assert ['replaced.ts'] == [s.uri for s in result.added_segments]
+
+
+def test_diff_should_report_changed_segments():
+    old = live_playlist(10, 12)
+    new = live_playlist(10, 12)
+    new.segments[2].duration = 4
+    new.segments[2].discontinuity = True
+    result = m3u8.diff(old, new)
+    assert [(old.segments[2], new.segments[2])] == result.changed_segments
+    assert [] == result.added_segments
+
+
+def test_diff_should_report_key_changes():
+    result = m3u8.diff(live_playlist(10, 15, key_from=10),
+                       live_playlist(12, 17, key_from=16))
+    assert ['key10.bin'] == [key.uri for key in result.removed_keys]
+    assert ['key16.bin'] == [key.uri for key in result.added_keys]
+
+    old = m3u8.loads(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED)
+    new = m3u8.loads(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED_UPDATED)
+    result = m3u8.diff(old, new)
+    assert ['/hls-key/key0.bin'] == [key.uri for key in result.added_keys]
+    assert [] == result.removed_keys
+    assert [(old.segments[0], new.segments[0]),
+            (old.segments[1], new.segments[1])] == result.changed_segments
+
+
+def test_diff_should_report_added_and_removed_variants():
+    old = m3u8.loads(playlists.VARIANT_PLAYLIST)
+    new = m3u8.loads(playlists.VARIANT_PLAYLIST)
+    removed = new.playlists.pop(0)
+    new.add_playlist(m3u8.Playlist('new.m3u8', {'bandwidth': 9000000}, [], None))
+    result = m3u8.diff(old, new)
+    assert [removed.uri] == [playlist.uri for playlist in result.removed_playlists]
+    assert ['new.m3u8'] == [playlist.uri for playlist in result.added_playlists]
+    assert [] == result.added_segments
+
+
+def test_diff_should_report_changed_variant_as_removed_and_added():
+    old = m3u8.loads(playlists.MULTI_MEDIA_PLAYLIST)
+    new = m3u8.loads(playlists.MULTI_MEDIA_PLAYLIST.replace('BANDWIDTH=688000',
+                                                            'BANDWIDTH=700000'))
+    result = m3u8.diff(old, new)
+    assert [688000] == [p.stream_info.bandwidth for p in result.removed_playlists]
+    assert [700000] == [p.stream_info.bandwidth for p in result.added_playlists]
+    assert [] == result.added_media
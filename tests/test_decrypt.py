@@ -0,0 +1,111 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import os
+
+import pytest
+
+import m3u8
+from m3u8.decrypt import decrypt, decrypt_chunks
+
+cryptography = pytest.importorskip('cryptography')
+
+KEY = bytes(bytearray(range(16)))
+
+ENCRYPTED_PLAYLIST = '''#EXTM3U
+#EXT-X-MEDIA-SEQUENCE:10
+#EXT-X-TARGETDURATION:10
+#EXT-X-KEY:METHOD=AES-128,URI="key.bin"
+#EXTINF:10,
+segment10.ts
+#EXTINF:10,
+segment11.ts
+#EXT-X-KEY:METHOD=AES-128,URI="key.bin",IV=0x0000000000000000000000000000cafe
+#EXTINF:10,
+segment12.ts
+'''
+
+
+def encrypt(data, key, iv):
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    padder = padding.PKCS7(128).padder()
+    padded = padder.update(data) + padder.finalize()
+    encryptor = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend()).encryptor()
+    return encryptor.update(padded) + encryptor.finalize()
+
+
+def content(number):
+    return ('segment %d\n' % number).encode('ascii') * 5000
+
+
+def write_encrypted_playlist(tmpdir):
+    obj = m3u8.M3U8(ENCRYPTED_PLAYLIST, base_uri=str(tmpdir))
+    tmpdir.join('key.bin').write_binary(KEY)
+    ivs = m3u8.segment_ivs(obj)
+    for number, (segment, iv) in enumerate(zip(obj.segments, ivs), 10):
+        tmpdir.join(segment.uri).write_binary(encrypt(content(number), KEY, iv))
+    return obj
+
+
+def test_decrypt_should_reverse_encryption():
+    iv = os.urandom(16)
+    data = os.urandom(1000)
+    assert data == decrypt(encrypt(data, KEY, iv), KEY, iv)
+
+
+def test_decrypt_chunks_should_accept_any_chunk_size():
+    iv = os.urandom(16)
+    data = os.urandom(10000)
+    encrypted = encrypt(data, KEY, iv)
+    chunks = [encrypted[start:start + 777] for start in range(0, len(encrypted), 777)]
+
+    assert data == b''.join(decrypt_chunks(chunks, KEY, iv))
+
+
+def test_decrypt_should_fail_with_wrong_key():
+    # A fixed iv, a random one gives valid padding once in a while
+    iv = b'\x00' * 16
+    with pytest.raises(ValueError):
+        decrypt(encrypt(b'data', KEY, iv), b'x' * 16, iv)
+
+
+def test_fetcher_should_decrypt_segments(tmpdir):
+    obj = write_encrypted_playlist(tmpdir)
+    fetcher = m3u8.SegmentFetcher(workers=2, decrypt=True)
+
+    fetched = list(fetcher.fetch(obj.segments, obj.media_sequence))
+
+    assert [content(10), content(11), content(12)] == [item.data for item in fetched]
+    assert [KEY] * 3 == [item.key for item in fetched]
+
+
+def test_fetcher_should_keep_encrypted_data_without_decrypt(tmpdir):
+    obj = write_encrypted_playlist(tmpdir)
+    fetched = next(m3u8.SegmentFetcher().fetch(obj.segments, obj.media_sequence))
+
+    assert tmpdir.join('segment10.ts').read_binary() == fetched.data
+
+
+def test_stream_segment_should_decrypt_chunks(tmpdir):
+    obj = write_encrypted_playlist(tmpdir)
+    fetcher = m3u8.SegmentFetcher(decrypt=True)
+
+    chunks = list(fetcher.stream_segment(obj.segments[1], 11, chunk_size=1000))
+
+    # The padding check holds back up to a block
+    assert max(len(chunk) for chunk in chunks) <= 1000 + 16
+    assert content(11) == b''.join(chunks)
+
+
+def test_decrypt_should_need_media_sequence_without_iv(tmpdir):
+    obj = write_encrypted_playlist(tmpdir)
+    fetcher = m3u8.SegmentFetcher(decrypt=True)
+
+    with pytest.raises(ValueError):
+        fetcher.fetch_segment(obj.segments[0])
+    assert content(12) == fetcher.fetch_segment(obj.segments[2]).data
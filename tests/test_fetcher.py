@@ -0,0 +1,162 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import random
+import threading
+import time
+
+import pytest
+
+import m3u8
+import playlists
+from playlist_generator import generate_media_playlist
+
+
+class FakeFetch(object):
+    '''
+    Fetch function returning the uri and range as content, after a random
+    delay. The first `failures` calls for each uri raise IOError.
+    '''
+
+    def __init__(self, failures=0, delay=0.01):
+        self.failures = failures
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+    def __call__(self, uri, offset, length, timeout, headers):
+        with self._lock:
+            self.calls.append(uri)
+            failed = self.calls.count(uri) <= self.failures
+            delay = self._rng.random() * self.delay
+        time.sleep(delay)
+        if failed:
+            raise IOError('Failed %s' % uri)
+        return ('%s %s %s' % (uri, offset, length)).encode('ascii')
+
+
+def test_fetch_should_deliver_segments_in_order():
+    obj = m3u8.M3U8(generate_media_playlist(segments=50), base_uri='http://example.com/')
+    fetcher = m3u8.SegmentFetcher(workers=8, fetch=FakeFetch())
+
+    fetched = list(fetcher.fetch(obj.segments))
+
+    assert obj.segments == [item.segment for item in fetched]
+    assert [('%s None None' % uri).encode('ascii') for uri in obj.segments.absolute_uris()] == \
+        [item.data for item in fetched]
+
+
+def test_fetch_should_not_download_more_than_prefetch_ahead():
+    obj = m3u8.M3U8(generate_media_playlist(segments=50), base_uri='http://example.com/')
+    positions = dict((uri, position) for position, uri in
+                     enumerate(obj.segments.absolute_uris()))
+    consumed = []
+    ahead = []
+
+    def fetch(uri, offset, length, timeout, headers):
+        # How far each download is from the segments consumed so far
+        ahead.append(positions[uri] - len(consumed))
+        return b''
+
+    fetcher = m3u8.SegmentFetcher(workers=2, prefetch=4, fetch=fetch)
+    for item in fetcher.fetch(obj.segments):
+        consumed.append(item)
+
+    assert 50 == len(ahead)
+    assert 4 >= max(ahead)
+
+
+def test_fetch_should_request_byteranges():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_BYTERANGES, base_uri='http://example.com/')
+    fetcher = m3u8.SegmentFetcher(fetch=FakeFetch())
+
+    fetched = list(fetcher.fetch(obj.segments))
+
+    assert b'http://example.com/segment.ts 762421 83442' == fetched[1].data
+
+
+def test_fetch_should_retry_failed_downloads():
+    obj = m3u8.M3U8(generate_media_playlist(segments=5), base_uri='http://example.com/')
+    fake_fetch = FakeFetch(failures=2)
+    fetcher = m3u8.SegmentFetcher(workers=2, retries=2, retry_delay=0, fetch=fake_fetch)
+
+    assert 5 == len(list(fetcher.fetch(obj.segments)))
+    assert 15 == len(fake_fetch.calls)
+
+
+def test_fetch_should_raise_after_retries():
+    obj = m3u8.M3U8(generate_media_playlist(segments=5), base_uri='http://example.com/')
+    fetcher = m3u8.SegmentFetcher(retries=1, retry_delay=0, fetch=FakeFetch(failures=2))
+
+    with pytest.raises(IOError):
+        list(fetcher.fetch(obj.segments))
+
+
+def test_fetch_should_not_retry_http_client_errors():
+    calls = []
+
+    def fetch(uri, offset, length, timeout, headers):
+        calls.append(uri)
+        code = int(uri.rsplit('/', 1)[1])
+        raise m3u8.HTTPError(uri, code, 'Error', {}, None)
+
+    fetcher = m3u8.SegmentFetcher(retries=2, retry_delay=0, fetch=fetch)
+    for code, attempts in ((404, 1), (403, 1), (408, 3), (429, 3), (503, 3)):
+        del calls[:]
+        with pytest.raises(IOError):
+            fetcher.fetch_segment(m3u8.Segment(str(code), 'http://example.com/'))
+        assert attempts == len(calls)
+
+
+def test_fetch_uri_should_raise_on_short_byteranges(tmpdir):
+    filename = str(tmpdir.join('segment.ts'))
+    with open(filename, 'wb') as fileobj:
+        fileobj.write(b'x' * 100)
+
+    assert b'x' * 50 == m3u8.fetcher.fetch_uri(filename, 50, 50)
+    with pytest.raises(IOError):
+        m3u8.fetcher.fetch_uri(filename, 50, 51)
+    with pytest.raises(IOError):
+        m3u8.fetcher.fetch_uri(playlists.TEST_HOST + '/segments/file.ts', 6500, 1000, 5)
+
+
+def test_fetch_should_download_each_key_once():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED,
+                    base_uri='http://example.com/a/b/c/d/')
+    fake_fetch = FakeFetch()
+    fetcher = m3u8.SegmentFetcher(workers=4, fetch=fake_fetch)
+
+    fetched = list(fetcher.fetch(obj.segments))
+    list(fetcher.fetch(obj.segments))
+
+    assert [None, None] == [item.key for item in fetched[:2]]
+    assert b'http://example.com/hls-key/key.bin None None' == fetched[2].key
+    assert b'http://example.com/hls-key/key2.bin None None' == fetched[-1].key
+    assert 1 == fake_fetch.calls.count('http://example.com/hls-key/key.bin')
+    assert 1 == fake_fetch.calls.count('http://example.com/hls-key/key2.bin')
+
+
+def test_fetch_should_download_from_uri():
+    obj = m3u8.M3U8(base_uri=playlists.TEST_HOST + '/segments/')
+    obj.add_segment(m3u8.Segment('file.ts', None, byterange='1000@0'))
+    obj.add_segment(m3u8.Segment('file.ts', None, byterange='500@1003'))
+    obj.add_segment(m3u8.Segment('whole.ts', None))
+    fetcher = m3u8.SegmentFetcher(workers=2, timeout=5)
+
+    fetched = list(fetcher.fetch(obj.segments))
+
+    content = b'file.ts' * 1000
+    assert [content[:1000], content[1003:1503], b'whole.ts' * 1000] == \
+        [item.data for item in fetched]
+
+
+def test_fetch_should_retry_downloads_from_uri():
+    name = 'flaky%d.ts' % random.randint(0, 1 << 30)
+    obj = m3u8.M3U8(base_uri=playlists.TEST_HOST + '/flaky/')
+    obj.add_segment(m3u8.Segment(name, None))
+    fetcher = m3u8.SegmentFetcher(retries=1, retry_delay=0, timeout=5)
+
+    assert name.encode('ascii') * 1000 == next(fetcher.fetch(obj.segments)).data
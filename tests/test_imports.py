@@ -0,0 +1,35 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import subprocess
+import sys
+from os.path import dirname, abspath
+
+import pytest
+
+import m3u8
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+SLOW_IMPORTS = ('urllib.request', 'urllib2', 'http.client', 'httplib', 'ssl',
+                'email', 'iso8601', 'multiprocessing', 'tempfile', 'hashlib')
+
+
+def test_import_should_not_load_network_and_date_modules():
+    if sys.version_info < (3, 7):
+        pytest.skip('urllib is imported eagerly before python 3.7')
+    code = ('import sys, m3u8\n'
+            'm3u8.loads(%r)\n'
+            'print(" ".join(sorted(sys.modules)))' % '#EXTM3U\n#EXTINF:10,\na.ts')
+    output = subprocess.check_output([sys.executable, '-c', code], cwd=ROOT)
+    modules = output.decode('ascii').split()
+
+    assert [] == [module for module in SLOW_IMPORTS if module in modules]
+
+
+def test_urllib_names_should_still_be_reachable():
+    assert m3u8.HTTPError is not None
+    assert m3u8.urlopen is not None
+    assert m3u8.Request is not None
@@ -0,0 +1,114 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import binascii
+import threading
+import time
+
+import pytest
+
+import m3u8
+import playlists
+
+
+class CountingFetch(object):
+
+    def __init__(self, delay=0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    def __call__(self, uri, offset, length, timeout, headers):
+        self.calls.append(uri)
+        time.sleep(self.delay)
+        if self.fail:
+            raise IOError('Failed %s' % uri)
+        return ('key of %s' % uri).encode('ascii')
+
+
+def test_resolve_should_cache_keys_by_absolute_uri():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED,
+                    base_uri='http://example.com/a/b/c/d/')
+    other = m3u8.M3U8(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED,
+                      base_uri='http://example.com/other/')
+    fetch = CountingFetch()
+    resolver = m3u8.KeyResolver(fetch=fetch)
+
+    contents = [resolver.resolve(segment.key) for segment in obj.segments[2:]]
+    resolver.resolve(other.keys[-1])
+
+    assert b'key of http://example.com/hls-key/key.bin' == contents[0]
+    assert b'key of http://example.com/hls-key/key2.bin' == contents[-1]
+    assert ['http://example.com/hls-key/key.bin',
+            'http://example.com/hls-key/key2.bin'] == fetch.calls
+
+
+def test_resolve_should_download_again_expired_or_invalidated_keys():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    fetch = CountingFetch()
+    resolver = m3u8.KeyResolver(ttl=0.05, fetch=fetch)
+
+    resolver.resolve(obj.keys[0])
+    resolver.resolve(obj.keys[0])
+    assert 1 == len(fetch.calls)
+    time.sleep(0.1)
+    resolver.resolve(obj.keys[0])
+    assert 2 == len(fetch.calls)
+    resolver.invalidate(obj.keys[0])
+    resolver.resolve(obj.keys[0])
+    assert 3 == len(fetch.calls)
+
+
+def test_resolve_should_share_downloads_in_progress():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    fetch = CountingFetch(delay=0.1)
+    resolver = m3u8.KeyResolver(fetch=fetch)
+    contents = []
+
+    threads = [threading.Thread(target=lambda: contents.append(resolver.resolve(obj.keys[0])))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert 1 == len(fetch.calls)
+    assert [b'key of https://priv.example.com/key.php?r=52'] * 5 == contents
+
+
+def test_resolve_should_not_cache_errors():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    fetch = CountingFetch(fail=True)
+    resolver = m3u8.KeyResolver(fetch=fetch)
+
+    with pytest.raises(IOError):
+        resolver.resolve(obj.keys[0])
+    fetch.fail = False
+    assert resolver.resolve(obj.keys[0])
+    assert 2 == len(fetch.calls)
+
+
+def test_key_iv_should_use_iv_attribute_or_media_sequence():
+    with_iv = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS_AND_IV).keys[0]
+    without_iv = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS).keys[0]
+
+    assert '10ef8f758ca555115584bb5b3c687f52' == \
+        binascii.hexlify(m3u8.key_iv(with_iv, 10)).decode('ascii')
+    assert b'\x00' * 14 + b'\x1e\x72' == m3u8.key_iv(without_iv, 7794)
+
+
+def test_segment_ivs_should_follow_media_sequence():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    ivs = m3u8.segment_ivs(obj)
+
+    assert [m3u8.key_iv(obj.keys[0], 7794 + number) for number in range(len(obj.segments))] == ivs
+
+
+def test_segment_ivs_should_be_none_for_unencrypted_segments():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED)
+    ivs = m3u8.segment_ivs(obj)
+
+    assert [None, None] == ivs[:2]
+    assert binascii.unhexlify('cafe8f758ca555115584bb5b3c687f52') == ivs[-1]
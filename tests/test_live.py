@@ -0,0 +1,103 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+import pytest
+from m3u8.model import Segment, Key
+
+
+def make_segment(number, duration=6, discontinuity=False, key=None):
+    return Segment('segment%d.ts' % number, None, duration=duration,
+                   discontinuity=discontinuity, keyobject=key)
+
+
+def test_should_keep_at_most_window_size_segments():
+    writer = m3u8.LivePlaylistWriter(3)
+    for number in range(5):
+        writer.append(make_segment(number))
+
+    assert 3 == len(writer)
+    assert ['segment2.ts', 'segment3.ts', 'segment4.ts'] == \
+        [segment.uri for segment in writer.segments]
+
+
+def test_should_advance_media_sequence_when_window_slides():
+    writer = m3u8.LivePlaylistWriter(3, media_sequence=10)
+    for number in range(3):
+        writer.append(make_segment(number))
+    assert 10 == writer.media_sequence
+
+    writer.append(make_segment(3))
+    writer.append(make_segment(4))
+    assert 12 == writer.media_sequence
+
+
+def test_should_advance_discontinuity_sequence_when_discontinuity_drops_out():
+    writer = m3u8.LivePlaylistWriter(2)
+    writer.append(make_segment(0))
+    writer.append(make_segment(1, discontinuity=True))
+    writer.append(make_segment(2))
+    assert 0 == writer.discontinuity_sequence
+
+    writer.append(make_segment(3))
+    assert 1 == writer.discontinuity_sequence
+
+
+def test_should_compute_target_duration_from_longest_segment():
+    writer = m3u8.LivePlaylistWriter(3)
+    writer.append(make_segment(0, duration=5.5))
+    writer.append(make_segment(1, duration=4))
+
+    assert 6 == writer.playlist.target_duration
+
+
+def test_should_dump_the_same_as_an_equivalent_m3u8():
+    key = Key('AES-128', None, 'key.bin')
+    writer = m3u8.LivePlaylistWriter(3, target_duration=6, version='3')
+    for number in range(5):
+        writer.append(make_segment(number, discontinuity=number == 1,
+                                   key=key if number >= 2 else None))
+
+    expected = m3u8.M3U8()
+    expected.media_sequence = 2
+    expected.discontinuity_sequence = 1
+    expected.target_duration = 6
+    expected.version = '3'
+    for segment in writer.segments:
+        expected.add_segment(segment)
+
+    assert expected.dumps() == writer.dumps()
+    assert writer.dumps().startswith('''\
+#EXTM3U
+#EXT-X-MEDIA-SEQUENCE:2
+#EXT-X-DISCONTINUITY-SEQUENCE:1
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:6
+#EXT-X-KEY:METHOD=AES-128,URI="key.bin"
+#EXTINF:6,
+segment2.ts''')
+
+
+def test_should_write_first_segment_key_after_window_slides():
+    key = Key('AES-128', None, 'key.bin')
+    writer = m3u8.LivePlaylistWriter(2)
+    for number in range(3):
+        writer.append(make_segment(number, key=key))
+
+    assert 1 == writer.dumps().count('#EXT-X-KEY')
+
+
+def test_should_dump_endlist_after_end():
+    writer = m3u8.LivePlaylistWriter(2, target_duration=6)
+    writer.append(make_segment(0))
+    writer.dumps()
+    writer.end()
+
+    assert writer.dumps().endswith('segment0.ts\n#EXT-X-ENDLIST')
+
+
+def test_should_reject_empty_window():
+    with pytest.raises(ValueError):
+        m3u8.LivePlaylistWriter(0)
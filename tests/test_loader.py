@@ -4,6 +4,7 @@
 # license that can be found in the LICENSE file.
 
 import os
+import mmap
 try:
     import urlparse as url_parser
 except ImportError:
@@ -118,3 +119,97 @@ def test_raise_timeout_exception_if_timeout_happens_when_loading_from_uri():
         assert True
     else:
         assert False
+
+
+def test_loads_should_create_object_from_bytes():
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST.encode('utf-8'))
+    assert 5220 == obj.target_duration
+    assert 'http://media.example.com/entire.ts' == obj.segments[0].uri
+
+
+def test_load_should_create_object_from_mapped_file():
+    obj = m3u8.load(playlists.RELATIVE_PLAYLIST_FILENAME, mmap=True)
+    expected = m3u8.load(playlists.RELATIVE_PLAYLIST_FILENAME)
+    assert expected.dumps() == obj.dumps()
+    assert expected.base_uri == obj.base_uri
+    assert expected.segments[0].absolute_uri == obj.segments[0].absolute_uri
+
+
+def test_load_should_parse_mapped_file_like_string(tmpdir):
+    for content in (playlists.CUE_OUT_ELEMENTAL_PLAYLIST,
+                    playlists.SIMPLE_PLAYLIST_WITH_PROGRAM_DATE_TIME,
+                    playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS_AND_IV,
+                    playlists.VARIANT_PLAYLIST_WITH_IFRAME_PLAYLISTS):
+        filename = str(tmpdir.join('playlist.m3u8'))
+        with open(filename, 'wb') as fileobj:
+            fileobj.write(content.replace('\n', '\r\n').encode('utf-8'))
+        obj = m3u8.load(filename, mmap=True)
+        assert m3u8.parse(content) == obj.data
+
+
+def test_load_should_keep_line_numbers_from_mapped_file(tmpdir):
+    filename = str(tmpdir.join('playlist.m3u8'))
+    with open(filename, 'w') as fileobj:
+        fileobj.write(playlists.SIMPLE_PLAYLIST_MESSY)
+    with open(filename) as fileobj:
+        content = fileobj.read()
+    with pytest.raises(m3u8.ParseError) as catch:
+        m3u8.M3U8(content, strict=True)
+    expected = str(catch.value)
+    with pytest.raises(m3u8.ParseError) as catch:
+        with open(filename, 'rb') as fileobj:
+            mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        m3u8.parse(mapped, strict=True)
+    assert expected == str(catch.value)
+
+
+def test_load_should_handle_empty_mapped_file(tmpdir):
+    filename = str(tmpdir.join('empty.m3u8'))
+    open(filename, 'w').close()
+    obj = m3u8.load(filename, mmap=True)
+    assert [] == obj.segments
+
+
+def test_load_should_profile_parse_and_model_construction():
+    profile = m3u8.ParseProfile()
+    obj = m3u8.load(playlists.RELATIVE_PLAYLIST_FILENAME, profile=profile)
+    assert len(obj.segments) == profile.tag_lines['#EXTINF']
+    assert profile.parse_time > 0
+    assert profile.model_time > 0
+
+
+def test_loads_should_accumulate_profile():
+    profile = m3u8.ParseProfile()
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, profile=profile)
+    m3u8.loads(playlists.SIMPLE_PLAYLIST, profile=profile)
+    assert 2 == profile.tag_lines['#EXTINF']
+
+
+def test_load_should_parse_file_with_cr_line_endings(tmpdir):
+    filename = str(tmpdir.join('playlist.m3u8'))
+    with open(filename, 'wb') as fileobj:
+        fileobj.write(playlists.SIMPLE_PLAYLIST.strip().replace('\n', '\r').encode('utf-8'))
+    obj = m3u8.load(filename)
+    assert ['http://media.example.com/entire.ts'] == obj.segments.uri
+    assert obj.is_endlist
+
+
+def test_load_should_parse_mapped_file_with_cr_line_endings(tmpdir):
+    filename = str(tmpdir.join('playlist.m3u8'))
+    for newline in ('\r', '\r\n', '\n'):
+        content = '\n\n' + playlists.SIMPLE_PLAYLIST_MESSY.strip() + '\n'
+        with open(filename, 'wb') as fileobj:
+            fileobj.write(content.replace('\n', newline).encode('utf-8'))
+        obj = m3u8.load(filename, mmap=True)
+        expected = m3u8.load(filename)
+        assert ['http://media.example.com/entire.ts'] == obj.segments.uri
+        assert 5220 == obj.target_duration
+        assert expected.data == obj.data
+        with open(filename, 'rb') as fileobj:
+            mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            with pytest.raises(m3u8.ParseError) as catch:
+                m3u8.parse(mapped, strict=True)
+        finally:
+            mapped.close()
+        assert 5 == catch.value.lineno
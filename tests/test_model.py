@@ -7,7 +7,9 @@
 # data returned from parser.parse()
 
 import arrow
+import copy
 import datetime
+import pickle
 import m3u8
 import playlists
 from m3u8.model import Segment, Key
@@ -468,6 +470,43 @@ def test_dump_should_work_for_playlists_using_byteranges():
     assert expected == obj.dumps().strip()
 
 
+def test_dump_should_keep_implicit_byterange_offsets():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS)
+
+    assert [1000, 500, 2000, 600, 700] == [segment.byterange_length for segment in obj.segments]
+    assert [0, 0, 1000, 500, None] == [segment.byterange_offset for segment in obj.segments]
+    assert playlists.PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS.strip() == obj.dumps().strip()
+
+
+def test_segment_should_parse_given_byterange():
+    segment = m3u8.Segment('segment.ts', None, byterange='1024@2048')
+
+    assert 1024 == segment.byterange_length
+    assert 2048 == segment.byterange_offset
+
+
+def test_segment_byterange_should_follow_length_and_offset_changes():
+    obj = m3u8.M3U8(playlists.PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS)
+    segment = obj.segments[2]
+    segment.byterange_length = 1500
+    assert '1500' == segment.byterange
+    assert 1000 == segment.byterange_offset
+    segment.byterange_offset = 4000
+    assert '1500@4000' == segment.byterange
+    assert '#EXT-X-BYTERANGE:1500@4000' in obj.dumps()
+
+    segment.byterange = '10@20'
+    assert (10, 20) == (segment.byterange_length, segment.byterange_offset)
+    segment.byterange = None
+    assert (None, None) == (segment.byterange_length, segment.byterange_offset)
+    assert '#EXT-X-BYTERANGE:1500@4000' not in obj.dumps()
+
+    segment = m3u8.Segment('segment.ts', None, duration=10, byterange_length=1024,
+                           byterange_offset=0)
+    assert '1024@0' == segment.byterange
+    assert '#EXT-X-BYTERANGE:1024@0' in segment.dumps(None)
+
+
 def test_should_dump_with_endlist_tag():
     obj = m3u8.M3U8(playlists.SLIDING_WINDOW_PLAYLIST)
     obj.is_endlist = True
@@ -507,6 +546,18 @@ def test_should_dump_complex_unencrypted_encrypted_keys():
 
     assert expected == obj.dumps().strip()
 
+def test_should_dump_method_none_for_unencrypted_segment_after_encrypted_ones():
+    obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    obj.add_segment(Segment('clear.ts', None, duration=15))
+    output = obj.dumps()
+
+    assert 'None' not in output
+    assert output.index('#EXT-X-KEY:METHOD=NONE') < output.index('clear.ts')
+    reloaded = m3u8.loads(output)
+    assert 'NONE' == reloaded.segments[-1].key.method
+    assert 'AES-128' == reloaded.segments[-2].key.method
+
+
 def test_should_dump_complex_unencrypted_encrypted_keys_no_uri_attr():
     obj = m3u8.M3U8(playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED_NONE_AND_NO_URI_ATTR)
     expected = playlists.PLAYLIST_WITH_MULTIPLE_KEYS_UNENCRYPTED_AND_ENCRYPTED_NONE_AND_NO_URI_ATTR \
@@ -602,6 +653,20 @@ def test_should_normalize_segments_and_key_urls_if_base_path_attribute_updated()
     assert obj.dumps() == expected
 
 
+def test_segment_list_base_path_should_match_segment_base_path():
+    uris = ['entire.ts', 'hls/hls.ts', 'hls//hls.ts', '/hls/a.ts', 'http://example.com/hls/b.ts',
+            '/video/video_001.ts', '/x/x', '//x//x', 'a/b//b', 'a//b/a//b.ts']
+    for base_path in ['http://videoserver.com/hls', 'http://videoserver.com/hls/', 'hls', '',
+                      'NEW']:
+        segments = [m3u8.Segment(uri, None) for uri in uris]
+        for segment in segments:
+            segment.base_path = base_path
+        segment_list = m3u8.model.SegmentList([m3u8.Segment(uri, None) for uri in uris])
+        segment_list.base_path = base_path
+
+        assert [segment.uri for segment in segments] == segment_list.uri
+
+
 def test_playlist_type_dumped_to_appropriate_m3u8_field():
     obj = m3u8.M3U8()
     obj.playlist_type = 'vod'
@@ -642,6 +707,14 @@ def test_none_media_sequence_gracefully_ignored():
     assert result == expected
 
 
+def test_should_dump_discontinuity_sequence():
+    obj = m3u8.M3U8(playlists.SLIDING_WINDOW_PLAYLIST_WITH_DISCONTINUITY_SEQUENCE)
+    expected = playlists.SLIDING_WINDOW_PLAYLIST_WITH_DISCONTINUITY_SEQUENCE.strip()
+
+    assert 5 == obj.discontinuity_sequence
+    assert expected == obj.dumps().strip()
+
+
 def test_should_correctly_update_base_path_if_its_blank():
     segment = Segment('entire.ts', 'http://1.2/')
     assert not segment.base_path
@@ -675,6 +748,119 @@ def test_m3u8_should_propagate_base_uri_to_key():
     assert '/any/key.bin' == obj.keys[0].absolute_uri
 
 
+def test_m3u8_should_propagate_base_uri_to_media_and_playlists():
+    obj = m3u8.M3U8(playlists.MULTI_MEDIA_PLAYLIST, base_uri='http://example.com/path')
+    obj.base_uri = 'http://example.com/other/'
+
+    assert all('http://example.com/other/' == media.base_uri for media in obj.media)
+    assert all('http://example.com/other/' == playlist.base_uri for playlist in obj.playlists)
+
+
+def test_media_list_by_group_and_type():
+    obj = m3u8.M3U8(playlists.MULTI_MEDIA_PLAYLIST)
+
+    assert ['English', 'Spanish', 'Commentary (eng)'] == [
+        media.name for media in obj.media.by_group('aac')]
+    assert ['Chinese', 'French'] == [media.name for media in obj.media.by_type('SUBTITLES')]
+    assert [] == obj.media.by_group('missing')
+    assert [] == obj.media.by_type('VIDEO')
+
+
+def test_media_list_index_should_include_added_media():
+    obj = m3u8.M3U8(playlists.MULTI_MEDIA_PLAYLIST)
+    assert 3 == len(obj.media.by_group('aac'))
+
+    obj.add_media(m3u8.Media('de.m3u8', 'AUDIO', 'aac', name='German'))
+    assert 'German' == obj.media.by_group('aac')[-1].name
+
+    obj.media[0].group_id = 'other'
+    obj.media.invalidate_index()
+    assert ['French'] == [media.name for media in obj.media.by_group('subs')]
+
+
+def test_playlist_media_should_be_linked_by_group_id():
+    obj = m3u8.M3U8(playlists.MULTI_MEDIA_PLAYLIST)
+    names = [media.name for media in obj.playlists[0].media]
+    assert ['English', 'Spanish', 'Commentary (eng)', 'Chinese', 'French'] == names
+
+
+def test_m3u8_should_propagate_base_uri_to_added_segments():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri='http://example.com/path/')
+    segment = m3u8.Segment('added.ts', None)
+    other_segment = m3u8.Segment('other.ts', 'http://other.com/')
+    obj.add_segment(segment)
+    obj.add_segment(other_segment)
+    assert 'http://example.com/path/added.ts' == segment.absolute_uri
+
+    obj.base_uri = 'http://example.com/new/'
+    assert 'http://example.com/new/added.ts' == segment.absolute_uri
+    assert 'http://example.com/new/other.ts' == other_segment.absolute_uri
+
+
+def test_m3u8_base_uri_should_rebase_every_item():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri='http://a/')
+    other = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri='http://b/')
+    obj.segments[0].base_uri = 'http://own/'
+    obj.segments.append(m3u8.Segment('appended.ts', None))
+    obj.segments.append(other.segments[0])
+    obj.add_media(m3u8.Media('media.m3u8', 'AUDIO', 'aac', base_uri='http://own/'))
+
+    obj.base_uri = 'http://c/'
+    assert ['http://c/'] * 3 == [segment.base_uri for segment in obj.segments]
+    assert 'http://c/appended.ts' == obj.segments[1].absolute_uri
+    assert 'http://c/' == obj.media[0].base_uri
+    assert 'http://b/' == other.base_uri
+
+    obj.base_uri = 'http://d/'
+    assert ['http://d/'] * 3 == [segment.base_uri for segment in obj.segments]
+
+
+def test_segment_base_uri_should_not_change_other_segments():
+    obj = m3u8.M3U8(playlists.SLIDING_WINDOW_PLAYLIST, base_uri='http://example.com/path/')
+    obj.segments[0].base_uri = 'http://other.com/'
+
+    assert 'http://other.com/' == obj.segments[0].base_uri
+    assert 'http://example.com/path/' == obj.segments[1].base_uri
+
+
+def test_absolute_uri_should_follow_base_uri_and_uri_changes():
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST, base_uri='http://example.com/path/')
+    segment = obj.segments[0]
+    segment.uri = 'entire.ts'
+    assert 'http://example.com/path/entire.ts' == segment.absolute_uri
+
+    obj.base_uri = 'http://example.com/other/'
+    assert 'http://example.com/other/entire.ts' == segment.absolute_uri
+
+    segment.uri = '../entire.ts?token=1'
+    assert 'http://example.com/entire.ts?token=1' == segment.absolute_uri
+
+
+def test_m3u8_should_survive_pickle_and_deepcopy_with_and_without_base_uri():
+    for base_uri in (None, 'http://example.com/path/'):
+        obj = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS, base_uri=base_uri)
+        for copied in (pickle.loads(pickle.dumps(obj, 2)), copy.deepcopy(obj)):
+            assert base_uri == copied.base_uri
+            assert base_uri == copied.segments[0].base_uri
+            assert obj.dumps() == copied.dumps()
+            assert copied.segments[0]._uri_context is copied.keys[0]._uri_context
+        context = m3u8.mixins.URIContext(base_uri)
+        assert context == pickle.loads(pickle.dumps(context, 2))
+        assert context == copy.deepcopy(context)
+
+
+def test_segment_list_absolute_uris():
+    with open(playlists.RELATIVE_PLAYLIST_FILENAME) as f:
+        content = f.read()
+    obj = m3u8.M3U8(content, base_uri='http://example.com/path/to/')
+
+    assert [segment.absolute_uri for segment in obj.segments] == obj.segments.absolute_uris()
+    assert ['http://example.com/entire1.ts',
+            'http://example.com/path/entire2.ts',
+            'http://example.com/entire3.ts',
+            'http://example.com/path/to/entire4.ts'] == obj.segments.absolute_uris()
+
+
 def test_segment_map_uri_attribute():
     obj = m3u8.M3U8(playlists.MAP_URI_PLAYLIST)
     assert obj.segment_map['uri'] == "fileSequence0.mp4"
@@ -0,0 +1,88 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+import playlists
+import pytest
+
+
+class RecordingObserver(m3u8.Observer):
+
+    def __init__(self):
+        self.events = []
+
+    def span_start(self, name, attributes):
+        self.events.append(('start', name))
+
+    def span_end(self, name, attributes, duration, error):
+        self.events.append(('end', name))
+
+
+@pytest.fixture
+def observer():
+    observer = m3u8.InMemoryObserver()
+    m3u8.set_observer(observer)
+    yield observer
+    m3u8.set_observer(None)
+
+
+def test_default_observer_does_nothing():
+    assert type(m3u8.get_observer()) is m3u8.Observer
+
+
+def test_should_report_nested_spans_in_order():
+    observer = RecordingObserver()
+    m3u8.set_observer(observer)
+    try:
+        m3u8.load(playlists.SIMPLE_PLAYLIST_FILENAME)
+    finally:
+        m3u8.set_observer(None)
+
+    assert [('start', 'load'), ('start', 'load_from_file'),
+            ('end', 'load_from_file'), ('start', 'parse'), ('end', 'parse'),
+            ('end', 'load')] == observer.events
+
+
+def test_should_aggregate_load_from_file(observer):
+    m3u8.load(playlists.SIMPLE_PLAYLIST_FILENAME)
+    m3u8.load(playlists.SIMPLE_PLAYLIST_FILENAME, mmap=True)
+
+    with open(playlists.SIMPLE_PLAYLIST_FILENAME, 'rb') as fileobj:
+        size = len(fileobj.read())
+    stats = observer.stats['load_from_file']
+    assert 2 == stats.count
+    assert 0 == stats.errors
+    assert 2 * size == stats.totals['bytes']
+    assert 2 == observer.stats['load'].count
+    assert 2 == observer.stats['parse'].totals['segments']
+
+
+def test_should_aggregate_load_from_uri(observer):
+    m3u8.load(playlists.SIMPLE_PLAYLIST_URI)
+
+    stats = observer.stats['load_from_uri']
+    assert 1 == stats.count
+    assert stats.totals['bytes'] > 0
+    assert stats.max_duration == stats.mean_duration
+
+
+def test_should_count_errors(observer):
+    with pytest.raises(m3u8.ParseError):
+        m3u8.parse(playlists.SIMPLE_PLAYLIST_MESSY, strict=True)
+    with pytest.raises(IOError):
+        m3u8.load('/does/not/exist.m3u8')
+
+    assert 1 == observer.stats['parse'].errors
+    assert 1 == observer.stats['load'].errors
+    assert 1 == observer.stats['load_from_file'].errors
+
+
+def test_should_report_dumps_and_dump(observer, tmpdir):
+    obj = m3u8.loads(playlists.SIMPLE_PLAYLIST)
+    obj.dump(str(tmpdir.join('playlist.m3u8')))
+
+    assert 1 == observer.stats['dump'].count
+    assert 1 == observer.stats['dumps'].totals['segments']
+    assert len(obj.dumps()) == observer.stats['dumps'].totals['size'] / 2
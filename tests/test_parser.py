@@ -191,6 +191,25 @@ def test_should_parse_playlist_using_byteranges():
     assert '76242@0' == data['segments'][0]['byterange']
     assert 'segment.ts' == data['segments'][0]['uri']
 
+def test_should_parse_byteranges_as_integers():
+    data = m3u8.parse(playlists.PLAYLIST_USING_BYTERANGES)
+
+    assert [76242, 83442, 69864] == [segment['byterange_length'] for segment in data['segments']]
+    assert [0, 762421, 834421] == [segment['byterange_offset'] for segment in data['segments']]
+
+def test_should_resolve_implicit_byterange_offsets_per_uri():
+    data = m3u8.parse(playlists.PLAYLIST_USING_IMPLICIT_BYTERANGE_OFFSETS)
+
+    assert ['2000', '600'] == [segment['byterange'] for segment in data['segments'][2:4]]
+    assert [0, 0, 1000, 500, None] == [segment['byterange_offset'] for segment in data['segments']]
+
+def test_should_not_fail_on_invalid_byterange():
+    data = m3u8.parse('#EXTM3U\n#EXTINF:10,\n#EXT-X-BYTERANGE:invalid\nsegment.ts\n')
+
+    assert 'invalid' == data['segments'][0]['byterange']
+    assert None == data['segments'][0]['byterange_length']
+    assert None == data['segments'][0]['byterange_offset']
+
 def test_should_parse_endlist_playlist():
     data = m3u8.parse(playlists.SIMPLE_PLAYLIST)
     assert True == data['is_endlist']
@@ -261,3 +280,40 @@ def test_should_parse_segment_map_uri():
 def test_should_parse_segment_map_uri_with_byterange():
     data = m3u8.parse(playlists.MAP_URI_PLAYLIST_WITH_BYTERANGE)
     assert data['segment_map']['uri'] == "main.mp4"
+
+def test_should_parse_discontinuity_sequence():
+    data = m3u8.parse(playlists.SLIDING_WINDOW_PLAYLIST_WITH_DISCONTINUITY_SEQUENCE)
+    assert 5 == data['discontinuity_sequence']
+    assert [False, True] == [s['discontinuity'] for s in data['segments']]
+
+
+def test_should_parse_playlist_from_bytes():
+    content = playlists.SIMPLE_PLAYLIST_WITH_TITLE.encode('utf-8')
+    assert m3u8.parse(playlists.SIMPLE_PLAYLIST_WITH_TITLE) == m3u8.parse(content)
+
+
+def test_should_parse_playlist_from_bytearray_and_memoryview():
+    content = playlists.CUE_OUT_ELEMENTAL_PLAYLIST.encode('utf-8')
+    expected = m3u8.parse(playlists.CUE_OUT_ELEMENTAL_PLAYLIST)
+    assert expected == m3u8.parse(bytearray(content))
+    assert expected == m3u8.parse(memoryview(content))
+
+
+def test_should_decode_utf8_values_from_bytes():
+    content = u'#EXTM3U\n#EXTINF:10,"título"\nsegment.ts\n'.encode('utf-8')
+    data = m3u8.parse(content)
+    assert u'título' == data['segments'][0]['title']
+
+
+def test_should_profile_lines_per_tag():
+    profile = m3u8.ParseProfile()
+    data = m3u8.parse(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS, profile=profile)
+    assert data == m3u8.parse(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    assert 3 == profile.tag_lines['#EXTINF']
+    assert 3 == profile.tag_lines['uri']
+    assert 1 == profile.tag_lines['#EXT-X-KEY']
+    assert set(profile.tag_lines) == set(profile.tag_times)
+    assert profile.lines == sum(profile.tag_lines.values())
+    assert len(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS) == profile.size
+    assert profile.parse_time >= sum(profile.tag_times.values())
+    assert '#EXTINF: 3 lines' in str(profile)
@@ -0,0 +1,59 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+from playlist_generator import generate_media_playlist, generate_master_playlist
+
+
+def test_media_playlist_should_be_deterministic():
+    options = dict(segments=200, key_rotation=10, program_date_time=0.1,
+                   discontinuity=0.05, cue_out=0.05, byterange=4)
+    assert generate_media_playlist(seed=1, **options) == \
+        generate_media_playlist(seed=1, **options)
+    assert generate_media_playlist(seed=1, **options) != \
+        generate_media_playlist(seed=2, **options)
+
+
+def test_media_playlist_should_have_requested_segments():
+    obj = m3u8.loads(generate_media_playlist(segments=1000, media_sequence=10,
+                                             target_duration=4))
+    assert 1000 == len(obj.segments)
+    assert 10 == obj.media_sequence
+    assert obj.is_endlist
+    assert all(segment.duration <= 4 for segment in obj.segments)
+
+
+def test_media_playlist_should_rotate_keys():
+    obj = m3u8.loads(generate_media_playlist(segments=100, key_rotation=10))
+    assert 10 == len(obj.keys)
+    assert obj.keys[1] == obj.segments[10].key
+
+
+def test_media_playlist_should_add_discontinuities_and_cues():
+    obj = m3u8.loads(generate_media_playlist(segments=1000, discontinuity=0.1,
+                                             cue_out=0.05, program_date_time=0.5))
+    assert any(segment.discontinuity for segment in obj.segments)
+    assert any(segment.cue_out for segment in obj.segments)
+    assert any(segment.scte35 for segment in obj.segments)
+    assert obj.program_date_time is not None
+
+
+def test_media_playlist_should_use_byteranges():
+    obj = m3u8.loads(generate_media_playlist(segments=10, byterange=5))
+    assert ['media/file0.ts'] * 5 + ['media/file1.ts'] * 5 == obj.segments.uri
+    assert obj.segments[0].byterange.endswith('@0')
+    assert '@' not in obj.segments[1].byterange
+
+
+def test_master_playlist_should_have_variants_and_media():
+    obj = m3u8.loads(generate_master_playlist(variants=6, audio_groups=2,
+                                              audio_languages=3,
+                                              subtitle_languages=2))
+    assert 6 == len(obj.playlists)
+    assert 6 == len(obj.iframe_playlists)
+    assert 8 == len(obj.media)
+    bandwidths = [playlist.stream_info.bandwidth for playlist in obj.playlists]
+    assert sorted(bandwidths) == bandwidths
+    assert 5 == len(obj.playlists[0].media)
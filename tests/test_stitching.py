@@ -0,0 +1,140 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import pytest
+
+import m3u8
+import playlists
+
+PRE_ROLL = '''#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-TARGETDURATION:4
+#EXTINF:4,
+ad1.ts
+#EXTINF:4,
+ad2.ts
+#EXT-X-ENDLIST
+'''
+
+
+def test_stitch_should_concatenate_segments_with_discontinuities():
+    pre_roll = m3u8.loads(PRE_ROLL)
+    content = m3u8.loads(playlists.SIMPLE_PLAYLIST)
+    result = m3u8.stitch([pre_roll, content, pre_roll])
+
+    assert (['ad1.ts', 'ad2.ts'] + content.segments.uri + ['ad1.ts', 'ad2.ts'] ==
+            result.segments.uri)
+    assert [False, False, True, True, False] == [
+        segment.discontinuity for segment in result.segments]
+    assert 5220 == result.target_duration
+    assert '3' == result.version
+    assert result.is_endlist
+
+
+def test_stitch_should_not_change_the_sources():
+    pre_roll = m3u8.loads(PRE_ROLL)
+    content = m3u8.loads(playlists.SIMPLE_PLAYLIST)
+    content_dump = content.dumps()
+    result = m3u8.stitch([pre_roll, content], base_uri='http://example.com/')
+
+    result.segments[2].duration = 1
+    assert not content.segments[0].discontinuity
+    assert content_dump == content.dumps()
+    assert result.segments[2] is not content.segments[0]
+
+
+def test_stitch_without_discontinuity():
+    result = m3u8.stitch([m3u8.loads(PRE_ROLL), m3u8.loads(PRE_ROLL)],
+                         discontinuity=False)
+    assert not any(segment.discontinuity for segment in result.segments)
+
+
+def test_stitch_should_make_uris_of_other_base_uris_absolute():
+    pre_roll = m3u8.M3U8(PRE_ROLL, base_uri='http://ads.example.com/roll/')
+    content = m3u8.M3U8(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS.replace(
+        'https://priv.example.com/key.php?r=52', 'key.bin').replace(
+        'http://media.example.com/', ''), base_uri='http://example.com/video/')
+    result = m3u8.stitch([content, pre_roll])
+
+    assert 'http://example.com/video/' == result.base_uri
+    assert 'fileSequence52-1.ts' == result.segments[0].uri
+    assert 'http://ads.example.com/roll/ad1.ts' == result.segments[3].uri
+    assert 'key.bin' == result.segments[0].key.uri
+    assert result.segments[0].key is result.segments[2].key
+    assert content.keys[0] is not result.segments[0].key
+
+    result.base_uri = 'http://cdn.example.com/video/'
+    assert 'http://cdn.example.com/video/fileSequence52-1.ts' == result.segments[0].absolute_uri
+    assert 'http://ads.example.com/roll/ad1.ts' == result.segments[3].absolute_uri
+    assert 'http://cdn.example.com/video/key.bin' == result.keys[0].absolute_uri
+
+    result = m3u8.stitch([pre_roll, content])
+    assert 'http://example.com/video/key.bin' == result.segments[2].key.uri
+    assert 'http://example.com/video/key.bin' == result.segments[4].key.uri
+
+
+def test_stitch_should_reset_encryption_after_encrypted_source():
+    encrypted = m3u8.loads(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    result = m3u8.stitch([m3u8.loads(PRE_ROLL), encrypted, m3u8.loads(PRE_ROLL)])
+
+    assert None is result.keys[0]
+    assert encrypted.keys[0].uri == result.keys[1].uri
+    assert 'NONE' == result.keys[-1].method
+    assert 5 == len(result.keys)
+
+    output = result.dumps()
+    assert 1 == output.count('#EXT-X-KEY:METHOD=NONE')
+    assert output.index('#EXT-X-KEY:METHOD=NONE') > output.index('fileSequence52-3.ts')
+    assert result.segments.uri == m3u8.loads(output).segments.uri
+    assert 'https://priv.example.com/key.php?r=52' in result.files
+
+
+def test_stitch_should_keep_the_iv_of_keys_without_iv():
+    encrypted = m3u8.loads(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS)
+    with_iv = m3u8.loads(playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS_AND_IV)
+    simple = m3u8.loads(playlists.SIMPLE_PLAYLIST)
+    result = m3u8.stitch([simple, encrypted, with_iv])
+
+    assert ([None] + m3u8.segment_ivs(encrypted) + m3u8.segment_ivs(with_iv) ==
+            m3u8.segment_ivs(result))
+    assert m3u8.segment_ivs(result) == m3u8.segment_ivs(m3u8.loads(result.dumps()))
+    assert '0x00000000000000000000000000001e72' == result.segments[1].key.iv
+    assert result.segments[4].key is result.segments[5].key
+
+    # Keys keep sharing one copy when the sequence numbers do not change
+    result = m3u8.stitch([encrypted, simple])
+    assert m3u8.segment_ivs(encrypted) == m3u8.segment_ivs(result)[:3]
+    assert None is result.segments[0].key.iv
+    assert result.segments[0].key is result.segments[2].key
+
+
+def test_stitch_should_reject_sources_with_different_maps():
+    fmp4 = PRE_ROLL.replace('#EXTINF:4,\nad1.ts', '#EXT-X-MAP:URI="init.mp4"\n#EXTINF:4,\nad1.mp4')
+    pre_roll = m3u8.M3U8(fmp4, base_uri='http://ads.example.com/')
+    content = m3u8.M3U8(fmp4.replace('init.mp4', 'main.mp4'), base_uri='http://ads.example.com/')
+    with pytest.raises(ValueError):
+        m3u8.stitch([pre_roll, content])
+    with pytest.raises(ValueError):
+        m3u8.stitch([m3u8.loads(PRE_ROLL), content])
+
+    content = m3u8.M3U8(fmp4, base_uri='http://example.com/')
+    with pytest.raises(ValueError):
+        m3u8.stitch([pre_roll, content])
+
+    same_map = m3u8.M3U8(fmp4, base_uri='http://ads.example.com/')
+    assert {'uri': 'init.mp4'} == m3u8.stitch([pre_roll, same_map]).segment_map
+    result = m3u8.stitch([pre_roll, same_map], base_uri='http://cdn.example.com/')
+    assert {'uri': 'http://ads.example.com/init.mp4'} == result.segment_map
+
+
+def test_stitch_should_reject_variant_playlists():
+    with pytest.raises(ValueError):
+        m3u8.stitch([m3u8.loads(playlists.VARIANT_PLAYLIST)])
+
+
+def test_stitch_of_nothing_should_be_empty():
+    result = m3u8.stitch([])
+    assert [] == result.segments
+    assert '#EXTM3U' == result.dumps().strip()
@@ -0,0 +1,161 @@
+# coding: utf-8
+# Copyright 2014 Globo.com Player authors. All rights reserved.
+# Use of this source code is governed by a MIT License
+# license that can be found in the LICENSE file.
+
+import m3u8
+import playlists
+
+INVALID_PLAYLIST = '''#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-MEDIA-SEQUENCE:1
+#EXTINF:9.4,
+segment1.ts
+#EXTINF:11,
+segment2.ts
+#EXTINF:not-a-number,
+segment3.ts
+#EXTINF:8
+segment4.ts
+#EXTINF:8,
+#EXTINF:8,
+segment5.ts
+#EXT-X-MEDIA-SEQUENCE:5
+#EXT-X-START:TIME-OFFSET=10
+segment6.ts
+#EXT-X-ENDLIST
+'''
+
+INVALID_VARIANT_PLAYLIST = '''#EXTM3U
+#EXT-X-STREAM-INF:PROGRAM-ID=1,RESOLUTION=1280x720
+low.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=1280000,RESOLUTION=abc
+mid.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=BAD
+high.m3u8
+#EXT-X-I-FRAME-STREAM-INF:RESOLUTION=640x,URI="iframes.m3u8"
+'''
+
+INVALID_ENCRYPTED_PLAYLIST = '''#EXTM3U
+#EXT-X-TARGETDURATION:10
+#EXT-X-KEY:METHOD=AES-128
+#EXTINF:10,
+segment1.ts
+#EXT-X-KEY:URI="key.bin"
+#EXT-X-BYTERANGE:abc
+#EXTINF:10,
+segment2.ts
+#EXT-X-BYTERANGE:1000@0
+#EXTINF:10,
+segment3.ts
+'''
+
+
+def codes(issues):
+    return [(issue.lineno, issue.code) for issue in issues]
+
+
+def test_valid_playlists_should_have_no_issues():
+    for content in (playlists.SIMPLE_PLAYLIST, playlists.VARIANT_PLAYLIST,
+                    playlists.PLAYLIST_WITH_ENCRIPTED_SEGMENTS,
+                    playlists.MULTI_MEDIA_PLAYLIST):
+        report = m3u8.validate(content)
+        assert report.is_valid
+        assert [] == report.errors
+        assert [] == report.warnings
+        assert '' == str(report)
+
+
+def test_validate_should_collect_every_error_in_line_order():
+    report = m3u8.validate(INVALID_PLAYLIST)
+
+    assert not report.is_valid
+    assert [(6, 'extinf-over-target-duration'),
+            (8, 'invalid-attribute'),
+            (10, 'invalid-extinf'),
+            (12, 'missing-uri'),
+            (15, 'duplicate-tag'),
+            (15, 'media-sequence-after-segment'),
+            (17, 'unexpected-line')] == codes(report.errors)
+    assert [(16, 'unsupported-tag')] == codes(report.warnings)
+    assert '#EXTINF:11,' == report.errors[0].line
+    assert 'error' == report.errors[0].severity
+    assert 'line 6 error extinf-over-target-duration: ' \
+        'Duration 11 is over the target duration 10' == str(report).split('\n')[0]
+
+
+def test_validation_should_keep_parsing_after_errors():
+    report = m3u8.ValidationReport()
+    data = m3u8.parse(INVALID_PLAYLIST, validation=report)
+
+    assert ['segment1.ts', 'segment2.ts', 'segment3.ts', 'segment4.ts',
+            'segment5.ts'] == [segment['uri'] for segment in data['segments']]
+    assert data['is_endlist']
+
+
+def test_validation_should_check_durations_before_target_duration():
+    report = m3u8.validate('#EXTM3U\n#EXTINF:10.6,\na.ts\n#EXT-X-TARGETDURATION:10\n')
+    assert [(2, 'extinf-over-target-duration')] == codes(report.errors)
+
+    report = m3u8.validate('#EXTM3U\n#EXTINF:10.4,\na.ts\n')
+    assert [(None, 'missing-target-duration')] == codes(report.errors)
+    assert 'playlist error missing-target-duration' in str(report)
+
+
+def test_validation_should_report_missing_extm3u_and_uris():
+    report = m3u8.validate('#EXT-X-STREAM-INF:BANDWIDTH=1280000\n'
+                           '#EXT-X-STREAM-INF:BANDWIDTH=BAD\n')
+    assert [(1, 'missing-extm3u'), (1, 'missing-uri'), (2, 'invalid-attribute'),
+            (2, 'missing-uri')] == codes(report.errors)
+
+
+def test_m3u8_should_collect_validation_issues():
+    report = m3u8.ValidationReport()
+    obj = m3u8.M3U8(playlists.SIMPLE_PLAYLIST_MESSY, validation=report)
+    assert report is obj.validation
+    assert 1 == len(obj.segments)
+    assert ['unexpected-line'] == [issue.code for issue in report.errors]
+
+
+def test_validation_should_report_missing_and_invalid_attributes():
+    report = m3u8.validate(INVALID_VARIANT_PLAYLIST)
+    assert [(2, 'missing-attribute'), (4, 'invalid-attribute'), (6, 'invalid-attribute'),
+            (8, 'missing-attribute'), (8, 'invalid-attribute')] == codes(report.errors)
+
+    report = m3u8.validate(INVALID_ENCRYPTED_PLAYLIST)
+    assert [(3, 'missing-attribute'), (6, 'missing-attribute'),
+            (7, 'invalid-attribute')] == codes(report.errors)
+    assert 'EXT-X-KEY with METHOD=AES-128 must have a URI' == report.errors[0].message
+
+
+def test_m3u8_should_be_built_from_an_invalid_variant_playlist():
+    report = m3u8.ValidationReport()
+    obj = m3u8.M3U8(INVALID_VARIANT_PLAYLIST, validation=report)
+
+    assert ['low.m3u8', 'mid.m3u8', 'high.m3u8'] == [playlist.uri for playlist in obj.playlists]
+    assert [None, 1280000, None] == [
+        playlist.stream_info.bandwidth for playlist in obj.playlists]
+    assert [(1280, 720), None, None] == [
+        playlist.stream_info.resolution for playlist in obj.playlists]
+    assert None is obj.iframe_playlists[0].iframe_stream_info.resolution
+    assert 'mid.m3u8' in obj.dumps()
+
+
+def test_m3u8_should_be_built_from_an_invalid_media_playlist():
+    report = m3u8.ValidationReport()
+    obj = m3u8.M3U8(INVALID_ENCRYPTED_PLAYLIST, validation=report)
+
+    assert ['segment1.ts', 'segment2.ts', 'segment3.ts'] == obj.segments.uri
+    assert 'AES-128' == obj.segments[0].key.method
+    assert None is obj.segments[0].key.uri
+    assert obj.segments[0].key is obj.segments[1].key
+    assert [None, None, 1000] == [segment.byterange_length for segment in obj.segments]
+
+    output = obj.dumps()
+    assert '#EXT-X-BYTERANGE:abc' not in output
+    assert 'None' not in output
+    reloaded = m3u8.loads(output)
+    assert obj.segments.uri == reloaded.segments.uri
+    assert [segment.key for segment in obj.segments] == [
+        segment.key for segment in reloaded.segments]
+    assert m3u8.validate(output).errors[0].code == 'missing-attribute'